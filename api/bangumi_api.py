@@ -3,7 +3,12 @@
 # Description: Bangumi API(https://github.com/bangumi/api)
 # ------------------------------------------------------------------
 
+import asyncio
+import json
+import os
 import requests
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from requests.adapters import HTTPAdapter
 
 from api.bangumi_model import BangumiBaseType
@@ -11,15 +16,29 @@ from tools.log import logger
 from bangumi_archive.local_archive_searcher import (
     parse_infobox,
     search_line,
+    search_lines,
     search_list,
     search_all_data,
+    search_all_data_many,
 )
-from tools.resort_search_results_list import resort_search_list
+from tools.resort_search_results_list import resort_search_list, resort_search_lists
 from tools.slide_window_rate_limiter import slide_window_rate_limiter
-from zhconv import convert
+from tools.normalize import to_simplified
+from tools.thumbnail_cache import ThumbnailCache
+from tools.http_cache import HttpCache
+from tools.single_flight import SingleFlight
+from tools.async_runner import AsyncRunner
+from tools.cache_backend import (
+    MEMORY_CACHE_MAX_ENTRIES,
+    MemoryCacheBackend,
+    SqliteCacheBackend,
+)
 from abc import ABC, abstractmethod
 
-# TODO： 在DataSource中添加一个本地缓存目录，将从 API 获取的封面图片保存为文件（如 cache/thumbnails/{subject_id}_{image_size}.jpg），下次直接读取本地文件，避免重复请求
+
+# 同一上游主机的所有请求共用一个限流器
+API_RATE_LIMIT_SCOPE = "api.bgm.tv"
+IMAGE_RATE_LIMIT_SCOPE = "lain.bgm.tv"
 
 
 class DataSource(ABC):
@@ -31,10 +50,31 @@ class DataSource(ABC):
     def search_subjects(self, query, threshold=80, is_novel=False):
         pass
 
+    def search_subjects_many(self, queries, threshold=80, is_novel=False):
+        """
+        批量搜索条目，返回 {query: 搜索结果}，重复的 query 只搜索一次
+        """
+        return {
+            query: self.search_subjects(
+                query, threshold=threshold, is_novel=is_novel)
+            for query in dict.fromkeys(queries)
+        }
+
     @abstractmethod
     def get_subject_metadata(self, subject_id):
         pass
 
+    def get_subjects_metadata(self, subject_ids):
+        """
+        批量获取条目元数据，返回 {subject_id: 元数据}，获取失败的条目不包含在结果中
+        """
+        results = {}
+        for subject_id in dict.fromkeys(subject_ids):
+            metadata = self.get_subject_metadata(subject_id)
+            if metadata:
+                results[subject_id] = metadata
+        return results
+
     @abstractmethod
     def get_related_subjects(self, subject_id):
         pass
@@ -47,6 +87,12 @@ class DataSource(ABC):
     def get_subject_thumbnail(self, subject_metadata, image_size):
         pass
 
+    def data_version(self):
+        """
+        数据版本，底层数据更新后变化；在线数据源无版本，返回 None
+        """
+        return None
+
 
 class BangumiApiDataSource(DataSource):
     """
@@ -55,11 +101,31 @@ class BangumiApiDataSource(DataSource):
 
     BASE_URL = "https://api.bgm.tv"
 
-    def __init__(self, access_token=None):
+    def __init__(
+        self, access_token=None, max_workers=1, thumbnail_cache=None, http_cache=None
+    ):
+        # 批量请求的最大并发数，实际请求速率仍受限流器约束
+        self.max_workers = max(1, max_workers)
         self.r = requests.Session()
-        self.r.mount("http://", HTTPAdapter(max_retries=3))
-        self.r.mount("https://", HTTPAdapter(max_retries=3))
+        # 连接池大小与并发数一致，并发请求可复用连接
+        pool_size = max(10, self.max_workers)
+        self.r.mount(
+            "http://",
+            HTTPAdapter(
+                max_retries=3, pool_connections=pool_size, pool_maxsize=pool_size
+            ),
+        )
+        self.r.mount(
+            "https://",
+            HTTPAdapter(
+                max_retries=3, pool_connections=pool_size, pool_maxsize=pool_size
+            ),
+        )
         self.access_token = access_token
+        # 封面本地缓存，为 None 时每次都重新下载
+        self.thumbnail_cache = thumbnail_cache
+        # 条目及关联条目的响应缓存，为 None 时每次都完整请求
+        self.http_cache = http_cache
         if self.access_token:
             self.refresh_token()
 
@@ -76,23 +142,40 @@ class BangumiApiDataSource(DataSource):
         # https://next.bgm.tv/demo/access-token
         return
 
-    @slide_window_rate_limiter()
+    @slide_window_rate_limiter(max_retries=None, scope=API_RATE_LIMIT_SCOPE)
+    def _request(self, method, url, **kwargs):
+        """
+        受限流约束的 API 请求，请求排队等待额度，被限流时降速并重发
+        """
+        return self.r.request(method, url, **kwargs)
+
+    @slide_window_rate_limiter(max_retries=None, scope=IMAGE_RATE_LIMIT_SCOPE)
+    def _request_image(self, url):
+        """
+        受限流约束的封面请求
+        """
+        return self.r.get(url)
+
     def search_subjects(self, query, threshold=80, is_novel=False):
         """
         获取搜索结果，并移除非漫画系列。返回具有完整元数据的条目
+
+        请求失败时返回 None，以便与无搜索结果区分
         """
         # 正面例子：魔女與使魔 -> 魔女与使魔，325236
         # 反面例子：君は淫らな僕の女王 -> 君は淫らな仆の女王，47331
-        query = convert(query, "zh-cn")
+        query = to_simplified(query)
         url = f"{self.BASE_URL}/v0/search/subjects?limit=10"
         payload = {"keyword": query, "filter": {"type": [BangumiBaseType.BOOK.value]}}
 
         try:
-            response = self.r.post(url, headers=self._get_headers(), json=payload)
+            response = self._request(
+                "POST", url, headers=self._get_headers(), json=payload
+            )
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error(f"出现错误: {e}")
-            return []
+            return None
 
         # e.g. Artbooks.VOL.14 -> {"request":"\/search\/subject\/Artbooks.VOL.14?responseGroup=large&type=1","code":404,"error":"Not Found"}
         try:
@@ -108,38 +191,64 @@ class BangumiApiDataSource(DataSource):
             query=query, results=results, threshold=threshold, is_novel=is_novel
         )
 
-    @slide_window_rate_limiter()
+    def _get_json(self, url):
+        """
+        GET 请求 JSON，新鲜期内的缓存无需请求，也不占用限流额度
+        """
+        entry = self.http_cache.get(url) if self.http_cache else None
+        if entry and self.http_cache.is_fresh(entry):
+            return json.loads(entry["body"])
+        return self._fetch_json(url, entry)
+
+    def _fetch_json(self, url, entry=None):
+        """
+        存在过期缓存时发起条件请求，304 时沿用缓存的响应体
+        """
+        headers = self._get_headers()
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self._request("GET", url, headers=headers)
+        if entry and response.status_code == 304:
+            self.http_cache.touch(url)
+            return json.loads(entry["body"])
+        response.raise_for_status()
+        if self.http_cache:
+            self.http_cache.put(
+                url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                response.text,
+            )
+        return response.json()
+
     def get_subject_metadata(self, subject_id):
         """
         获取漫画元数据
         """
         url = f"{self.BASE_URL}/v0/subjects/{subject_id}"
         try:
-            response = self.r.get(url, headers=self._get_headers())
-            response.raise_for_status()
+            return self._get_json(url)
         except requests.exceptions.RequestException as e:
             logger.error(f"An error occurred: {e}")
             logger.error(
                 f"请检查 {subject_id} 是否填写正确；或属于 NSFW，但并未配置 BANGUMI_ACCESS_TOKEN"
             )
             return []
-        return response.json()
 
-    @slide_window_rate_limiter()
     def get_related_subjects(self, subject_id):
         """
         获取漫画的关联条目
         """
         url = f"{self.BASE_URL}/v0/subjects/{subject_id}/subjects"
         try:
-            response = self.r.get(url, headers=self._get_headers())
-            response.raise_for_status()
+            return self._get_json(url)
         except requests.exceptions.RequestException as e:
             logger.error(f"出现错误: {e}")
             return []
-        return response.json()
 
-    @slide_window_rate_limiter()
     def update_reading_progress(self, subject_id, progress):
         """
         更新漫画系列卷阅读进度
@@ -147,35 +256,136 @@ class BangumiApiDataSource(DataSource):
         url = f"{self.BASE_URL}/v0/users/-/collections/{subject_id}"
         payload = {"vol_status": progress}
         try:
-            response = self.r.patch(url, headers=self._get_headers(), json=payload)
+            response = self._request(
+                "PATCH", url, headers=self._get_headers(), json=payload
+            )
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error(f"出现错误: {e}")
+            return False
         return response.status_code == 204
 
-    @slide_window_rate_limiter()
+    def _download_thumbnail(self, image):
+        response = self._request_image(image)
+        response.raise_for_status()
+        return response.content
+
     def get_subject_thumbnail(self, subject_metadata, image_size):
         """
-        获取漫画封面
+        获取漫画封面，优先读取本地缓存
 
         image_size可选值:
         large, common, medium,small, grid
         """
-        try:
-            if subject_metadata["images"]:
-                image = subject_metadata["images"][image_size]
-            else:
-                image = self.get_subject_metadata(subject_metadata["id"])["images"][
-                    image_size
-                ]
-            thumbnail = self.r.get(image).content
-        except Exception as e:
-            logger.error(f"出现错误: {e}")
-            return []
+        subject_id = subject_metadata["id"]
+        thumbnail = None
+        if self.thumbnail_cache:
+            thumbnail = self.thumbnail_cache.get(subject_id, image_size)
+        if thumbnail is None:
+            try:
+                if subject_metadata["images"]:
+                    image = subject_metadata["images"][image_size]
+                else:
+                    image = self.get_subject_metadata(subject_id)["images"][image_size]
+                thumbnail = self._download_thumbnail(image)
+            except Exception as e:
+                logger.error(f"出现错误: {e}")
+                return []
+            if self.thumbnail_cache:
+                self.thumbnail_cache.put(subject_id, image_size, thumbnail)
         files = {"file": (subject_metadata["name"], thumbnail)}
         return files
 
 
+class AsyncBangumiApiDataSource(BangumiApiDataSource):
+    """
+    基于 asyncio 的 Bangumi API 数据源类
+
+    每个实例持有一个后台事件循环及共享信号量，所有调用方的请求都在该事件循环中执行，
+    进程内在途请求总数不超过 max_workers；复用同一连接池，请求速率仍受同一限流器约束。
+    批量方法同时保持多个请求在途，高延迟下可在相同限流额度内获得数倍吞吐
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.runner = AsyncRunner(self.max_workers, "BangumiApi")
+
+    async def _search_subjects_many(self, queries, threshold, is_novel):
+        results = await asyncio.gather(
+            *(
+                self.runner.call(self.search_subjects, query, threshold, is_novel)
+                for query in queries
+            )
+        )
+        return dict(zip(queries, results))
+
+    async def _get_subjects_metadata(self, subject_ids):
+        metadata_list = await asyncio.gather(
+            *(
+                self.runner.call(self.get_subject_metadata, subject_id)
+                for subject_id in subject_ids
+            )
+        )
+        return {
+            subject_id: metadata
+            for subject_id, metadata in zip(subject_ids, metadata_list)
+            if metadata
+        }
+
+    async def async_search_subjects(self, query, threshold=80, is_novel=False):
+        """
+        异步搜索条目
+        """
+        return await self.runner.run_async(
+            self.runner.call(self.search_subjects, query, threshold, is_novel)
+        )
+
+    async def async_get_subject_metadata(self, subject_id):
+        """
+        异步获取漫画元数据
+        """
+        return await self.runner.run_async(
+            self.runner.call(self.get_subject_metadata, subject_id)
+        )
+
+    async def async_get_related_subjects(self, subject_id):
+        """
+        异步获取漫画的关联条目
+        """
+        return await self.runner.run_async(
+            self.runner.call(self.get_related_subjects, subject_id)
+        )
+
+    async def async_search_subjects_many(self, queries, threshold=80, is_novel=False):
+        """
+        异步批量搜索条目
+        """
+        return await self.runner.run_async(
+            self._search_subjects_many(
+                list(dict.fromkeys(queries)), threshold, is_novel)
+        )
+
+    async def async_get_subjects_metadata(self, subject_ids):
+        """
+        异步批量获取漫画元数据
+        """
+        return await self.runner.run_async(
+            self._get_subjects_metadata(list(dict.fromkeys(subject_ids)))
+        )
+
+    def search_subjects_many(self, queries, threshold=80, is_novel=False):
+        queries = list(dict.fromkeys(queries))
+        if len(queries) <= 1:
+            return super().search_subjects_many(queries, threshold, is_novel)
+        return self.runner.run(self._search_subjects_many(queries, threshold, is_novel))
+
+    def get_subjects_metadata(self, subject_ids):
+        subject_ids = list(dict.fromkeys(subject_ids))
+        if len(subject_ids) <= 1:
+            return super().get_subjects_metadata(subject_ids)
+        return self.runner.run(self._get_subjects_metadata(subject_ids))
+
+
 class BangumiArchiveDataSource(DataSource):
     """
     离线数据源类
@@ -187,6 +397,18 @@ class BangumiArchiveDataSource(DataSource):
         )
         self.subject_metadata_file = local_archive_folder + "subject.jsonlines"
 
+    def data_version(self):
+        """
+        以离线数据文件的修改时间作为数据版本
+        """
+        version = []
+        for file_path in (self.subject_metadata_file, self.subject_relation_file):
+            try:
+                version.append(os.path.getmtime(file_path))
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
     def _get_metadata_from_archive(self, subject_id):
         return search_line(
             file_path=self.subject_metadata_file,
@@ -205,24 +427,62 @@ class BangumiArchiveDataSource(DataSource):
     def _get_search_results_from_archive(self, query):
         return search_all_data(file_path=self.subject_metadata_file, query=query)
 
+    @staticmethod
+    def _prepare_search_result(item):
+        item["images"] = ""  # 忽略 images 字段
+        item["infobox"] = parse_infobox(item["infobox"])
+        item["rating"] = {
+            "rank": item.get("rank", 0),
+            "total": item.get("total", 0),
+            "count": item.get("score_details", {}),
+            "score": item.get("score", 0.0),
+        }
+
     def search_subjects(self, query, threshold=80, is_novel=False):
         """
         离线数据源搜索条目
         """
         results = self._get_search_results_from_archive(query)
         for item in results:
-            item["images"] = ""  # 忽略 images 字段
-            item["infobox"] = parse_infobox(item["infobox"])
-            item["rating"] = {
-                "rank": item.get("rank", 0),
-                "total": item.get("total", 0),
-                "count": item.get("score_details", {}),
-                "score": item.get("score", 0.0),
-            }
+            self._prepare_search_result(item)
         return resort_search_list(
             query=query, results=results, threshold=threshold, is_novel=is_novel
         )
 
+    def search_subjects_many(self, queries, threshold=80, is_novel=False):
+        """
+        离线数据源批量搜索条目
+
+        精确命中的 query 直接返回，其余 query 在一次 Archive 检索中获取候选，
+        最后统一计算得分（任务较多时使用进程池）
+        """
+        prepared = {}
+
+        def _prepare(items):
+            # 同一条目可能被多个 query 命中，只处理一次
+            for item in items:
+                if id(item) not in prepared:
+                    prepared[id(item)] = item
+                    self._prepare_search_result(item)
+            # 得分写入 fuzzScore，每个 query 使用独立的浅拷贝
+            return [dict(item) for item in items]
+
+        def _is_resolved(query, items):
+            return bool(
+                resort_search_list(
+                    query=query, results=_prepare(items), threshold=threshold, is_novel=is_novel
+                )
+            )
+
+        candidates = search_all_data_many(
+            self.subject_metadata_file, queries, is_resolved=_is_resolved
+        )
+        return resort_search_lists(
+            {query: _prepare(items) for query, items in candidates.items()},
+            threshold=threshold,
+            is_novel=is_novel,
+        )
+
     def get_subject_metadata(self, subject_id):
         """
         离线数据源获取条目元数据
@@ -230,6 +490,28 @@ class BangumiArchiveDataSource(DataSource):
         data = self._get_metadata_from_archive(subject_id)
         if not data:
             return {}
+        return self._build_metadata(data)
+
+    def get_subjects_metadata(self, subject_ids):
+        """
+        离线数据源批量获取条目元数据，一次读取整批数据
+        """
+        results = {}
+        for subject_id, data in search_lines(
+            file_path=self.subject_metadata_file,
+            subject_ids=subject_ids,
+            target_field="id",
+        ).items():
+            metadata = self._build_metadata(data)
+            if metadata:
+                results[subject_id] = metadata
+        return results
+
+    @staticmethod
+    def _build_metadata(data):
+        """
+        将 Archive 数据转换为与 API 一致的元数据结构
+        """
         try:
             data["images"] = ""
             data["tags"] = [
@@ -311,23 +593,102 @@ class BangumiDataSourceFactory:
 
     @staticmethod
     def create(config):
-        online = BangumiApiDataSource(config.get("access_token"))
+        thumbnail_cache = None
+        thumbnail_cache_max_size = config.get("thumbnail_cache_max_size", 0)
+        if config.get("cache_folder") and thumbnail_cache_max_size > 0:
+            thumbnail_cache = ThumbnailCache(
+                os.path.join(config.get("cache_folder"), "thumbnails"),
+                thumbnail_cache_max_size * 1024 * 1024,
+            )
+        http_cache = None
+        if config.get("cache_folder"):
+            http_cache = HttpCache(
+                os.path.join(config.get("cache_folder"), "http_cache.db"),
+                config.get("api_cache_freshness", 0) * 3600,
+            )
+        api_concurrency = config.get("api_concurrency", 1)
+        # 并发数大于 1 时使用异步客户端
+        api_class = (
+            AsyncBangumiApiDataSource if api_concurrency > 1 else BangumiApiDataSource
+        )
+        online = api_class(
+            config.get("access_token"),
+            api_concurrency,
+            thumbnail_cache,
+            http_cache,
+        )
 
+        data_source = online
         if config.get("use_local_archive", False):
             offline = BangumiArchiveDataSource(config.get("local_archive_folder"))
-            return FallbackDataSource(offline, online)
+            hedge_delay = config.get("hedge_delay", 0)
+            if config.get("cache_folder"):
+                miss_cache = SqliteCacheBackend(
+                    os.path.join(config.get("cache_folder"), "archive_misses.db")
+                )
+            else:
+                miss_cache = MemoryCacheBackend()
+            data_source = FallbackDataSource(
+                offline,
+                online,
+                hedge_delay / 1000 if hedge_delay > 0 else None,
+                miss_cache,
+                config.get("miss_cache_ttl", 0) * 3600,
+            )
 
-        return online
+        cache_backend = config.get("cache_backend")
+        if cache_backend == "memory":
+            backend = MemoryCacheBackend(
+                config.get("cache_max_entries", MEMORY_CACHE_MAX_ENTRIES)
+            )
+        elif cache_backend == "sqlite" and config.get("cache_folder"):
+            backend = SqliteCacheBackend(
+                os.path.join(config.get("cache_folder"), "data_source_cache.db")
+            )
+        else:
+            backend = None
+        if backend:
+            cache_ttl = config.get("cache_ttl", 0) * 3600
+            data_source = CachingDataSource(
+                data_source,
+                backend,
+                {
+                    "search_subjects": config.get("search_cache_ttl", 0) * 3600,
+                    "get_subject_metadata": cache_ttl,
+                    "get_related_subjects": cache_ttl,
+                },
+            )
+
+        # 合并并发的相同请求
+        return SingleFlightDataSource(data_source)
 
 
 class FallbackDataSource(DataSource):
     """
     备用数据源类，用于在主数据源失败时使用备用数据源
+
+    hedge_delay 不为 None 时启用对冲模式：主数据源在 hedge_delay 秒内未返回可用结果，
+    则同时请求备用数据源并采用先返回的可用结果，并记录各条目由哪个数据源返回，之后直接请求该数据源
+
+    提供 miss_cache 时，主数据源未命中的 (方法, 参数) 在 miss_ttl 秒内直接交给备用数据源；
+    主数据源的数据版本变化后，原有记录随之失效
     """
 
-    def __init__(self, primary, secondary):
+    # 对冲模式的最大并发请求数
+    HEDGE_MAX_WORKERS = 8
+
+    def __init__(
+        self, primary, secondary, hedge_delay=None, miss_cache=None, miss_ttl=0
+    ):
         self.primary = primary
         self.secondary = secondary
+        self.hedge_delay = hedge_delay
+        self.miss_cache = miss_cache
+        self.miss_ttl = miss_ttl
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # {subject_id: 返回可用结果的数据源}
+        self._answered_by = {}
 
     def _fallback_call(self, method_name, *args, **kwargs):
         # 优先调用 primary 数据源的方法
@@ -343,16 +704,207 @@ class FallbackDataSource(DataSource):
             result = getattr(self.secondary, method_name)(*args, **kwargs)
         return result
 
+    def _miss_key(self, method_name, key, data_version):
+        return repr((method_name, key, data_version))
+
+    def _known_misses(self, method_name, keys):
+        """
+        返回 keys 中已记录为主数据源未命中的部分
+        """
+        if not self.miss_cache or self.miss_ttl <= 0:
+            return set()
+        data_version = self.primary.data_version()
+        return {
+            key
+            for key in keys
+            if self.miss_cache.get(self._miss_key(method_name, key, data_version))[0]
+        }
+
+    def _record_misses(self, method_name, keys):
+        if not self.miss_cache or self.miss_ttl <= 0 or not keys:
+            return
+        data_version = self.primary.data_version()
+        for key in keys:
+            self.miss_cache.set(
+                self._miss_key(method_name, key, data_version), True, self.miss_ttl
+            )
+
+    def _call_primary(self, method_name, key, *args, **kwargs):
+        result = getattr(self.primary, method_name)(*args, **kwargs)
+        if not result:
+            self._record_misses(method_name, [key])
+        return result
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.HEDGE_MAX_WORKERS,
+                    thread_name_prefix="HedgedFallback",
+                )
+            return self._executor
+
+    def _remember(self, subject_id, source):
+        if subject_id is not None:
+            self._answered_by[subject_id] = source
+
+    def _keyed_call(self, method_name, key, *args, **kwargs):
+        # 主数据源已知未命中时直接请求备用数据源
+        if self._known_misses(method_name, [key]):
+            logger.debug(
+                "主数据源: %s 已知缺少 %s，直接请求备用数据源",
+                self.primary.__class__.__name__,
+                key,
+            )
+            return getattr(self.secondary, method_name)(*args, **kwargs)
+
+        if self.hedge_delay is None:
+            result = self._call_primary(method_name, key, *args, **kwargs)
+            if not result:
+                logger.debug(
+                    "主数据源: %s 失败，尝试备用数据源: %s",
+                    self.primary.__class__.__name__,
+                    self.secondary.__class__.__name__,
+                )
+                result = getattr(self.secondary, method_name)(*args, **kwargs)
+            return result
+
+        # 已知返回过该条目的数据源直接请求，失败时重新对冲
+        source = self._answered_by.get(key)
+        if source is not None:
+            result = getattr(source, method_name)(*args, **kwargs)
+            if result:
+                return result
+
+        executor = self._get_executor()
+        pending = {
+            executor.submit(
+                self._call_primary, method_name, key, *args, **kwargs
+            ): self.primary
+        }
+        done, _ = wait(pending, timeout=self.hedge_delay)
+        if not done:
+            logger.debug(
+                "主数据源: %s 超过 %s 秒未返回，同时请求备用数据源: %s",
+                self.primary.__class__.__name__,
+                self.hedge_delay,
+                self.secondary.__class__.__name__,
+            )
+        secondary_started = False
+        result = None
+        while True:
+            if not secondary_started and not done:
+                pending[
+                    executor.submit(
+                        getattr(self.secondary, method_name), *args, **kwargs
+                    )
+                ] = self.secondary
+                secondary_started = True
+            if not pending:
+                return result
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(
+                        "数据源: %s 出现错误: %s", source.__class__.__name__, e
+                    )
+                    continue
+                if result:
+                    self._remember(key, source)
+                    return result
+            # 已完成的请求均无可用结果，若尚未请求备用数据源则立即请求
+            done = set()
+
     def search_subjects(self, query, threshold=80, is_novel=False):
-        return self._fallback_call(
-            "search_subjects", query, threshold=threshold, is_novel=is_novel
+        return self._keyed_call(
+            "search_subjects",
+            (query, threshold, is_novel),
+            query,
+            threshold=threshold,
+            is_novel=is_novel,
+        )
+
+    def search_subjects_many(self, queries, threshold=80, is_novel=False):
+        # 主数据源批量搜索，仅将无结果的 query 交给备用数据源
+        queries = list(dict.fromkeys(queries))
+        known_misses = {
+            key[0]
+            for key in self._known_misses(
+                "search_subjects",
+                [(query, threshold, is_novel) for query in queries],
+            )
+        }
+        requested = [query for query in queries if query not in known_misses]
+        results = (
+            self.primary.search_subjects_many(
+                requested, threshold=threshold, is_novel=is_novel
+            )
+            if requested
+            else {}
+        )
+        misses = [query for query, result in results.items() if not result]
+        self._record_misses(
+            "search_subjects", [(query, threshold, is_novel) for query in misses]
         )
+        leftovers = misses + [query for query in queries if query in known_misses]
+        if leftovers:
+            logger.debug(
+                "主数据源: %s 未找到 %s 个条目，尝试备用数据源: %s",
+                self.primary.__class__.__name__,
+                len(leftovers),
+                self.secondary.__class__.__name__,
+            )
+            results.update(
+                self.secondary.search_subjects_many(
+                    leftovers, threshold=threshold, is_novel=is_novel
+                )
+            )
+        return results
 
     def get_subject_metadata(self, subject_id):
-        return self._fallback_call("get_subject_metadata", subject_id)
+        return self._keyed_call("get_subject_metadata", subject_id, subject_id)
+
+    def get_subjects_metadata(self, subject_ids):
+        # 主数据源批量获取，仅将缺失的条目交给备用数据源
+        subject_ids = list(dict.fromkeys(subject_ids))
+        # 对冲模式下已知由备用数据源返回的条目直接交给备用数据源
+        known = self._known_misses("get_subject_metadata", subject_ids)
+        known.update(
+            subject_id
+            for subject_id in subject_ids
+            if self._answered_by.get(subject_id) is self.secondary
+        )
+        requested = [
+            subject_id for subject_id in subject_ids if subject_id not in known
+        ]
+        results = self.primary.get_subjects_metadata(requested) if requested else {}
+        self._record_misses(
+            "get_subject_metadata",
+            [subject_id for subject_id in requested if subject_id not in results],
+        )
+        leftovers = [
+            subject_id for subject_id in subject_ids
+            if subject_id not in results
+        ]
+        if leftovers:
+            logger.debug(
+                "主数据源: %s 缺少 %s 个条目，尝试备用数据源: %s",
+                self.primary.__class__.__name__,
+                len(leftovers),
+                self.secondary.__class__.__name__,
+            )
+            fetched = self.secondary.get_subjects_metadata(leftovers)
+            if self.hedge_delay is not None:
+                for subject_id in fetched:
+                    self._remember(subject_id, self.secondary)
+            results.update(fetched)
+        return results
 
     def get_related_subjects(self, subject_id):
-        return self._fallback_call("get_related_subjects", subject_id)
+        return self._keyed_call("get_related_subjects", subject_id, subject_id)
 
     def update_reading_progress(self, subject_id, progress):
         self._fallback_call("update_reading_progress", subject_id, progress)
@@ -361,3 +913,184 @@ class FallbackDataSource(DataSource):
         return self._fallback_call(
             "get_subject_thumbnail", subject_metadata, image_size
         )
+
+
+class CachingDataSource(DataSource):
+    """
+    缓存数据源类，为任意数据源缓存查询结果
+
+    各方法的有效期由 ttls 指定（秒），未指定或不大于 0 的方法不缓存；空结果及请求失败不缓存。
+    封面由 ThumbnailCache 缓存在磁盘中，此处不缓存
+    """
+
+    def __init__(self, source, backend, ttls):
+        self.source = source
+        self.backend = backend
+        self.ttls = ttls
+        self._stats = {method: {"hits": 0, "misses": 0} for method in ttls}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def _key(method_name, *args):
+        return repr((method_name,) + args)
+
+    def _record(self, method_name, hit):
+        with self._stats_lock:
+            stats = self._stats.setdefault(method_name, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += 1
+
+    def _lookup(self, method_name, *key_args):
+        if self.ttls.get(method_name, 0) <= 0:
+            return False, None
+        hit, value = self.backend.get(self._key(method_name, *key_args))
+        self._record(method_name, hit)
+        return hit, value
+
+    def _store(self, method_name, value, *key_args):
+        ttl = self.ttls.get(method_name, 0)
+        if ttl > 0 and value:
+            self.backend.set(self._key(method_name, *key_args), value, ttl)
+
+    def _cached_call(self, method_name, key_args, *args, **kwargs):
+        hit, value = self._lookup(method_name, *key_args)
+        if hit:
+            return value
+        value = getattr(self.source, method_name)(*args, **kwargs)
+        self._store(method_name, value, *key_args)
+        return value
+
+    def stats(self):
+        """
+        各方法的缓存命中统计，返回 {method: {"hits": 命中数, "misses": 未命中数}}
+        """
+        with self._stats_lock:
+            return {method: dict(stats) for method, stats in self._stats.items()}
+
+    def search_subjects(self, query, threshold=80, is_novel=False):
+        return self._cached_call(
+            "search_subjects",
+            (query, threshold, is_novel),
+            query,
+            threshold=threshold,
+            is_novel=is_novel,
+        )
+
+    def search_subjects_many(self, queries, threshold=80, is_novel=False):
+        results = {}
+        missing = []
+        for query in dict.fromkeys(queries):
+            hit, value = self._lookup("search_subjects", query, threshold, is_novel)
+            if hit:
+                results[query] = value
+            else:
+                missing.append(query)
+        if missing:
+            fetched = self.source.search_subjects_many(
+                missing, threshold=threshold, is_novel=is_novel
+            )
+            for query, value in fetched.items():
+                self._store("search_subjects", value, query, threshold, is_novel)
+            results.update(fetched)
+        return results
+
+    def get_subject_metadata(self, subject_id):
+        return self._cached_call(
+            "get_subject_metadata", (subject_id,), subject_id
+        )
+
+    def get_subjects_metadata(self, subject_ids):
+        results = {}
+        missing = []
+        for subject_id in dict.fromkeys(subject_ids):
+            hit, value = self._lookup("get_subject_metadata", subject_id)
+            if hit:
+                results[subject_id] = value
+            else:
+                missing.append(subject_id)
+        if missing:
+            fetched = self.source.get_subjects_metadata(missing)
+            for subject_id, value in fetched.items():
+                self._store("get_subject_metadata", value, subject_id)
+            results.update(fetched)
+        return results
+
+    def get_related_subjects(self, subject_id):
+        return self._cached_call(
+            "get_related_subjects", (subject_id,), subject_id
+        )
+
+    def update_reading_progress(self, subject_id, progress):
+        return self.source.update_reading_progress(subject_id, progress)
+
+    def get_subject_thumbnail(self, subject_metadata, image_size):
+        return self.source.get_subject_thumbnail(subject_metadata, image_size)
+
+
+class SingleFlightDataSource(DataSource):
+    """
+    请求合并数据源类，并发的相同调用共享同一次请求及其结果
+
+    SSE 模式下多个回调线程可能同时获取同一条目，合并后只占用一次限流额度
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.single_flight = SingleFlight()
+
+    def search_subjects(self, query, threshold=80, is_novel=False):
+        return self.single_flight.do(
+            ("search_subjects", query, threshold, is_novel),
+            self.source.search_subjects,
+            query,
+            threshold=threshold,
+            is_novel=is_novel,
+        )
+
+    def search_subjects_many(self, queries, threshold=80, is_novel=False):
+        # 与 search_subjects 使用相同的 key，单个与批量调用之间也可合并
+        results = self.single_flight.do_many(
+            {
+                ("search_subjects", query, threshold, is_novel): query
+                for query in dict.fromkeys(queries)
+            },
+            lambda missing: self.source.search_subjects_many(
+                missing, threshold=threshold, is_novel=is_novel
+            ),
+        )
+        return {key[1]: value for key, value in results.items()}
+
+    def get_subject_metadata(self, subject_id):
+        return self.single_flight.do(
+            ("get_subject_metadata", subject_id),
+            self.source.get_subject_metadata,
+            subject_id,
+        )
+
+    def get_subjects_metadata(self, subject_ids):
+        results = self.single_flight.do_many(
+            {
+                ("get_subject_metadata", subject_id): subject_id
+                for subject_id in dict.fromkeys(subject_ids)
+            },
+            self.source.get_subjects_metadata,
+        )
+        # 获取失败的条目不包含在结果中
+        return {key[1]: value for key, value in results.items() if value}
+
+    def get_related_subjects(self, subject_id):
+        return self.single_flight.do(
+            ("get_related_subjects", subject_id),
+            self.source.get_related_subjects,
+            subject_id,
+        )
+
+    def update_reading_progress(self, subject_id, progress):
+        return self.source.update_reading_progress(subject_id, progress)
+
+    def get_subject_thumbnail(self, subject_metadata, image_size):
+        return self.single_flight.do(
+            ("get_subject_thumbnail", subject_metadata["id"], image_size),
+            self.source.get_subject_thumbnail,
+            subject_metadata,
+            image_size,
+        )
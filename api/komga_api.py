@@ -5,19 +5,113 @@
 
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from tools.log import logger
+from tools.cache_time import TimeCacheManager
 from requests.adapters import HTTPAdapter
 
+# 分页获取系列时的每页数量
+SERIES_PAGE_SIZE = 500
+# 批量获取书籍时每次查询包含的系列数
+BOOKS_QUERY_CHUNK_SIZE = 100
+# 批量获取书籍时的每页数量
+BOOKS_PAGE_SIZE = 2000
+# 分页获取收藏时的每页数量
+COLLECTION_PAGE_SIZE = 500
+# 精简系列记录保留的元数据字段，用于匹配及比较元数据
+SERIES_METADATA_FIELDS = (
+    "status",
+    "summary",
+    "publisher",
+    "genres",
+    "tags",
+    "title",
+    "alternateTitles",
+    "ageRating",
+    "links",
+    "totalBookCount",
+    "language",
+    "titleSort",
+)
+# 精简书籍记录保留的元数据字段
+BOOK_METADATA_FIELDS = (
+    "authors",
+    "summary",
+    "tags",
+    "title",
+    "isbn",
+    "number",
+    "links",
+    "releaseDate",
+    "numberSort",
+)
+# 比较元数据时忽略大小写及顺序的字段，Komga 保存时会转为小写
+CASE_INSENSITIVE_FIELDS = ("genres", "tags")
+# 比较元数据时忽略顺序的字段
+UNORDERED_FIELDS = ("alternateTitles", "links", "authors")
+
+
+def _normalize_metadata_field(field, value):
+    if field in CASE_INSENSITIVE_FIELDS:
+        return sorted({str(item).lower() for item in value or []})
+    if field in UNORDERED_FIELDS:
+        items = []
+        for item in value or []:
+            if isinstance(item, dict):
+                # Komga 保存作者时角色会转为小写
+                item = {
+                    key: val.lower() if key == "role" and isinstance(val, str) else val
+                    for key, val in item.items()
+                }
+                item = sorted(item.items())
+            items.append(item)
+        return sorted(items, key=repr)
+    if field == "number":
+        return str(value)
+    if field == "numberSort":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+    return value
+
+
+def diff_metadata(current_metadata, metadata):
+    """
+    返回 metadata 中与 Komga 当前元数据不同的字段
+    """
+    if not current_metadata:
+        return dict(metadata)
+    return {
+        field: value
+        for field, value in metadata.items()
+        if field not in current_metadata
+        or _normalize_metadata_field(field, current_metadata[field])
+        != _normalize_metadata_field(field, value)
+    }
+
 
 class KomgaApi:
-    def __init__(self, base_url, username, password, api_key=None):
+    def __init__(self, base_url, username, password, api_key=None, max_connections=10):
         # store the base URL and authentication information for use in other methods
         self.base_url = base_url + "/api/v1"
         self.auth = (username, password)
 
         self.r = requests.Session()
-        self.r.mount("http://", HTTPAdapter(max_retries=3))
-        self.r.mount("https://", HTTPAdapter(max_retries=3))
+        # 连接池需容纳并发写入及分页预取的连接
+        pool_size = max(10, max_connections)
+        self.r.mount(
+            "http://",
+            HTTPAdapter(
+                max_retries=3, pool_connections=pool_size, pool_maxsize=pool_size
+            ),
+        )
+        self.r.mount(
+            "https://",
+            HTTPAdapter(
+                max_retries=3, pool_connections=pool_size, pool_maxsize=pool_size
+            ),
+        )
 
         self.r.headers.update(
             {
@@ -42,30 +136,6 @@ class KomgaApi:
                 logger.error("Komga: 基本身份验证失败!")
                 exit(1)
 
-    def get_latest_series(self, library_id=None, page=0):
-        """
-        Return recently added or updated series.
-        https://komga.org/docs/openapi/get-latest-series/
-        """
-        url = f"{self.base_url}/series/latest"
-        params = {
-            "size": 20,
-            "page": page,
-            "deleted": "false",
-        }
-        if library_id:
-            params["library_id"] = (
-                library_id if isinstance(library_id, (list, tuple)) else [
-                    library_id]
-            )
-        try:
-            response = self.r.get(url, params=params)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"出现错误: {e}")
-            return []
-        return response.json()
-
     def get_specific_series(self, series_id):
         """
         Retrieves one specific series in the komga comic.
@@ -92,18 +162,10 @@ class KomgaApi:
         url = f"{self.base_url}/series/list"
         # 取消默认分页（大小为 2000），以便一次性获取所有系列
         params = {"size": 50000, "unpaged": True}
-        conditions = [
-            {
-                "deleted": {
-                    "operator": "isFalse",
-                }
-            }
-        ]
-        if payload is not None:
-            conditions.append(payload)
-        merged_payload = {"condition": {"allOf": conditions}}
         try:
-            response = self.r.post(url, params=params, json=merged_payload)
+            response = self.r.post(
+                url, params=params, json=self._series_condition(payload)
+            )
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error(f"出现错误: {e}")
@@ -111,41 +173,142 @@ class KomgaApi:
         # 将response作为JSON对象返回
         return response.json()
 
-    def get_series_with_libraryid(self, library_id):
+    @staticmethod
+    def _series_condition(payload=None):
         """
-        Retrieves all series in a specified library in the komga comic.
+        合并未删除条件与指定条件
         """
+        conditions = [
+            {
+                "deleted": {
+                    "operator": "isFalse",
+                }
+            }
+        ]
+        if payload is not None:
+            conditions.append(payload)
+        return {"condition": {"allOf": conditions}}
+
+    @staticmethod
+    def _any_of(field, ids):
         conditions = []
-        for id in library_id:
+        for id in ids:
             conditions.append(
                 {
-                    "libraryId": {
+                    field: {
                         "operator": "is",
                         "value": str(id),
                     }
                 }
             )
-        payload = {"anyOf": conditions} if len(
-            conditions) > 1 else conditions[0]
-        return self.get_all_series(payload)
+        return {"anyOf": conditions} if len(conditions) > 1 else conditions[0]
+
+    def library_condition(self, library_id):
+        """
+        Condition matching series in the specified libraries.
+        """
+        return self._any_of("libraryId", library_id)
+
+    def collection_condition(self, collection_id):
+        """
+        Condition matching series in the specified collections.
+        """
+        return self._any_of("collectionId", collection_id)
+
+    def get_series_with_libraryid(self, library_id):
+        """
+        Retrieves all series in a specified library in the komga comic.
+        """
+        return self.get_all_series(self.library_condition(library_id))
 
     def get_series_with_collection(self, collection_id):
         """
         Retrieves all series with a specified collection in the komga comic.
         """
-        conditions = []
-        for id in collection_id:
-            conditions.append(
-                {
-                    "collectionId": {
-                        "operator": "is",
-                        "value": str(id),
-                    }
-                }
+        return self.get_all_series(self.collection_condition(collection_id))
+
+    def _request_series_page(self, payload, page, page_size, sort="createdDate,asc"):
+        """
+        获取一页系列，请求失败时抛出异常
+
+        以 id 作为次级排序，排序字段相同的系列在各页间不会重复或遗漏
+        """
+        url = f"{self.base_url}/series/list"
+        params = {"page": page, "size": page_size, "sort": [sort, "id,asc"]}
+        response = self.r.post(url, params=params, json=self._series_condition(payload))
+        response.raise_for_status()
+        return response.json()
+
+    def _get_series_page(self, payload, page, page_size, sort="createdDate,asc"):
+        """
+        获取一页系列，请求失败时返回 None
+        """
+        try:
+            return self._request_series_page(payload, page, page_size, sort)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"出现错误: {e}")
+            return None
+
+    def iter_series_pages(self, condition=None, page_size=SERIES_PAGE_SIZE):
+        """
+        分页获取满足条件的系列，每次返回一页精简后的系列记录
+
+        处理当前页时后台线程已开始获取下一页；任一页请求失败时抛出异常，调用方不应将已获取的部分视为完整结果
+        """
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="SeriesPage") as executor:
+            page = 0
+            future = executor.submit(
+                self._request_series_page, condition, page, page_size)
+            while future is not None:
+                try:
+                    data = future.result()
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"获取第 {page + 1} 页系列失败: {e}")
+                    raise
+                page += 1
+                future = (
+                    executor.submit(
+                        self._request_series_page, condition, page, page_size)
+                    if page < data.get("totalPages", 0)
+                    else None
+                )
+                yield [SeriesRecord.from_json(series) for series in data["content"]]
+
+    def get_series_modified_since(
+        self, condition=None, since=None, page_size=SERIES_PAGE_SIZE
+    ):
+        """
+        获取满足条件且 lastModified 晚于 since 的精简系列记录，最近修改的在前
+
+        Komga 的系列查询条件不支持 lastModified，因此按 lastModified 倒序分页，
+        遇到不晚于 since 的系列即停止，通常一次请求即可完成。请求失败时返回 None
+        """
+        since_time = TimeCacheManager.convert_to_datetime(since) if since else None
+        modified_series = []
+        page = 0
+        while True:
+            data = self._get_series_page(
+                condition, page, page_size, sort="lastModified,desc"
             )
-        payload = {"anyOf": conditions} if len(
-            conditions) > 1 else conditions[0]
-        return self.get_all_series(payload)
+            if not data:
+                return None
+            for series in data["content"]:
+                modified_time = TimeCacheManager.convert_to_datetime(
+                    series["lastModified"]
+                )
+                if since_time and modified_time and modified_time <= since_time:
+                    return modified_series
+                modified_series.append(SeriesRecord.from_json(series))
+            page += 1
+            if page >= data.get("totalPages", 0):
+                return modified_series
+
+    def iter_series(self, condition=None, page_size=SERIES_PAGE_SIZE):
+        """
+        逐个返回满足条件的精简系列记录，见 iter_series_pages
+        """
+        for series_page in self.iter_series_pages(condition, page_size):
+            yield from series_page
 
     def get_series_with_read_status(self, read_status):
         """
@@ -213,6 +376,59 @@ class KomgaApi:
         # return the response as a JSON object
         return response.json()
 
+    def get_books_for_series(self, series_ids):
+        """
+        批量获取多个系列的书籍，返回 {series_id: [book]}
+
+        每次查询以 anyOf 条件包含 BOOKS_QUERY_CHUNK_SIZE 个系列并分页获取；
+        查询失败的系列不包含在结果中，由调用方单独获取
+        """
+        books_by_series = {}
+        for chunk in self._series_id_chunks(series_ids):
+            books_by_series.update(self._get_books_chunk(chunk))
+        return books_by_series
+
+    @staticmethod
+    def _series_id_chunks(series_ids):
+        series_ids = list(dict.fromkeys(series_ids))
+        return [
+            series_ids[start: start + BOOKS_QUERY_CHUNK_SIZE]
+            for start in range(0, len(series_ids), BOOKS_QUERY_CHUNK_SIZE)
+        ]
+
+    def _get_books_chunk(self, chunk):
+        """
+        分页获取一组系列的书籍，失败时返回空字典
+        """
+        payload = self._series_condition(self._any_of("seriesId", chunk))
+        chunk_books = {series_id: [] for series_id in chunk}
+        page = 0
+        try:
+            while True:
+                response = self.r.post(
+                    f"{self.base_url}/books/list",
+                    params={
+                        "page": page,
+                        "size": BOOKS_PAGE_SIZE,
+                        # 同一次扫描导入的书籍 createdDate 可能相同，以 id 作为次级排序保证分页稳定
+                        "sort": ["createdDate,asc", "id,asc"],
+                    },
+                    json=payload,
+                )
+                response.raise_for_status()
+                data = response.json()
+                for book in data["content"]:
+                    chunk_books.setdefault(book["seriesId"], []).append(
+                        BookRecord.from_json(book)
+                    )
+                page += 1
+                if page >= data.get("totalPages", 0):
+                    break
+        except requests.exceptions.RequestException as e:
+            logger.error(f"出现错误: {e}")
+            return {}
+        return chunk_books
+
     def get_series_thumbnails(self, series_id):
         """
         Retrieves all thumbnails in a specified series in the komga comic.
@@ -243,10 +459,17 @@ class KomgaApi:
         # return the response as a JSON object
         return response.json()
 
-    def update_series_metadata(self, series_id, metadata):
+    def update_series_metadata(self, series_id, metadata, current_metadata=None):
         """
         Updates the metadata of a specified comic series.
+
+        提供 current_metadata 时仅发送有变化的字段，无变化时不发送请求
         """
+        if current_metadata is not None:
+            metadata = diff_metadata(current_metadata, metadata)
+            if not metadata:
+                logger.debug("系列: %s 元数据无变化, 跳过更新", series_id)
+                return True
         try:
             # make a PATCH request to the URL to update the metadata for a given series
             response = self.r.patch(
@@ -277,12 +500,19 @@ class KomgaApi:
         # return True if the status code indicates success, False otherwise
         return response.status_code == 200
 
-    def update_book_metadata(self, book_id, metadata):
+    def update_book_metadata(self, book_id, metadata, current_metadata=None):
         """
         Updates the metadata of a specified comic book.
 
+        提供 current_metadata 时仅发送有变化的字段，无变化时不发送请求
+
         https://github.com/gotson/komga/blob/master/komga/docs/openapi.json#L2935
         """
+        if current_metadata is not None:
+            metadata = diff_metadata(current_metadata, metadata)
+            if not metadata:
+                logger.debug("书籍: %s 元数据无变化, 跳过更新", book_id)
+                return True
         try:
             # make a PATCH request to the URL to update the metadata for a given book
             response = self.r.patch(
@@ -330,17 +560,33 @@ class KomgaApi:
         """
         search collection by name
         return collection id.
+
+        优先返回名称完全一致的收藏
+        """
+        collections = self.list_collections(search=name)
+        if not collections:
+            return None
+        return next(
+            (collection for collection in collections if collection["name"] == name),
+            collections[0],
+        )["id"]
+
+    def update_collection(self, collection_id, seriesIds):
+        """
+        replace the series of an existing collection.
+
+        https://komga.org/docs/openapi/update-collection-by-id
         """
         try:
-            response = self.r.get(f"{self.base_url}/collections?search={name}")
+            response = self.r.patch(
+                f"{self.base_url}/collections/{collection_id}",
+                json={"seriesIds": seriesIds},
+            )
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error(f"出现错误: {e}")
-        collection = response.json()["content"]
-        if collection:
-            return collection[0]["id"]
-        else:
-            return None
+            return False
+        return response.status_code == 204
 
     def get_series_ids_by_collection_name(self, name):
         """
@@ -375,11 +621,6 @@ class KomgaApi:
         # return True if the status code indicates success, False otherwise
         return response.status_code == 204
 
-    def replace_collection(self, name, ordered, seriesIds):
-        id = self.get_collection_id_by_search_name(name)
-        if id is None or self.delete_collection(id):
-            return self.add_collection(name, ordered, seriesIds)
-
     def list_libraries(self) -> list:
         """
         The libraries are filtered based on the current user's permissions
@@ -395,21 +636,120 @@ class KomgaApi:
         else:
             return []
 
-    def list_collections(self) -> list:
+    def list_collections(self, search=None) -> list:
         """
         List collections
-        #FIXME 当前只返回前 20 个
+
+        分页获取全部收藏，每个收藏包含 seriesIds；任一页请求失败时返回 None
+        """
+        results = []
+        page = 0
+        while True:
+            params = {"page": page, "size": COLLECTION_PAGE_SIZE}
+            if search:
+                params["search"] = search
+            try:
+                response = self.r.get(f"{self.base_url}/collections", params=params)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"出现错误: {e}")
+                return None
+            data = response.json()
+            results.extend(data["content"])
+            page += 1
+            if page >= data.get("totalPages", 0):
+                return results
+
+    def get_collection(self, collection_id):
+        """
+        Retrieves one collection, including its seriesIds.
+
+        https://komga.org/docs/openapi/get-collection-by-id
         """
         try:
-            response = self.r.get(f"{self.base_url}/collections")
+            response = self.r.get(f"{self.base_url}/collections/{collection_id}")
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error(f"出现错误: {e}")
-        results = response.json()["content"]
-        if results:
-            return results
-        else:
-            return []
+            return None
+        return response.json()
+
+
+class SeriesRecord:
+    """
+    精简的 Komga 系列记录，仅保留刷新流程使用的字段
+    """
+
+    __slots__ = ("id", "name", "library_id", "last_modified", "metadata", "is_novel")
+
+    def __init__(
+        self,
+        id,
+        name,
+        library_id=None,
+        last_modified=None,
+        metadata=None,
+        is_novel=False,
+    ):
+        self.id = id
+        self.name = name
+        self.library_id = library_id
+        self.last_modified = last_modified
+        # 当前元数据，用于比较变化字段
+        self.metadata = metadata or {}
+        self.is_novel = is_novel
+
+    @classmethod
+    def from_json(cls, series):
+        metadata = series.get("metadata") or {}
+        return cls(
+            series["id"],
+            series["name"],
+            series.get("libraryId"),
+            series.get("lastModified"),
+            {
+                field: metadata[field]
+                for field in SERIES_METADATA_FIELDS
+                if field in metadata
+            },
+        )
+
+    @property
+    def links(self):
+        return self.metadata.get("links", [])
+
+
+class BookRecord:
+    """
+    精简的 Komga 书籍记录，仅保留刷新流程使用的字段
+    """
+
+    __slots__ = ("id", "name", "series_id", "metadata")
+
+    def __init__(self, id, name, series_id=None, metadata=None):
+        self.id = id
+        self.name = name
+        self.series_id = series_id
+        # 当前元数据，用于比较变化字段
+        self.metadata = metadata or {}
+
+    @classmethod
+    def from_json(cls, book):
+        metadata = book.get("metadata") or {}
+        return cls(
+            book["id"],
+            book["name"],
+            book.get("seriesId"),
+            {
+                field: metadata[field]
+                for field in BOOK_METADATA_FIELDS
+                if field in metadata
+            },
+        )
+
+    @property
+    def links(self):
+        return self.metadata.get("links", [])
 
 
 class SeriesMetadata:
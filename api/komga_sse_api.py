@@ -18,7 +18,7 @@ from threading import Thread, Lock
 from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from tools.log import logger
-from config.config import KOMGA_BASE_URL, KOMGA_EMAIL, KOMGA_EMAIL_PASSWORD, KOMGA_LIBRARY_LIST
+from config.config import KOMGA_BASE_URL, KOMGA_EMAIL, KOMGA_EMAIL_PASSWORD, KOMGA_LIBRARY_LIST, KOMGA_COLLECTION_LIST
 
 # 可配置的订阅事件类型
 RefreshEventType = ["SeriesAdded",
@@ -35,6 +35,14 @@ RefreshEventType = ["SeriesAdded",
                     # `BookImported` 我还没见过, 可能是我从来不用导入功能
                     # "BookImported"
                     ]
+# 用于维护系列与库/收藏对应关系的事件类型
+CatalogEventType = ["SeriesAdded",
+                    "SeriesChanged",
+                    "SeriesDeleted",
+                    "CollectionAdded",
+                    "CollectionChanged",
+                    "CollectionDeleted",
+                    ]
 # TODO: 修复已知bug
 # (等待复现方案) 观察到执行后有概率会自动退出，未输出错误信息
 
@@ -265,8 +273,8 @@ class KomgaSseClient:
             # 确保 json_data 是字典
             if not isinstance(json_data, dict):
                 raise Exception(f"事件数据不是有效的JSON格式")
-            # 事件过滤, 忽略refresh_event_type外的其他事件类型
-            if event_type in RefreshEventType:
+            # 事件过滤, 忽略refresh_event_type及catalog_event_type外的其他事件类型
+            if event_type in RefreshEventType or event_type in CatalogEventType:
                 self.on_event(event_type, json_data)
             else:
                 self.on_message(json_data)
@@ -285,6 +293,8 @@ class KomgaSseApi:
             base_url, username, password, api_key, timeout, retries)
 
         self.series_modified_callbacks = []
+        # 目录事件回调，在 SSE 线程中按事件顺序执行
+        self.catalog_callbacks = []
         # 保护回调列表的互斥访问
         self.series_callback_lock = Lock()
         # 记录 series_id 最后刷新时间
@@ -350,6 +360,12 @@ class KomgaSseApi:
                 self.series_modified_callbacks.append(callback)
                 logger.debug(f"已注册回调函数: {callback.__name__}")
 
+    def register_catalog_callback(self, callback):
+        """注册目录更新回调函数, 参数为 (event_type, event_data)"""
+        with self.series_callback_lock:
+            if callback not in self.catalog_callbacks:
+                self.catalog_callbacks.append(callback)
+
     def unregister_series_update_callback(self, callback):
         """取消注册回调函数"""
         with self.series_callback_lock:
@@ -408,12 +424,19 @@ class KomgaSseApi:
 
     def on_event(self, event_type, event_data):
         """订阅事件回调函数"""
+        if event_type in CatalogEventType:
+            for callback in list(self.catalog_callbacks):
+                try:
+                    callback(event_type, event_data)
+                except Exception as e:
+                    logger.error(f"更新目录出错 [{event_type}]: {e}")
         # 仅通知在 RefreshEventType 类型的事件
         if event_type in RefreshEventType:
             logger.debug(f"捕获订阅事件 [{event_type}]:{event_data}")
             library_id = event_data.get("libraryId")
             # 判断 KOMGA_LIBRARY_LIST 是否为空
-            if not KOMGA_LIBRARY_LIST:
+            # 配置了收藏时, 其他库中的系列也可能属于已配置的收藏, 交由回调函数判断
+            if not KOMGA_LIBRARY_LIST or KOMGA_COLLECTION_LIST:
                 pass
             # 在配置了KOMGA_LIBRARY_LIST时, 不通告 KOMGA_LIBRARY_LIST 外的库更改
             elif not any(library_id == lib["LIBRARY"] for lib in KOMGA_LIBRARY_LIST):
@@ -1,3 +1,4 @@
+import bisect
 import json
 import os
 import pickle
@@ -9,6 +10,7 @@ from datetime import datetime, timezone
 from threading import Lock
 from typing import Dict, List, Union
 from tools.log import logger
+from tools.normalize import to_simplified
 
 
 class IndexedDataReader:
@@ -46,6 +48,9 @@ class IndexedDataReader:
 
         self.file_path = dataFilePath
         self.index_path = f"{dataFilePath}.index"
+        # 名称键索引及其拼接串，按当前索引构建一次，索引变化时失效
+        self._name_key_cache = None
+        self._name_key_lock = Lock()
 
         # 标记初始化开始
         event = self._init_events[self.file_path]
@@ -61,6 +66,15 @@ class IndexedDataReader:
 
         logger.debug(f"初始化完成: {self.file_path}")
 
+    @property
+    def index(self):
+        return self._index
+
+    @index.setter
+    def index(self, value):
+        self._index = value
+        self._name_key_cache = None
+
     def _get_archive_update_timestamp(self) -> str:
         """获取 Archive 的更新时间戳，用于对比索引是否过期"""
         try:
@@ -265,6 +279,8 @@ class IndexedDataReader:
         except Exception as e:
             logger.error(f"保存索引失败: {e}")
             raise
+        # 重建后替换当前索引
+        self.index = index
         # 返回纯索引
         return index
 
@@ -286,6 +302,97 @@ class IndexedDataReader:
             logger.error(f"通过偏移量读取 Archive 数据失败: {e}")
         return results
 
+    def get_data_by_offsets(self, offsets: List[int]) -> Dict[int, dict]:
+        """
+        按偏移量批量读取, 返回 {offset: item}
+
+        偏移量排序后顺序读取, 一次打开 mmap 即可完成整批读取
+        """
+        results = {}
+        try:
+            with open(self.file_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for offset in sorted(set(offsets)):
+                        mm.seek(offset)
+                        line = mm.readline().decode('utf-8', errors='ignore')
+                        try:
+                            results[offset] = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+        except Exception as e:
+            logger.error(f"通过偏移量读取 Archive 数据失败: {e}")
+        return results
+
+    def _get_name_key_cache(self):
+        """
+        获取名称键索引及其拼接串, 首次调用时构建, 之后复用直到索引变化
+        """
+        cache = self._name_key_cache
+        if cache is not None:
+            return cache
+        with self._name_key_lock:
+            if self._name_key_cache is not None:
+                return self._name_key_cache
+            index = self.index
+            name_keys: Dict[str, List[int]] = {}
+            for field in ["name", "name_cn", "name_cn_infobox", "aliases_infobox"]:
+                for key, offsets in index.get(field, {}).items():
+                    key_str = str(key).lower()
+                    if not key_str:
+                        continue
+                    name_keys.setdefault(key_str, []).extend(offsets)
+                    # 每个键只转换一次，不经过共享缓存
+                    simplified = to_simplified(key_str, cached=False)
+                    if simplified != key_str:
+                        name_keys.setdefault(simplified, []).extend(offsets)
+            keys = list(name_keys)
+            # 每个键在拼接串中的起始位置，用于将命中位置映射回键
+            starts = []
+            position = 0
+            for key in keys:
+                starts.append(position)
+                position += len(key) + 1
+            cache = (name_keys, keys, starts, "\n".join(keys))
+            # 构建期间索引被替换时不保存过期结果
+            if index is self.index:
+                self._name_key_cache = cache
+            return cache
+
+    def get_name_key_index(self) -> Dict[str, List[int]]:
+        """
+        汇总名称类字段(name, name_cn, name_cn_infobox, aliases_infobox)的索引,
+        返回 {小写名称: [偏移量, ...]}，用于精确命中及批量子串检索
+
+        繁体名称额外登记其简体形式，使简繁不同的写法都能命中; 结果在实例上复用, 调用方不应修改
+        """
+        return self._get_name_key_cache()[0]
+
+    def get_offsets_by_queries(self, search_terms: List[str]) -> Dict[str, List[int]]:
+        """
+        批量全文子串检索, 返回 {search_term: [偏移量, ...]}
+
+        在全部名称键拼接成的字符串中逐个 find, 只需遍历一次索引键,
+        避免每个检索词都在 Python 层循环全部索引键
+        """
+        name_keys, keys, starts, blob = self._get_name_key_cache()
+        results: Dict[str, List[int]] = {}
+        for term in search_terms:
+            term_lower = term.lower()
+            if not term_lower or term_lower in results:
+                continue
+            matching_offsets = set()
+            for variant in {term_lower, to_simplified(term_lower)}:
+                pos = blob.find(variant)
+                while pos != -1:
+                    key_index = bisect.bisect_right(starts, pos) - 1
+                    matching_offsets.update(name_keys[keys[key_index]])
+                    # 同一个键只需命中一次，直接跳到下一个键
+                    if key_index + 1 >= len(starts):
+                        break
+                    pos = blob.find(variant, starts[key_index + 1])
+            results[term_lower] = list(matching_offsets)
+        return {term: results.get(term.lower(), []) for term in search_terms}
+
     def get_data_by_query(self, *args, **query: Union[int, str]) -> List[dict]:
         """
         支持多字段联合查询：
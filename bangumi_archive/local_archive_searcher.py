@@ -1,6 +1,7 @@
 import re
 import json
 from tools.log import logger
+from tools.normalize import to_simplified
 from bangumi_archive.local_archive_indexed_reader import IndexedDataReader
 
 
@@ -89,6 +90,40 @@ def _search_line_batch_optimized(
     return None
 
 
+def search_lines(file_path: str, subject_ids, target_field: str):
+    """
+    批量单行数据搜索, 返回 {subject_id: 对象}, 首选索引模式一次读取整批数据, 索引失效时逐个回退
+    """
+    subject_ids = list(dict.fromkeys(subject_ids))
+    results = {}
+    try:
+        indexed_data = IndexedDataReader(file_path)
+        field_index = indexed_data.index.get(target_field, {})
+        offsets = {
+            subject_id: field_index[subject_id][0]
+            for subject_id in subject_ids
+            if subject_id in field_index
+        }
+        items = indexed_data.get_data_by_offsets(list(offsets.values()))
+        results = {
+            subject_id: items[offset]
+            for subject_id, offset in offsets.items()
+            if offset in items
+        }
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.debug(f"索引异常: {str(e)}，触发回退")
+    except Exception as e:
+        logger.debug(f"未知异常: {str(e)}")
+
+    # 索引未命中的条目逐个回退查询
+    for subject_id in subject_ids:
+        if subject_id not in results:
+            item = search_line(file_path, subject_id, target_field)
+            if item:
+                results[subject_id] = item
+    return results
+
+
 def search_list(
     file_path: str, subject_id: int, target_field: str
 ):
@@ -260,6 +295,107 @@ def _search_all_data_batch_optimized(file_path: str, query: str, batch_size: int
     return results
 
 
+def search_all_data_many(file_path: str, queries, is_resolved=None):
+    """
+    批量全量数据搜索, 返回 {query: [type==1 的对象, ...]}
+
+    首选索引模式: 先按名称精确命中, 经 is_resolved(query, items) 判定仍未解决的 query
+    再统一做一次子串候选检索; 索引失效或未命中的 query 回退到单次遍历文件的批量模式
+    """
+    queries = list(dict.fromkeys(q for q in queries if q))
+    if not queries:
+        return {}
+    results = {}
+    try:
+        results = _search_all_data_many_with_index(file_path, queries, is_resolved)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.debug(f"索引异常: {str(e)}，触发回退")
+    except Exception as e:
+        logger.debug(f"未知异常: {str(e)}")
+    missed = [query for query in queries if not results.get(query)]
+    if missed:
+        logger.debug(f"索引全量搜索未命中 {len(missed)} 个, 回退到批量查询模式")
+        results.update(_search_all_data_many_batch_optimized(file_path, missed))
+    return results
+
+
+def _search_all_data_many_with_index(file_path: str, queries, is_resolved=None):
+    """
+    使用索引读取器批量返回每个 query 对应的 type==1 对象列表
+    """
+    indexed_data = IndexedDataReader(file_path)
+    name_keys = indexed_data.get_name_key_index()
+
+    def _load(offsets_by_query):
+        # 所有 query 的偏移量合并后一次读取，相同条目只解析一次
+        items = indexed_data.get_data_by_offsets(
+            [o for offsets in offsets_by_query.values() for o in offsets]
+        )
+        return {
+            query: [
+                items[o] for o in offsets
+                if o in items and items[o].get("type") == 1
+            ]
+            for query, offsets in offsets_by_query.items()
+        }
+
+    # 精确命中
+    results = _load(
+        {
+            query: name_keys.get(query.lower()) or name_keys.get(
+                to_simplified(query.lower()), [])
+            for query in queries
+        }
+    )
+    pending = [
+        query for query in queries
+        if not results[query] or (is_resolved and not is_resolved(query, results[query]))
+    ]
+    logger.debug(f"Archive 精确命中 {len(queries) - len(pending)} 个, 待检索 {len(pending)} 个")
+
+    # 对剩余 query 统一做一次子串候选检索
+    if pending:
+        results.update(
+            _load(indexed_data.get_offsets_by_queries(pending)))
+    return results
+
+
+def _search_all_data_many_batch_optimized(file_path: str, queries, batch_size: int = 1000):
+    """
+    单次遍历Archive文件，返回每个 query 对应的包含 query 且 type==1 的对象列表
+    """
+    results = {query: [] for query in queries}
+    query_bytes = [(query, query.encode()) for query in queries]
+    try:
+        with open(file_path, "rb") as f:
+            while True:
+                lines = []
+                for _ in range(batch_size):
+                    line = f.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+                if not lines:
+                    break
+
+                for line in lines:
+                    matched = [query for query, qb in query_bytes if qb in line]
+                    if not matched:
+                        continue
+                    try:
+                        item = json.loads(line.decode("utf-8"))
+                    except json.JSONDecodeError:
+                        continue
+                    if item.get("type", 0) == 1:
+                        for query in matched:
+                            results[query].append(item)
+    except FileNotFoundError:
+        logger.error(f"Archive 文件未找到: {file_path}")
+    except Exception as e:
+        logger.error(f"读取 Archive 发生错误: {str(e)}")
+    return results
+
+
 def parse_infobox(infobox_str):
     """解析infobox模板字符串"""
     infobox = []
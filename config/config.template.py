@@ -7,6 +7,15 @@
 # @@version: 0.1
 BANGUMI_ACCESS_TOKEN = ''
 
+# @@name: BANGUMI_API_CONCURRENCY
+# @@prompt: Bangumi API 最大并发请求数
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 批量搜索及获取元数据时同时进行的请求数，大于 1 时使用异步客户端，置为 1 表示逐个请求。请求速率仍受限流约束
+# @@version: 0.20.0
+BANGUMI_API_CONCURRENCY = 4
+
 
 # @@name: KOMGA_BASE_URL
 # @@prompt: KOMGA访问地址
@@ -51,6 +60,15 @@ KOMGA_LIBRARY_LIST = []
 # @@version: 0.18.0
 KOMGA_COLLECTION_LIST = []
 
+# @@name: KOMGA_WRITE_CONCURRENCY
+# @@prompt: Komga 元数据写入的最大并发数
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 不同系列的元数据及封面写入同时进行的请求数，同一系列的写入按顺序执行，置为 1 表示逐个写入
+# @@version: 0.20.0
+KOMGA_WRITE_CONCURRENCY = 4
+
 
 # @@name: USE_BANGUMI_ARCHIVE
 # @@prompt: 是否启用本地离线元数据
@@ -79,6 +97,97 @@ ARCHIVE_FILES_DIR = "./archivedata/"
 # @@version: 0.13.0
 ARCHIVE_UPDATE_INTERVAL = 168
 
+# @@name: ARCHIVE_HEDGE_DELAY
+# @@prompt: 离线元数据对冲等待时间
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 单位为毫秒的整数值, 离线元数据在该时间内未返回结果时同时请求 Bangumi API 并采用先返回的结果。置为 0 表示依次请求
+# @@version: 0.20.0
+ARCHIVE_HEDGE_DELAY = 0
+
+# @@name: ARCHIVE_MISS_CACHE_TTL
+# @@prompt: 离线元数据缺失记录有效期
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 单位为小时的整数值, 有效期内离线元数据中缺少的条目直接在线获取, 离线元数据更新后记录失效。置为 0 表示不记录
+# @@version: 0.20.0
+ARCHIVE_MISS_CACHE_TTL = 24
+
+# @@name: CACHE_FILES_DIR
+# @@prompt: 本地缓存目录
+# @@type: string
+# @@required: False
+# @@validator:
+# @@info: 保存 Bangumi 封面等缓存文件的目录
+# @@version: 0.20.0
+CACHE_FILES_DIR = "./cache/"
+
+# @@name: THUMBNAIL_CACHE_MAX_SIZE
+# @@prompt: 封面缓存容量上限
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 单位为 MB 的整数值, 超出后淘汰最久未使用的封面。置为 0 表示不缓存封面
+# @@version: 0.20.0
+THUMBNAIL_CACHE_MAX_SIZE = 512
+
+# @@name: BANGUMI_API_CACHE_FRESHNESS
+# @@prompt: Bangumi API 响应缓存新鲜期
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 单位为小时的整数值, 新鲜期内直接使用缓存的条目及关联条目, 过期后以条件请求验证。置为 0 表示每次都重新验证
+# @@version: 0.20.0
+BANGUMI_API_CACHE_FRESHNESS = 24
+
+# @@name: DATA_SOURCE_CACHE_BACKEND
+# @@prompt: 数据源缓存后端
+# @@type: string
+# @@required: False
+# @@validator:
+# @@info: 可选值：'none', 'memory', 'sqlite'。memory 为进程内缓存，sqlite 缓存保存在 CACHE_FILES_DIR 中，重启后仍然有效
+# @@allowed_values: none, memory, sqlite
+# @@version: 0.20.0
+DATA_SOURCE_CACHE_BACKEND = "memory"
+
+# @@name: DATA_SOURCE_CACHE_MAX_ENTRIES
+# @@prompt: 内存缓存条目上限
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: DATA_SOURCE_CACHE_BACKEND 为 memory 时缓存的最大条目数，超出后淘汰最久未使用的条目
+# @@version: 0.20.0
+DATA_SOURCE_CACHE_MAX_ENTRIES = 4096
+
+# @@name: DATA_SOURCE_CACHE_TTL
+# @@prompt: 条目元数据缓存有效期
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 单位为小时的整数值, 用于条目元数据及关联条目。置为 0 表示不缓存
+# @@version: 0.20.0
+DATA_SOURCE_CACHE_TTL = 24
+
+# @@name: SEARCH_CACHE_TTL
+# @@prompt: 搜索结果缓存有效期
+# @@type: integer
+# @@required: False
+# @@validator:
+# @@info: 单位为小时的整数值, 置为 0 表示不缓存搜索结果
+# @@version: 0.20.0
+SEARCH_CACHE_TTL = 6
+
+# @@name: WARM_UP_CACHE_ON_START
+# @@prompt: 启动时预热缓存
+# @@type: boolean
+# @@required: False
+# @@validator:
+# @@info: 以 poll 或 sse 方式运行时，在后台预取已匹配条目的元数据及关联条目
+# @@version: 0.20.0
+WARM_UP_CACHE_ON_START = True
+
 # @@name: BANGUMI_KOMGA_SERVICE_TYPE
 # @@prompt: BangumiKomga 服务运行方式
 # @@type: string
@@ -165,7 +274,7 @@ RECHECK_FAILED_BOOKS = False
 # @@type: boolean
 # @@required: False
 # @@validator:
-# @@info: 置为`True`时，程序会在刷新完成后，将**本次**刷新失败的系列添加到指定收藏（默认名：`FAILED_COLLECTION`）。
+# @@info: 置为`True`时，程序会在刷新完成后，将刷新失败的系列添加到指定收藏（默认名：`FAILED_COLLECTION`），并移除已刷新成功的系列。
 # @@version: 0.1
 CREATE_FAILED_COLLECTION = False
 
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*- #
+# ------------------------------------------------------------------
+# Description: 服务启动时根据刷新记录预热数据源缓存
+# ------------------------------------------------------------------
+
+import threading
+from tools.log import logger
+
+# 每批预取的条目数
+WARM_UP_BATCH_SIZE = 50
+
+
+def _parse_subject_ids(rows):
+    subject_ids = []
+    for (subject_id,) in rows:
+        try:
+            subject_ids.append(int(subject_id))
+        except (TypeError, ValueError):
+            continue
+    return list(dict.fromkeys(subject_ids))
+
+
+def load_refreshed_subject_ids(cursor):
+    """
+    读取已匹配成功的系列及单册 subject_id，最近刷新的在前
+    """
+    series_subject_ids = _parse_subject_ids(
+        cursor.execute(
+            "SELECT subject_id FROM refreshed_series WHERE update_success = 1 ORDER BY refresh_time DESC"
+        ).fetchall()
+    )
+    book_subject_ids = _parse_subject_ids(
+        cursor.execute(
+            "SELECT subject_id FROM refreshed_books WHERE update_success = 1 ORDER BY refresh_time DESC"
+        ).fetchall()
+    )
+    return series_subject_ids, book_subject_ids
+
+
+def _select_subject_ids(series_ids, subject_ids, max_entries=None):
+    """
+    按顺序选取不超过缓存容量的条目，系列条目同时占用元数据及关联条目两项缓存
+    """
+    if max_entries is None:
+        return list(subject_ids)
+    selected = []
+    entries = 0
+    for subject_id in subject_ids:
+        entries += 2 if subject_id in series_ids else 1
+        if entries > max_entries:
+            break
+        selected.append(subject_id)
+    return selected
+
+
+def warm_up_cache(bgm, series_subject_ids, book_subject_ids, max_entries=None):
+    """
+    预取系列元数据、关联条目及单册元数据
+
+    批量方法优先读取离线数据，其余条目在线获取，在线请求受同一限流器约束。
+    提供 max_entries 时仅预取最近刷新的、不超过缓存容量的条目；
+    条目按从旧到新的顺序写入，最近刷新的条目最后被 LRU 淘汰
+    """
+    series_ids = set(series_subject_ids)
+    subject_ids = _select_subject_ids(
+        series_ids,
+        dict.fromkeys(list(series_subject_ids) + list(book_subject_ids)),
+        max_entries,
+    )
+    subject_ids.reverse()
+    logger.info(
+        "开始预热缓存: %s 个系列, %s 个条目",
+        len(series_ids.intersection(subject_ids)),
+        len(subject_ids),
+    )
+    for start in range(0, len(subject_ids), WARM_UP_BATCH_SIZE):
+        batch = subject_ids[start: start + WARM_UP_BATCH_SIZE]
+        bgm.get_subjects_metadata(batch)
+        for subject_id in batch:
+            if subject_id in series_ids:
+                bgm.get_related_subjects(subject_id)
+    logger.info("缓存预热完成")
+
+
+def start_cache_warm_up(bgm, cursor, max_entries=None):
+    """
+    在后台线程中预热缓存，返回该线程
+
+    max_entries 为缓存容量，不提供时不限制预取条目数
+    """
+    # 在当前线程读取记录，避免与刷新任务并发使用同一数据库连接
+    series_subject_ids, book_subject_ids = load_refreshed_subject_ids(cursor)
+    if not series_subject_ids and not book_subject_ids:
+        return None
+
+    def _run():
+        try:
+            warm_up_cache(bgm, series_subject_ids, book_subject_ids, max_entries)
+        except Exception as e:
+            logger.warning(f"缓存预热失败: {e}")
+
+    thread = threading.Thread(target=_run, daemon=True, name="CacheWarmUp")
+    thread.start()
+    return thread
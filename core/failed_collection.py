@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*- #
+# ------------------------------------------------------------------
+# Description: 根据刷新结果增量更新失败收藏
+# ------------------------------------------------------------------
+
+from tools.log import logger
+from tools.db import (
+    get_failed_series_ids,
+    get_failed_collection_series,
+    list_failed_collection_series,
+    update_failed_collection_series,
+)
+
+
+def update_failed_collection(komga, conn, series_ids, collection_name="FAILED_COLLECTION"):
+    """
+    根据本次刷新的系列增量更新失败收藏
+
+    数据库记录已加入收藏的系列及加入顺序，仅在有系列状态变化时更新收藏：
+    新失败的系列追加到收藏末尾，已刷新成功的系列从收藏中移除。
+    收藏不存在(如在 Komga 中被删除)时按数据库记录的顺序重建
+    """
+    # TODO: 匹配错误的系列其update_success也是1, 需要找到一种方法将之筛选出来
+    failed_ids = get_failed_series_ids(conn, series_ids)
+    tracked_ids = get_failed_collection_series(conn, series_ids)
+    # 按本次刷新的顺序追加
+    added_ids = [
+        series_id
+        for series_id in dict.fromkeys(series_ids)
+        if series_id in failed_ids and series_id not in tracked_ids
+    ]
+    removed_ids = tracked_ids - failed_ids
+
+    collections = komga.list_collections(search=collection_name)
+    if collections is None:
+        logger.error("获取收藏失败: %s, 本次不更新收藏", collection_name)
+        return
+    collection = next(
+        (item for item in collections if item["name"] == collection_name), None
+    )
+    if collection:
+        if not added_ids and not removed_ids:
+            return
+        current_ids = collection.get("seriesIds", [])
+        # 同时移除收藏中本次已刷新成功的系列
+        removed_ids |= (set(series_ids) & set(current_ids)) - failed_ids
+    else:
+        current_ids = list_failed_collection_series(conn)
+        if current_ids:
+            logger.info("未找到收藏: %s, 以数据库记录重建", collection_name)
+    new_ids = [series_id for series_id in current_ids if series_id not in removed_ids]
+    existing_ids = set(new_ids)
+    new_ids += [series_id for series_id in added_ids if series_id not in existing_ids]
+
+    if collection is None:
+        is_success = not new_ids or komga.add_collection(
+            collection_name, False, new_ids)
+    elif new_ids:
+        is_success = komga.update_collection(collection["id"], new_ids)
+    else:
+        is_success = komga.delete_collection(collection["id"])
+
+    if is_success:
+        update_failed_collection_series(conn, added_ids, removed_ids)
+        if added_ids or removed_ids or (collection is None and new_ids):
+            logger.info(
+                "更新收藏: %s, 新增 %s 个, 移除 %s 个",
+                collection_name,
+                len(added_ids),
+                len(removed_ids),
+            )
+    else:
+        logger.error("更新收藏失败: %s", collection_name)
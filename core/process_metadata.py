@@ -258,14 +258,17 @@ def _set_local_version(komga_metadata, manga_filename):
                 return
 
 
-def set_komga_series_metadata(bangumi_metadata, manga_filename, bgm):
+def set_komga_series_metadata(bangumi_metadata, manga_filename, bgm, subject_relations=None):
     """
     获取漫画系列元数据
+
+    subject_relations 为 None 时从 bgm 获取关联条目
     """
     # init
     komga_series_metadata = SeriesMetadata()
 
-    subject_relations = bgm.get_related_subjects(bangumi_metadata["id"])
+    if subject_relations is None:
+        subject_relations = bgm.get_related_subjects(bangumi_metadata["id"])
 
     # link
     _set_links(komga_series_metadata, bangumi_metadata, subject_relations)
@@ -310,9 +313,11 @@ def set_komga_series_metadata(bangumi_metadata, manga_filename, bgm):
     return komga_series_metadata
 
 
-def set_komga_book_metadata(subject_id, number, name, bgm):
+def set_komga_book_metadata(subject_id, number, name, bgm, bangumi_metadata=None, subject_relations=None):
     """
     获取漫画单册元数据
+
+    bangumi_metadata、subject_relations 为 None 时从 bgm 获取
     """
 
     komga_book_metadata = BookMetadata()
@@ -323,11 +328,13 @@ def set_komga_book_metadata(subject_id, number, name, bgm):
     # title 暂不做修改
     komga_book_metadata.title = name
 
-    bangumi_metadata = bgm.get_subject_metadata(subject_id)
+    if bangumi_metadata is None:
+        bangumi_metadata = bgm.get_subject_metadata(subject_id)
     if not bangumi_metadata:
         return komga_book_metadata
 
-    subject_relations = bgm.get_related_subjects(subject_id)
+    if subject_relations is None:
+        subject_relations = bgm.get_related_subjects(subject_id)
     # link
     _set_links(komga_book_metadata, bangumi_metadata, subject_relations)
     # summary
@@ -1,107 +1,233 @@
+import hashlib
 import os
-from api.bangumi_model import SubjectRelation
+import requests
+from concurrent.futures import wait
 from tools.get_title import ParseTitle
 import core.process_metadata as process_metadata
+from core.subject_context import SubjectContext
+from core.series_catalog import SeriesCatalog
+from core.failed_collection import update_failed_collection
 from time import strftime, localtime
-from tools.get_number import get_number, NumberType
+from tools.get_number import get_number, get_numbers, NumberType
 from tools.env import *
 from tools.log import logger
 from tools.notification import send_notification
-from tools.db import init_sqlite3, record_series_status, record_book_status
+from tools.db import (
+    init_sqlite3,
+    record_series_status,
+    record_book_status,
+    get_uploaded_thumbnail,
+    record_uploaded_thumbnail,
+    get_series_watermark,
+    save_series_watermark,
+    get_series_records,
+    get_book_records,
+)
+from tools.keyed_executor import KeyedExecutor
+from api.komga_api import BookRecord, SeriesRecord
 from tools.cache_time import TimeCacheManager
+from tools.slide_window_rate_limiter import get_shared_limiter_metrics
 
 
 env = InitEnv()
 bgm = env.bgm
 komga = env.komga
 cursor, conn = init_sqlite3()
+# Komga 写入线程池，同一系列的写入按顺序执行
+write_executor = KeyedExecutor(KOMGA_WRITE_CONCURRENCY, "KomgaWriter")
+# 系列与库/收藏的对应关系
+series_catalog = SeriesCatalog(komga)
 
 
 def refresh_metadata(series_list=None):
     """
     刷新书籍系列元数据
     """
-    if not series_list:
-        series_list = get_series_metadata()
+    # 记录系列列表是否获取完整
+    scan = {"complete": True}
+    if series_list:
+        series_batches = [series_list]
+    else:
+        series_batches = _iter_series_batches(scan)
 
     parse_title = ParseTitle()
 
-    # 批量获取所有series_id
-    series_ids = [series["id"] for series in series_list]
-    # 执行一次查询获取所有series_id对应的记录
-    series_records = cursor.execute(
-        "SELECT * FROM refreshed_series WHERE series_id IN ({})".format(
-            ",".join("?" for _ in series_ids)
-        ),
-        series_ids,
-    ).fetchall()
-
+    series_ids = []
+    # 本次刷新提交的写入任务
+    write_futures = []
     success_count = 0
     failed_count = 0
     success_comic = ""
     failed_comic = ""
 
-    # Loop through each book series
-    for series in series_list:
-        series_id = series["id"]
-        series_name = series["name"]
-        is_novel_series = series["is_novel"]
-
-        # 若存在 Correct Bgm Link (CBL) 则获取其中的 subject_id
-        subject_id = None
-        force_refresh_flag = False
-        for link in series["metadata"]["links"]:
-            if link["label"].lower() == "cbl":
-                subject_id = int(link["url"].split("/")[-1])
-                logger.debug("将 cbl %s 匹配于 %s", subject_id, series_name)
-                # 从 bangumi 获取系列元数据
-                metadata = bgm.get_subject_metadata(subject_id)
-                force_refresh_flag = True
-                break
-
-        if not force_refresh_flag:
-            # 找到对应的series_record
-            series_record = next(
-                (record for record in series_records if record[0] == series_id), None
-            )
-            # series_record=c.execute("SELECT * FROM refreshed_series WHERE series_id=?", (series_id,)).fetchone()
-            # 检查系列是否已匹配
-            if series_record:
-                if series_record[2] == 1:
-                    subject_id = cursor.execute(
-                        "SELECT subject_id FROM refreshed_series WHERE series_id=?",
-                        (series_id,),
-                    ).fetchone()[0]
-                    refresh_book_metadata(
-                        subject_id, series_id, force_refresh_flag)
-                    continue
+    # 按批处理系列，处理当前批次时后台继续获取下一页
+    for series_batch in series_batches:
+        batch_series_ids = [series.id for series in series_batch]
+        for series in series_batch:
+            series_catalog.record_series(series.id, series.library_id)
+        series_ids.extend(batch_series_ids)
+        # 执行一次查询获取本批series_id对应的记录
+        series_records = get_series_records(conn, batch_series_ids)
+
+        # 批量搜索本批需要匹配的系列
+        search_results_map = _batch_search_series(
+            series_batch, series_records, parse_title)
+
+        # 一次查询获取本批需要刷新书籍的系列的所有书籍，跳过的失败系列除外
+        skipped_series_ids = set()
+        if not RECHECK_FAILED_SERIES:
+            skipped_series_ids = {
+                record[0] for record in series_records if record[2] == 0
+            }
+        books_map = komga.get_books_for_series(
+            [
+                series_id
+                for series_id in batch_series_ids
+                if series_id not in skipped_series_ids
+            ]
+        )
 
-                # recheck or skip failed series
-                elif series_record[2] == 0 and not RECHECK_FAILED_SERIES:
-                    logger.debug("跳过刮削失败的系列: %s", series_name)
+        # Loop through each book series
+        for series in series_batch:
+            series_id = series.id
+            series_name = series.name
+
+            # 若存在 Correct Bgm Link (CBL) 则获取其中的 subject_id
+            subject_id = None
+            force_refresh_flag = False
+            for link in series.links:
+                if link["label"].lower() == "cbl":
+                    subject_id = int(link["url"].split("/")[-1])
+                    logger.debug("将 cbl %s 匹配于 %s", subject_id, series_name)
+                    # 从 bangumi 获取系列元数据
+                    metadata = bgm.get_subject_metadata(subject_id)
+                    force_refresh_flag = True
+                    break
+
+            if not force_refresh_flag:
+                # 找到对应的series_record
+                series_record = next(
+                    (record for record in series_records if record[0] == series_id), None
+                )
+                # series_record=c.execute("SELECT * FROM refreshed_series WHERE series_id=?", (series_id,)).fetchone()
+                # 检查系列是否已匹配
+                if series_record:
+                    if series_record[2] == 1:
+                        subject_id = series_record[1]
+                        write_futures += refresh_book_metadata(
+                            SubjectContext(bgm, subject_id),
+                            series_id,
+                            force_refresh_flag,
+                            books_map.get(series_id),
+                        )
+                        continue
+
+                    # recheck or skip failed series
+                    elif series_record[2] == 0 and not RECHECK_FAILED_SERIES:
+                        logger.debug("跳过刮削失败的系列: %s", series_name)
+                        continue
+
+            # 使用 bangumi API 搜索 komga 中系列标题
+            if subject_id == None:
+                title, search_results = search_results_map.get(
+                    series_id, (None, []))
+                if title == None:
+                    failed_count, failed_comic = record_series_status(
+                        conn,
+                        series_id,
+                        subject_id,
+                        0,
+                        series_name,
+                        "None",
+                        failed_count,
+                        failed_comic,
+                    )
+                    continue
+                if search_results is None:
+                    # 请求失败并非无匹配条目，不记录状态，下次刷新时重新搜索
+                    logger.warning("搜索请求失败, 将在下次刷新时重试: %s", series_name)
                     continue
+                if len(search_results) > 0:
+                    subject_id = search_results[0]["id"]
+                    metadata = search_results[0]
+                else:
+                    failed_count, failed_comic = record_series_status(
+                        conn,
+                        series_id,
+                        subject_id,
+                        0,
+                        series_name,
+                        "no subject in bangumi",
+                        failed_count,
+                        failed_comic,
+                    )
+                    continue
+
+            if not metadata:
+                logger.warning("无法获取元数据: %s", series_name)
+                continue
+
+            # 本次刷新共用的系列条目上下文
+            subject_context = SubjectContext(bgm, subject_id, metadata)
 
-        # 使用 bangumi API 搜索 komga 中系列标题
-        if subject_id == None:
-            logger.debug("在 Bangumi 中搜索: %s ", series_name)
-            title = parse_title.get_title(series_name)
-            if title == None:
+            komga_metadata = process_metadata.set_komga_series_metadata(
+                metadata, series_name, bgm, subject_context.related_subjects
+            )
+
+            if komga_metadata.isvalid == False:
                 failed_count, failed_comic = record_series_status(
                     conn,
                     series_id,
                     subject_id,
                     0,
                     series_name,
-                    "None",
+                    komga_metadata.title + " metadata invalid",
                     failed_count,
                     failed_comic,
                 )
                 continue
-            search_results = bgm.search_subjects(
-                title, FUZZ_SCORE_THRESHOLD, is_novel_series)
-            if len(search_results) > 0:
-                subject_id = search_results[0]["id"]
-                metadata = search_results[0]
+
+            series_data = {
+                "status": komga_metadata.status,
+                "summary": komga_metadata.summary,
+                "publisher": komga_metadata.publisher,
+                "genres": komga_metadata.genres,
+                "tags": komga_metadata.tags,
+                "title": komga_metadata.title,
+                "alternateTitles": komga_metadata.alternateTitles,
+                "ageRating": komga_metadata.ageRating,
+                "links": komga_metadata.links,
+                "totalBookCount": komga_metadata.totalBookCount,
+                "language": komga_metadata.language,
+                "titleSort": komga_metadata.titleSort,
+            }
+
+            # Update the metadata for the series on komga
+            # 仅发送与 Komga 当前元数据不同的字段
+            is_success = komga.update_series_metadata(
+                series_id, series_data, series.metadata
+            )
+            if is_success:
+                success_count, success_comic = record_series_status(
+                    conn,
+                    series_id,
+                    subject_id,
+                    1,
+                    series_name,
+                    komga_metadata.title,
+                    success_count,
+                    success_comic,
+                )
+                # 使用 Bangumi 图片替换原封面，与该系列的其他写入按顺序执行
+                if USE_BANGUMI_THUMBNAIL:
+                    write_futures.append(write_executor.submit(
+                        series_id,
+                        replace_thumbnail,
+                        "series",
+                        series_id,
+                        series_name,
+                        metadata,
+                    ))
             else:
                 failed_count, failed_comic = record_series_status(
                     conn,
@@ -109,131 +235,35 @@ def refresh_metadata(series_list=None):
                     subject_id,
                     0,
                     series_name,
-                    "no subject in bangumi",
+                    "komga update failed",
                     failed_count,
                     failed_comic,
                 )
                 continue
 
-        if not metadata:
-            logger.warning("无法获取元数据: %s", series_name)
-            continue
-
-        komga_metadata = process_metadata.set_komga_series_metadata(
-            metadata, series_name, bgm
-        )
-
-        if komga_metadata.isvalid == False:
-            failed_count, failed_comic = record_series_status(
-                conn,
-                series_id,
-                subject_id,
-                0,
-                series_name,
-                komga_metadata.title + " metadata invalid",
-                failed_count,
-                failed_comic,
+            write_futures += refresh_book_metadata(
+                subject_context, series_id, force_refresh_flag, books_map.get(series_id)
             )
-            continue
 
-        series_data = {
-            "status": komga_metadata.status,
-            "summary": komga_metadata.summary,
-            "publisher": komga_metadata.publisher,
-            "genres": komga_metadata.genres,
-            "tags": komga_metadata.tags,
-            "title": komga_metadata.title,
-            "alternateTitles": komga_metadata.alternateTitles,
-            "ageRating": komga_metadata.ageRating,
-            "links": komga_metadata.links,
-            "totalBookCount": komga_metadata.totalBookCount,
-            "language": komga_metadata.language,
-            "titleSort": komga_metadata.titleSort,
-        }
-
-        # Update the metadata for the series on komga
-        is_success = komga.update_series_metadata(series_id, series_data)
-        if is_success:
-            success_count, success_comic = record_series_status(
-                conn,
-                series_id,
-                subject_id,
-                1,
-                series_name,
-                komga_metadata.title,
-                success_count,
-                success_comic,
-            )
-            # 使用 Bangumi 图片替换原封面
-            # 确保没有上传过海报，避免重复上传
-            if (
-                USE_BANGUMI_THUMBNAIL
-                and len(komga.get_series_thumbnails(series_id)) == 0
-            ):
-                # 尝试多尺寸海报上传
-                for thumbnail_size in ['large', 'common', 'medium']:
-                    # 获取当前尺寸的封面
-                    thumbnail = bgm.get_subject_thumbnail(
-                        metadata, image_size=thumbnail_size)
-
-                    # 尝试更新封面
-                    replace_thumbnail_result = komga.update_series_thumbnail(
-                        series_id, thumbnail)
-
-                    if replace_thumbnail_result:
-                        logger.debug("成功替换系列: %s 的海报", series_name)
-                        # 成功则跳出海报更新循环
-                        break
-                    else:
-                        logger.debug(
-                            "以尺寸 %s 替换系列: %s 的海报失败，正在尝试下一个尺寸...",
-                            thumbnail_size,
-                            series_name,
-                        )
-                # 所有尺寸都失败时
-                else:
-                    logger.warning("替换系列: %s 的海报失败", series_name)
-        else:
-            failed_count, failed_comic = record_series_status(
-                conn,
-                series_id,
-                subject_id,
-                0,
-                series_name,
-                "komga update failed",
-                failed_count,
-                failed_comic,
-            )
-            continue
-
-        refresh_book_metadata(subject_id, series_id, force_refresh_flag)
+    # 仅等待本次刷新提交的写入完成，不受其他并发刷新的写入影响
+    wait(write_futures)
 
     # 将匹配失败的系列加入收藏 FAILED_COLLECTION
-    if CREATE_FAILED_COLLECTION:
-        collection_name = "FAILED_COLLECTION"
-
-        # TODO: 匹配错误的系列其update_success也是1, 需要找到一种方法将之筛选出来
-
-        # 将db中update_success为0的series_ids筛选出来
-        all_failed_series_ids = [
-            row[0]
-            for row in cursor.execute(
-                "SELECT series_id FROM refreshed_series WHERE update_success = 0 and series_id IN ({})".format(
-                    ",".join("?" for _ in series_ids)
-                ),
-                series_ids,
-            ).fetchall()
-        ]
-        # 用 all_failed_series_ids 创建 FAILED_COLLECTION
-        if all_failed_series_ids:
-            if komga.replace_collection(collection_name, False, all_failed_series_ids):
-                logger.info("成功替换收藏: %s", collection_name)
-            else:
-                logger.error("替换收藏失败: %s", collection_name)
+    if not scan["complete"]:
+        logger.warning("系列列表获取不完整, 本次不更新收藏: FAILED_COLLECTION")
+    elif CREATE_FAILED_COLLECTION:
+        update_failed_collection(komga, conn, series_ids)
 
     logger.info(
         "执行完成! 刮削成功: %s 个, 刮削失败: %s 个", success_count, failed_count
     )
+    for scope, metrics in get_shared_limiter_metrics().items():
+        logger.info(
+            "%s 当前请求速率: %.0f 次/分钟, 累计限流: %s 次",
+            scope,
+            metrics["rate_per_minute"],
+            metrics["throttled_count"],
+        )
     send_notification(
         "已完成刷新！",
         "<font color='green'>已成功刷新："
@@ -250,151 +280,269 @@ def refresh_metadata(series_list=None):
     )
 
 
-def _is_novel_series(series_metadata):
-    # 元数据字典仅包含 libraryId
-    library_id = series_metadata["libraryId"]
+def _batch_search_series(series_list, series_records, parse_title):
+    """
+    批量搜索需要匹配的系列
+
+    去重后的标题按是否小说分组调用 search_subjects_many，返回 {series_id: (title, search_results)}
+    """
+    records = {record[0]: record for record in series_records}
+    titles = {}
+    for series in series_list:
+        # 存在 CBL 的系列无需搜索
+        if any(link["label"].lower() == "cbl" for link in series.links):
+            continue
+        series_record = records.get(series.id)
+        if series_record and (
+            series_record[2] == 1
+            or (series_record[2] == 0 and not RECHECK_FAILED_SERIES)
+        ):
+            continue
+        logger.debug("在 Bangumi 中搜索: %s ", series.name)
+        titles[series.id] = (
+            parse_title.get_title(series.name),
+            series.is_novel,
+        )
+
+    results = {}
+    for is_novel in (False, True):
+        queries = [
+            title for title, novel in titles.values() if title and novel == is_novel
+        ]
+        if queries:
+            results[is_novel] = bgm.search_subjects_many(
+                queries, FUZZ_SCORE_THRESHOLD, is_novel
+            )
+
+    return {
+        series_id: (title, results.get(is_novel, {}).get(title, []) if title else [])
+        for series_id, (title, is_novel) in titles.items()
+    }
+
+
+def _is_novel_series(series):
+    library_id = series.library_id
     for item in KOMGA_LIBRARY_LIST:
         if item["LIBRARY"] == library_id:
             return item["IS_NOVEL_ONLY"]
+    # 不在已配置的库中时，根据所属收藏判断
+    if KOMGA_COLLECTION_LIST:
+        collection_ids = series_catalog.collections_of(series.id)
+        return any(
+            item["IS_NOVEL_ONLY"]
+            for item in KOMGA_COLLECTION_LIST
+            if item["COLLECTION"] in collection_ids
+        )
     return False
 
 
-def _series_list_deduplicate(series_list, unique_keys=["id"], flag_key="is_novel"):
-    unique_dict = {}
-
-    for d in series_list:
-        key = tuple((k, d[k]) for k in unique_keys)
-        current_flag = d.get(flag_key)
+def _series_sources():
+    """
+    返回配置中的库/收藏 (scope, condition, is_novel)，仅包含小说的在前
+    """
+    sources = [
+        (
+            f"library:{item['LIBRARY']}",
+            komga.library_condition([item["LIBRARY"]]),
+            item["IS_NOVEL_ONLY"],
+        )
+        for item in KOMGA_LIBRARY_LIST
+    ] + [
+        (
+            f"collection:{item['COLLECTION']}",
+            komga.collection_condition([item["COLLECTION"]]),
+            item["IS_NOVEL_ONLY"],
+        )
+        for item in KOMGA_COLLECTION_LIST
+    ]
+    sources.sort(key=lambda source: not source[2])
+    return sources
 
-        if key not in unique_dict:
-            unique_dict[key] = d
-        else:
-            existing = unique_dict[key]
-            existing_flag = existing.get(flag_key)
 
-            # 优先保留 flag_key 为 True 的字典
-            if current_flag is True and (existing_flag is None or existing_flag is False):
-                unique_dict[key] = d
+def _iter_series_batches(scan=None):
+    """
+    按页获取配置中的系列，每页作为一批返回
 
-    return list(unique_dict.values())
+    仅包含小说的库/收藏优先获取，同一系列只保留首次出现的记录，
+    因此出现在多个来源中的系列优先标记为小说。
+    任一页请求失败时停止获取，并将 scan["complete"] 置为 False
+    """
+    seen_series_ids = set()
+    try:
+        for _, condition, is_novel in _series_sources():
+            for series_page in komga.iter_series_pages(condition):
+                series_batch = []
+                for series in series_page:
+                    if series.id in seen_series_ids:
+                        continue
+                    seen_series_ids.add(series.id)
+                    series.is_novel = is_novel
+                    series_batch.append(series)
+                if series_batch:
+                    yield series_batch
+
+        # 未设置 KOMGA_LIBRARY_LIST 和 KOMGA_COLLECTION_LIST，或其中没有系列
+        if not seen_series_ids:
+            for series_page in komga.iter_series_pages():
+                for series in series_page:
+                    series.is_novel = False
+                if series_page:
+                    yield series_page
+    except requests.exceptions.RequestException:
+        logger.error("获取系列列表失败, 停止获取剩余系列")
+        if scan is not None:
+            scan["complete"] = False
 
 
 def get_series_metadata(series_ids=[]) -> list:
-    # 每个 series 均应包含布尔值 is_novel
+    # 返回 SeriesRecord 列表，每个 series 均应包含布尔值 is_novel
     series_metadata_list = []
     if series_ids:
         for series_id in series_ids:
             metadata_item = komga.get_specific_series(series_id)
-            metadata_item["is_novel"] = _is_novel_series(metadata_item)
-            series_metadata_list.append(metadata_item)
+            if not metadata_item:
+                continue
+            series = SeriesRecord.from_json(metadata_item)
+            series.is_novel = _is_novel_series(series)
+            series_metadata_list.append(series)
     # 未指定 ID 列表, 从配置文件中获取系列列表
     else:
-        if KOMGA_LIBRARY_LIST:
-            for libray_item in KOMGA_LIBRARY_LIST:
-                series_list = komga.get_series_with_libraryid(
-                    [libray_item["LIBRARY"]])["content"]
-                for series in series_list:
-                    series["is_novel"] = libray_item["IS_NOVEL_ONLY"]
-                series_metadata_list.extend(series_list)
-        if KOMGA_COLLECTION_LIST:
-            for collection_item in KOMGA_COLLECTION_LIST:
-                series_list = komga.get_series_with_collection(
-                    [collection_item["COLLECTION"]])["content"]
-                for series in series_list:
-                    series["is_novel"] = collection_item["IS_NOVEL_ONLY"]
-                series_metadata_list.extend(series_list)
-        # 列表去重
-        series_metadata_list = _series_list_deduplicate(series_metadata_list)
-    # 未设置 KOMGA_LIBRARY_LIST 和 KOMGA_COLLECTION_LIST
-    if not series_metadata_list:
-        series_metadata_list = komga.get_all_series()["content"]
-        for series in series_metadata_list:
-            series["is_novel"] = False
+        for series_batch in _iter_series_batches():
+            series_metadata_list.extend(series_batch)
     return series_metadata_list
 
 
-def _filter_new_modified_series(library_id=None):
-    """
-    过滤出新更改系列元数据
+def _filter_new_modified_series(scope, condition=None):
     """
-    os.makedirs(ARCHIVE_FILES_DIR, exist_ok=True)
-    # 读取上次修改时间
-    LastModifiedCacheFilePath = os.path.join(
-        ARCHIVE_FILES_DIR, "komga_last_modified_time.json"
-    )
-    local_last_modified = TimeCacheManager.convert_to_datetime(
-        TimeCacheManager.read_time(LastModifiedCacheFilePath)
-    )
-    page_index = 0
-    new_series = []
-    stop_paging_flag = False
-    while not stop_paging_flag:
-        temp_series = komga.get_latest_series(
-            library_id=library_id, page=page_index)
-
-        if not temp_series:
-            break
+    过滤出 scope 中上次处理后修改过的系列，返回 (系列列表, 新的 lastModified)
 
-        for item in temp_series["content"]:
-            komga_modified_time = TimeCacheManager.convert_to_datetime(
-                item["lastModified"]
-            )
-            if komga_modified_time > local_last_modified:
-                new_series.append(item)
-            else:
-                # 如果没有新更改的系列，停止分页
-                stop_paging_flag = True
-                break
-
-        if not stop_paging_flag and (page_index + 1) < temp_series["totalPages"]:
-            page_index += 1
-        else:
-            break
-
-    return new_series
+    请求失败时返回 None
+    """
+    since = get_series_watermark(conn, scope)
+    if since is None:
+        # 兼容旧版本记录在文件中的修改时间
+        since = TimeCacheManager.read_time(
+            os.path.join(ARCHIVE_FILES_DIR, "komga_last_modified_time.json")
+        )
+    series_list = komga.get_series_modified_since(condition, since)
+    if series_list is None:
+        return None
+    # 系列按 lastModified 倒序返回
+    last_modified = series_list[0].last_modified if series_list else since
+    return series_list, last_modified
 
 
 def refresh_partial_metadata():
     """
     刷新部分书籍系列元数据
+
+    每个库/收藏分别记录已处理到的 lastModified，保存在数据库 series_watermarks 表中
     """
     # FIXME: 未处理有 cbl 的系列
-    recent_modified_series = []
-    # NOTE: 仅处理 library, 因无法通过系列 ID 快速反查所在的 collection
-    # 指定了 LIBRARY_ID
-    if KOMGA_LIBRARY_LIST:
-        for libray_item in KOMGA_LIBRARY_LIST:
-            series_list = _filter_new_modified_series(
-                libray_item["LIBRARY"])["content"]
-            for series in series_list:
-                series["is_novel"] = libray_item["IS_NOVEL_ONLY"]
-            recent_modified_series.extend(series_list)
+    sources = _series_sources() or [("all", None, False)]
 
-    else:
-        series_list = _filter_new_modified_series()
+    recent_modified_series = []
+    seen_series_ids = set()
+    new_watermarks = {}
+    for scope, condition, is_novel in sources:
+        result = _filter_new_modified_series(scope, condition)
+        if result is None:
+            continue
+        series_list, new_watermarks[scope] = result
         for series in series_list:
-            series["is_novel"] = False
-        recent_modified_series.extend(series_list)
+            # 同一系列只保留首次出现的记录，仅包含小说的库/收藏在前
+            if series.id in seen_series_ids:
+                continue
+            seen_series_ids.add(series.id)
+            series.is_novel = is_novel
+            recent_modified_series.append(series)
 
     if recent_modified_series:
         refresh_metadata(recent_modified_series)
-        # 取第一个系列的 lastModified 时间作为新的更新时间
-        LastModifiedCacheFilePath = os.path.join(
-            ARCHIVE_FILES_DIR, "komga_last_modified_time.json"
-        )
-        TimeCacheManager.save_time(
-            LastModifiedCacheFilePath,
-            recent_modified_series[0]["lastModified"],
-        )
     else:
         logger.info("未找到最近添加系列, 无需刷新")
+
+    for scope, last_modified in new_watermarks.items():
+        save_series_watermark(conn, scope, last_modified)
     return
 
 
-def update_book_metadata(book_id, related_subject, book_name, number):
+def replace_thumbnail(item_type, item_id, item_name, subject_metadata):
+    """
+    使用 Bangumi 封面替换系列或书籍海报
+
+    本地已有封面记录时直接跳过；否则向 Komga 确认没有上传过海报后再上传，
+    结果记录在 uploaded_thumbnails 表中
+    """
+    if get_uploaded_thumbnail(conn, item_id) is not None:
+        return
+
+    if item_type == "series":
+        item_label = "系列"
+        has_thumbnail = len(komga.get_series_thumbnails(item_id)) > 0
+        update_thumbnail = komga.update_series_thumbnail
+    else:
+        item_label = "书籍"
+        thumbnails = komga.get_book_thumbnails(item_id)
+        # 排除 komga 生成的封面，获取失败时不上传
+        if not thumbnails:
+            return
+        has_thumbnail = len(thumbnails) > 1
+        update_thumbnail = komga.update_book_thumbnail
+
+    # 确保没有上传过海报，避免重复上传
+    if has_thumbnail:
+        record_uploaded_thumbnail(conn, item_id, item_type, None, None)
+        return
+
+    # 尝试多尺寸海报上传
+    for thumbnail_size in ['large', 'common', 'medium']:
+        # 获取当前尺寸的封面
+        thumbnail = bgm.get_subject_thumbnail(
+            subject_metadata, image_size=thumbnail_size)
+
+        # 尝试更新封面
+        if update_thumbnail(item_id, thumbnail):
+            logger.debug("成功替换%s: %s 的海报", item_label, item_name)
+            record_uploaded_thumbnail(
+                conn,
+                item_id,
+                item_type,
+                str(subject_metadata["id"]),
+                hashlib.sha256(thumbnail["file"][1]).hexdigest(),
+            )
+            # 成功则跳出海报更新循环
+            break
+        else:
+            logger.debug(
+                "以尺寸 %s 替换%s: %s 的海报失败，正在尝试下一个尺寸...",
+                thumbnail_size,
+                item_label,
+                item_name,
+            )
+    # 所有尺寸都失败时
+    else:
+        logger.warning("替换%s: %s 的海报失败", item_label, item_name)
+
+
+def update_book_metadata(
+    book_id,
+    related_subject,
+    book_name,
+    number,
+    subject_metadata=None,
+    current_metadata=None,
+    subject_relations=None,
+):
     # Get the metadata for the book from bangumi
+    # 单册关联条目仅用于生成改编链接，使用系列关联条目，不再逐册获取
     book_metadata = process_metadata.set_komga_book_metadata(
-        related_subject["id"], number, book_name, bgm
+        related_subject["id"],
+        number,
+        book_name,
+        bgm,
+        bangumi_metadata=subject_metadata,
+        subject_relations=subject_relations,
     )
     if book_metadata.isvalid == False:
         record_book_status(
@@ -415,141 +563,140 @@ def update_book_metadata(book_id, related_subject, book_name, number):
     }
 
     # Update the metadata for the series on komga
-    is_success = komga.update_book_metadata(book_id, book_data)
+    is_success = komga.update_book_metadata(book_id, book_data, current_metadata)
     if is_success:
         record_book_status(
             conn, book_id, related_subject["id"], 1, book_name, "")
 
         # 使用 Bangumi 图片替换原封面
-        # 确保没有上传过海报，避免重复上传，排除 komga 生成的封面
-        if (
-            USE_BANGUMI_THUMBNAIL_FOR_BOOK
-            and len(komga.get_book_thumbnails(book_id)) == 1
-        ):
-            # 尝试多尺寸海报上传
-            for thumbnail_size in ['large', 'common', 'medium']:
-                # 获取当前尺寸的封面
-                thumbnail = bgm.get_subject_thumbnail(
-                    related_subject, image_size=thumbnail_size)
-
-                # 尝试更新封面
-                replace_thumbnail_result = komga.update_book_thumbnail(
-                    book_id, thumbnail)
-
-                if replace_thumbnail_result:
-                    logger.debug("替换书籍: %s 的海报 ", book_name)
-                    # 成功则跳出海报更新循环
-                    break
-                else:
-                    logger.debug(
-                        "以尺寸 %s 替换书籍: %s 的海报失败，正在尝试下一个尺寸...",
-                        thumbnail_size,
-                        book_name,
-                    )
-            # 所有尺寸都失败时
-            else:
-                logger.warning("替换书籍: %s 的海报失败", book_name)
+        if USE_BANGUMI_THUMBNAIL_FOR_BOOK:
+            replace_thumbnail("book", book_id, book_name, related_subject)
     else:
         record_book_status(
             conn, book_id, related_subject["id"], 0, book_name, "komga update failed"
         )
 
 
-def refresh_book_metadata(subject_id, series_id, force_refresh_flag):
+def update_book_number(book_id, book_name, number, current_metadata=None):
     """
-    刷新书元数据
+    仅修正书籍序号
     """
-    if subject_id == None:
-        return
+    book_data = {"number": number, "numberSort": number}
+    komga.update_book_metadata(book_id, book_data, current_metadata)
+    record_book_status(conn, book_id, None, 0, book_name, "Only update book number")
+
+
+def refresh_book_metadata(subject_context, series_id, force_refresh_flag, books=None):
+    """
+    刷新书元数据
 
-    related_subjects = None
-    subjects_numbers = []
+    books 为批量获取的该系列书籍列表，未提供时单独获取；返回提交的写入任务列表
+    """
+    if subject_context.subject_id == None:
+        return []
 
     # Get all books in the series on komga
-    books = komga.get_series_books(series_id)
+    if books is None:
+        books = [
+            BookRecord.from_json(book)
+            for book in komga.get_series_books(series_id)["content"]
+        ]
 
     # 批量获取所有book_id
-    book_ids = [book["id"] for book in books["content"]]
+    book_ids = [book.id for book in books]
 
-    c = conn.cursor()
     # 执行一次查询获取所有book_id对应的记录
-    book_records = c.execute(
-        "SELECT * FROM refreshed_books WHERE book_id IN ({})".format(
-            ",".join("?" for _ in book_ids)
-        ),
-        book_ids,
-    ).fetchall()
+    book_records = get_book_records(conn, book_ids)
 
-    # Loop through each book in the series on komga
-    for book in books["content"]:
-        book_id = book["id"]
-        book_name = book["name"]
+    # 一次解析系列中所有书名的序号
+    book_numbers = get_numbers(book.name for book in books)
 
+    # 先确定每本书要使用的条目，再批量预取单行本元数据
+    book_plans = []
+    for book, (book_number, number_type) in zip(books, book_numbers):
         # Get the subject id from the Correct Bgm Link (CBL) if it exists
-        for link in book["metadata"]["links"]:
-            if link["label"].lower() == "cbl":
-                cbl_subject = bgm.get_subject_metadata(
-                    link["url"].split("/")[-1])
-                number, _ = get_number(
-                    cbl_subject["name"] + cbl_subject["name_cn"])
-                update_book_metadata(book_id, cbl_subject, book_name, number)
-                break
+        cbl_subject_id = next(
+            (
+                int(link["url"].split("/")[-1])
+                for link in book.links
+                if link["label"].lower() == "cbl"
+            ),
+            None,
+        )
 
         # 找到对应的book_record
-        book_record = next(
-            (record for record in book_records if record[0] == book_id), None
-        )
+        book_record = book_records.get(book.id)
+        skip_flag = False
         if book_record and not force_refresh_flag:
             if book_record[2] == 1:
-                continue
+                skip_flag = True
 
             # recheck or skip failed book
             elif book_record[2] == 0 and not RECHECK_FAILED_BOOKS:
-                logger.debug("跳过刮削失败的书籍: %s", book_name)
-                continue
+                logger.debug("跳过刮削失败的书籍: %s", book.name)
+                skip_flag = True
 
-        # If related_subjects is still empty[], skip
-        if related_subjects is None:
-            # Get the related subjects for the series from bangumi
-            related_subjects = [
-                subject
-                for subject in bgm.get_related_subjects(subject_id)
-                if SubjectRelation.parse(subject["relation"])
-                == SubjectRelation.OFFPRINT
-            ]
+        related_subject = None
+        if not skip_flag and number_type not in (NumberType.CHAPTER, NumberType.NONE):
+            # Find the related subject whose number matches the book number
+            related_subject = subject_context.volumes_by_number.get(
+                book_number)
 
-            # Get the number for each related subject by finding the last number in the name or name_cn field
-            subjects_numbers = []
-            for subject in related_subjects:
-                number, _ = get_number(subject["name"] + subject["name_cn"])
-                try:
-                    subjects_numbers.append(number)
-                except ValueError:
-                    logger.error(
-                        "提取序号失败: %s, %s, %s",
-                        book_id,
-                        subject["name"],
-                        subject["name_cn"],
-                    )
+        book_plans.append(
+            (book, book_number, cbl_subject_id, skip_flag, related_subject))
 
-        # get nunmber from book name
-        book_number, number_type = get_number(book_name)
-        ep_flag = True
-        if number_type not in (NumberType.CHAPTER, NumberType.NONE):
-            # Update the metadata for the book if its number matches a related subject number
-            for i, number in enumerate(subjects_numbers):
-                if book_number == number:
-                    ep_flag = False
-
-                    update_book_metadata(
-                        book_id, related_subjects[i], book_name, number
-                    )
+    subject_context.prefetch_volume_metadata(
+        [plan[2] for plan in book_plans if plan[2] is not None]
+        + [plan[4]["id"] for plan in book_plans if plan[4] is not None]
+    )
 
-                    break
+    write_futures = []
+    # Loop through each book in the series on komga
+    for book, book_number, cbl_subject_id, skip_flag, related_subject in book_plans:
+        book_id = book.id
+        book_name = book.name
+
+        if cbl_subject_id is not None:
+            cbl_subject = subject_context.get_volume_metadata(cbl_subject_id)
+            if cbl_subject:
+                number, _ = get_number(
+                    cbl_subject["name"] + cbl_subject["name_cn"])
+                write_futures.append(write_executor.submit(
+                    series_id,
+                    update_book_metadata,
+                    book_id,
+                    cbl_subject,
+                    book_name,
+                    number,
+                    cbl_subject,
+                    book.metadata,
+                    subject_context.related_subjects,
+                ))
+
+        if skip_flag:
+            continue
+
+        # Update the metadata for the book if its number matches a related subject number
+        if related_subject is not None:
+            write_futures.append(write_executor.submit(
+                series_id,
+                update_book_metadata,
+                book_id,
+                related_subject,
+                book_name,
+                book_number,
+                subject_context.get_volume_metadata(related_subject["id"]),
+                book.metadata,
+                subject_context.related_subjects,
+            ))
         # 修正`话`序号
-        if ep_flag:
-            book_data = {"number": book_number, "numberSort": book_number}
-            komga.update_book_metadata(book_id, book_data)
-            record_book_status(
-                conn, book_id, None, 0, book_name, "Only update book number"
-            )
+        else:
+            write_futures.append(write_executor.submit(
+                series_id,
+                update_book_number,
+                book_id,
+                book_name,
+                book_number,
+                book.metadata,
+            ))
+    return write_futures
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*- #
+# ------------------------------------------------------------------
+# Description: 系列与库/收藏的对应关系，由 SSE 事件保持更新
+# ------------------------------------------------------------------
+
+import threading
+from tools.log import logger
+
+
+class SeriesCatalog:
+    """
+    系列所在库及所属收藏的本地目录
+
+    首次查询时分页获取一次全部收藏，之后由 SSE 事件增量更新；
+    系列所在库在系列事件及刷新时记录
+    """
+
+    def __init__(self, komga):
+        self.komga = komga
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._series_library = {}
+        # series_id -> {collection_id}
+        self._series_collections = {}
+        # collection_id -> {series_id}
+        self._collection_series = {}
+
+    def load(self):
+        """
+        获取全部收藏并重建收藏目录
+
+        获取失败时保持未加载状态，下次查询时重试
+        """
+        collections = self.komga.list_collections()
+        if collections is None:
+            logger.warning("获取收藏列表失败, 将在下次查询时重试")
+            return False
+        with self._lock:
+            self._series_collections.clear()
+            self._collection_series.clear()
+            for collection in collections:
+                self._set_collection(
+                    collection["id"], collection.get("seriesIds", []))
+            self._loaded = True
+        logger.debug("已加载 %s 个收藏", len(collections))
+        return True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _set_collection(self, collection_id, series_ids):
+        self._remove_collection(collection_id)
+        self._collection_series[collection_id] = set(series_ids)
+        for series_id in series_ids:
+            self._series_collections.setdefault(series_id, set()).add(collection_id)
+
+    def _remove_collection(self, collection_id):
+        for series_id in self._collection_series.pop(collection_id, ()):
+            collection_ids = self._series_collections.get(series_id)
+            if collection_ids is not None:
+                collection_ids.discard(collection_id)
+                if not collection_ids:
+                    del self._series_collections[series_id]
+
+    def collections_of(self, series_id):
+        """
+        返回系列所属收藏 id 集合
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return set(self._series_collections.get(series_id, ()))
+
+    def series_in(self, collection_id):
+        """
+        返回收藏中的系列 id 集合
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return set(self._collection_series.get(collection_id, ()))
+
+    def library_of(self, series_id):
+        with self._lock:
+            return self._series_library.get(series_id)
+
+    def record_series(self, series_id, library_id):
+        if not library_id:
+            return
+        with self._lock:
+            self._series_library[series_id] = library_id
+
+    def handle_event(self, event_type, event_data):
+        """
+        根据 SSE 事件更新目录
+        """
+        if event_type in ("SeriesAdded", "SeriesChanged"):
+            self.record_series(
+                event_data.get("seriesId"), event_data.get("libraryId"))
+        elif event_type == "SeriesDeleted":
+            series_id = event_data.get("seriesId")
+            with self._lock:
+                self._series_library.pop(series_id, None)
+                for collection_id in self._series_collections.pop(series_id, ()):
+                    self._collection_series.get(
+                        collection_id, set()).discard(series_id)
+        elif event_type in ("CollectionAdded", "CollectionChanged"):
+            # 目录尚未加载时，首次查询会获取最新收藏
+            if not self._loaded:
+                return
+            collection_id = event_data.get("collectionId")
+            series_ids = event_data.get("seriesIds")
+            if series_ids is None:
+                collection = self.komga.get_collection(collection_id)
+                if collection is None:
+                    return
+                series_ids = collection.get("seriesIds", [])
+            with self._lock:
+                self._set_collection(collection_id, series_ids)
+        elif event_type == "CollectionDeleted":
+            with self._lock:
+                self._remove_collection(event_data.get("collectionId"))
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*- #
+# ------------------------------------------------------------------
+# Description: 单个系列刷新期间共享的 Bangumi 条目上下文
+# ------------------------------------------------------------------
+
+from api.bangumi_model import SubjectRelation
+from tools.get_number import get_numbers
+from tools.log import logger
+
+
+class SubjectContext:
+    """
+    系列条目上下文
+
+    系列元数据、关联条目、单行本及单行本元数据在一次刷新中只获取一次，
+    由系列元数据与单册元数据共用
+    """
+
+    def __init__(self, bgm, subject_id, metadata=None):
+        self.bgm = bgm
+        self.subject_id = subject_id
+        self._metadata = metadata
+        self._related_subjects = None
+        self._volumes_by_number = None
+        self._volume_metadata = {}
+
+    @property
+    def metadata(self):
+        """
+        系列元数据
+        """
+        if self._metadata is None:
+            self._metadata = self.bgm.get_subject_metadata(self.subject_id)
+        return self._metadata
+
+    @property
+    def related_subjects(self):
+        """
+        系列关联条目
+        """
+        if self._related_subjects is None:
+            self._related_subjects = (
+                self.bgm.get_related_subjects(self.subject_id) or []
+            )
+        return self._related_subjects
+
+    @property
+    def volume_subjects(self):
+        """
+        系列关联的单行本
+        """
+        return [
+            subject
+            for subject in self.related_subjects
+            if SubjectRelation.parse(subject["relation"]) == SubjectRelation.OFFPRINT
+        ]
+
+    @property
+    def volumes_by_number(self):
+        """
+        根据名称中的序号建立的 {序号: 单行本} 映射，序号重复时保留第一个条目
+        """
+        if self._volumes_by_number is None:
+            volumes_by_number = {}
+            subjects = self.volume_subjects
+            numbers = get_numbers(
+                subject["name"] + subject["name_cn"] for subject in subjects
+            )
+            for subject, (number, _) in zip(subjects, numbers):
+                if number is None:
+                    logger.error(
+                        "提取序号失败: %s, %s",
+                        subject["name"],
+                        subject["name_cn"],
+                    )
+                    continue
+                volumes_by_number.setdefault(number, subject)
+            self._volumes_by_number = volumes_by_number
+        return self._volumes_by_number
+
+    def prefetch_volume_metadata(self, subject_ids):
+        """
+        批量预取单行本元数据: Archive 中的条目一次读取，其余条目以有限并发在线获取
+        """
+        missing = [
+            subject_id
+            for subject_id in dict.fromkeys(subject_ids)
+            if subject_id not in self._volume_metadata
+        ]
+        if not missing:
+            return
+        logger.debug("预取 %s 个单行本元数据: %s", len(missing), self.subject_id)
+        fetched = self.bgm.get_subjects_metadata(missing)
+        for subject_id in missing:
+            # 获取失败的条目同样记录，避免逐册刷新时重复请求
+            self._volume_metadata[subject_id] = fetched.get(subject_id, {})
+
+    def get_volume_metadata(self, subject_id):
+        """
+        单行本元数据
+        """
+        if subject_id not in self._volume_metadata:
+            self._volume_metadata[subject_id] = self.bgm.get_subject_metadata(
+                subject_id
+            )
+        return self._volume_metadata[subject_id]
@@ -2,8 +2,16 @@ from services.polling_service import poll_service
 from services.sse_service import sse_service
 from tools.log import logger
 import threading
-from config.config import BANGUMI_KOMGA_SERVICE_TYPE
-from core.refresh_metadata import refresh_metadata
+from config.config import (
+    BANGUMI_KOMGA_SERVICE_TYPE,
+    CACHE_FILES_DIR,
+    DATA_SOURCE_CACHE_BACKEND,
+    DATA_SOURCE_CACHE_MAX_ENTRIES,
+    DATA_SOURCE_CACHE_TTL,
+    WARM_UP_CACHE_ON_START,
+)
+from core.refresh_metadata import refresh_metadata, bgm, cursor
+from core.cache_warm_up import start_cache_warm_up
 from bangumi_archive.periodic_archive_checker import periodical_archive_check_service
 
 
@@ -16,6 +24,22 @@ def run_service():
     # 启动Archive检查服务
     archive_thread = periodical_archive_check_service()
 
+    # 常驻服务在后台预热缓存，重启后的事件可直接命中缓存
+    if (
+        service_type in ("poll", "sse")
+        and WARM_UP_CACHE_ON_START
+        and _has_data_source_cache()
+    ):
+        start_cache_warm_up(
+            bgm,
+            cursor,
+            (
+                DATA_SOURCE_CACHE_MAX_ENTRIES
+                if DATA_SOURCE_CACHE_BACKEND == "memory"
+                else None
+            ),
+        )
+
     refresh_metadata()
 
     if service_type == "poll":
@@ -32,6 +56,17 @@ def run_service():
         exit(1)
 
 
+def _has_data_source_cache():
+    """
+    数据源缓存是否启用，未启用时预取的结果不会被保存
+    """
+    if DATA_SOURCE_CACHE_TTL <= 0:
+        return False
+    if DATA_SOURCE_CACHE_BACKEND == "memory":
+        return True
+    return DATA_SOURCE_CACHE_BACKEND == "sqlite" and bool(CACHE_FILES_DIR)
+
+
 def run_poll_service(archive_thread):
     """运行轮询服务"""
     # 启动主服务线程
@@ -1,35 +1,44 @@
 import threading
 from tools.log import logger
 
-from config.config import KOMGA_LIBRARY_LIST
-from core.refresh_metadata import refresh_metadata, get_series_metadata
+from config.config import KOMGA_LIBRARY_LIST, KOMGA_COLLECTION_LIST
+from core.refresh_metadata import refresh_metadata, get_series_metadata, series_catalog
 from api.komga_sse_api import KomgaSseApi
-import threading
-
-# FIXME: 监听了库内容变化, 但没有关注收藏集的内容变化
 
 
-def _is_surveilled_library(library_id):
-    if KOMGA_LIBRARY_LIST:
-        KOMGA_LIBRARIES = {item["LIBRARY"] for item in KOMGA_LIBRARY_LIST}
-        return library_id not in KOMGA_LIBRARIES
-    else:
-        return False
+def _is_surveilled_series(series_id, library_id):
+    """
+    系列是否在已配置的库或收藏中，均未配置时处理所有系列
+    """
+    if not KOMGA_LIBRARY_LIST and not KOMGA_COLLECTION_LIST:
+        return True
+    if library_id in {item["LIBRARY"] for item in KOMGA_LIBRARY_LIST}:
+        return True
+    if KOMGA_COLLECTION_LIST:
+        collection_ids = {item["COLLECTION"] for item in KOMGA_COLLECTION_LIST}
+        return bool(series_catalog.collections_of(series_id) & collection_ids)
+    return False
 
 
 def series_update_sse_handler(data):
     # TODO: 处理 series_id, library_id 或者 series_detail 的场景
     series_id = data["event_data"]["seriesId"]
     library_id = data["event_data"]["libraryId"]
+    # 系列不在已配置的库或收藏中
+    if not _is_surveilled_series(series_id, library_id):
+        logger.info("未找到最近添加系列, 无需刷新")
+        return
     # 获取指定系列的详细信息
     series_detail = get_series_metadata([series_id])
+    if not series_detail:
+        return
     # 筛选有效的 SeriesChanged 事件
     if data["event_type"] == "SeriesChanged":
         # 判断 SeriesChanged 是否为CBL更改
         # 或者该系列并未匹配元数据
         if any(
             link["label"].lower() == "cbl"
-            for link in series_detail[0]["metadata"]["links"]
+            for link in series_detail[0].links
         ):
             pass
         else:
@@ -38,12 +47,8 @@ def series_update_sse_handler(data):
     # 其他事件 RefreshEventType, 例如 SeriesAdded
     else:
         pass
-    # 设置了 KOMGA_LIBRARY_LIST 且 library_id 不在 KOMGA_LIBRARY_LIST 中
-    if _is_surveilled_library(library_id):
-        logger.info("未找到最近添加系列, 无需刷新")
-    # 未设置 KOMGA_LIBRARY_LIST或 library_id 在 KOMGA_LIBRARY_LIST 中, 以 series_detail 刷新指定库中的系列
-    else:
-        refresh_metadata(series_detail)
+    # 以 series_detail 刷新已配置库或收藏中的系列
+    refresh_metadata(series_detail)
     return
 
 
@@ -52,6 +57,10 @@ def sse_service():
 
     # 注册回调函数
     komga_api.register_series_update_callback(series_update_sse_handler)
+    # 由 SSE 事件维护系列与收藏的对应关系
+    komga_api.register_catalog_callback(series_catalog.handle_event)
+    if KOMGA_COLLECTION_LIST:
+        series_catalog.load()
 
     # 防止服务主线程退出
     try:
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+import unittest
+from api.bangumi_api import (
+    AsyncBangumiApiDataSource,
+    BangumiApiDataSource,
+    BangumiDataSourceFactory,
+)
+
+
+class TestAsyncBangumiApiDataSource(unittest.TestCase):
+    def setUp(self):
+        self.bgm = AsyncBangumiApiDataSource(max_workers=3)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def fake_request(self, value):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return value
+
+    def test_get_subjects_metadata_concurrency(self):
+        """测试异步数据源 - 批量获取元数据时并发数不超过上限"""
+        self.bgm.get_subject_metadata = lambda subject_id: self.fake_request(
+            {"id": subject_id} if subject_id != 3 else []
+        )
+        results = self.bgm.get_subjects_metadata([1, 2, 3, 4, 5, 6, 1])
+        self.assertEqual(sorted(results), [1, 2, 4, 5, 6])
+        self.assertEqual(self.max_in_flight, 3)
+
+    def test_search_subjects_many(self):
+        """测试异步数据源 - 批量搜索保持 query 与结果对应"""
+        self.bgm.search_subjects = lambda query, threshold, is_novel: self.fake_request(
+            [query]
+        )
+        results = self.bgm.search_subjects_many(["a", "b", "c", "a"])
+        self.assertEqual(results, {"a": ["a"], "b": ["b"], "c": ["c"]})
+        self.assertGreater(self.max_in_flight, 1)
+
+    def test_concurrency_shared_across_callers(self):
+        """测试异步数据源 - 多个线程同时批量请求时共享并发上限"""
+        self.bgm.get_subject_metadata = lambda subject_id: self.fake_request(
+            {"id": subject_id}
+        )
+        threads = [
+            threading.Thread(
+                target=self.bgm.get_subjects_metadata, args=([i, i + 10, i + 20],)
+            )
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.max_in_flight, 3)
+
+    def test_async_methods_from_running_loop(self):
+        """测试异步数据源 - 可在调用方的事件循环中调用"""
+        self.bgm.search_subjects = lambda query, threshold, is_novel: [query]
+        results = asyncio.run(self.bgm.async_search_subjects_many(["a", "b"]))
+        self.assertEqual(results, {"a": ["a"], "b": ["b"]})
+
+    def test_factory(self):
+        """测试数据源工厂 - 并发数大于 1 时使用异步数据源"""
+        self.assertIsInstance(
+            BangumiDataSourceFactory.create({"api_concurrency": 4}).source,
+            AsyncBangumiApiDataSource,
+        )
+        self.assertNotIsInstance(
+            BangumiDataSourceFactory.create({"api_concurrency": 1}).source,
+            AsyncBangumiApiDataSource,
+        )
+        self.assertIsInstance(
+            BangumiDataSourceFactory.create({"api_concurrency": 1}).source,
+            BangumiApiDataSource,
+        )
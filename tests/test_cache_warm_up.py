@@ -0,0 +1,81 @@
+import sqlite3
+import unittest
+from unittest.mock import MagicMock
+from core.cache_warm_up import load_refreshed_subject_ids, start_cache_warm_up
+from tools.cache_backend import MemoryCacheBackend
+
+
+class TestCacheWarmUp(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.cursor = self.conn.cursor()
+        self.cursor.execute(
+            "CREATE TABLE refreshed_series (series_id text primary key,subject_id text ,update_success BOOLEAN,series_name text,bangumi_name text,refresh_time text )"
+        )
+        self.cursor.execute(
+            "CREATE TABLE refreshed_books (book_id text primary key,subject_id text ,update_success BOOLEAN,book_name text,refresh_time text )"
+        )
+        self.cursor.executemany(
+            "INSERT INTO refreshed_series VALUES (?,?,?,?,?,?)",
+            [
+                ("s1", "100", 1, "", "", "2025-01-01 00:00:00"),
+                ("s2", "200", 1, "", "", "2025-01-02 00:00:00"),
+                ("s3", None, 0, "", "", "2025-01-03 00:00:00"),
+            ],
+        )
+        self.cursor.executemany(
+            "INSERT INTO refreshed_books VALUES (?,?,?,?,?)",
+            [
+                ("b1", "101", 1, "", "2025-01-01 00:00:00"),
+                ("b2", "None", 1, "", "2025-01-01 00:00:00"),
+            ],
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_load_refreshed_subject_ids(self):
+        """测试缓存预热 - 读取匹配成功的条目, 最近刷新的在前"""
+        series_ids, book_ids = load_refreshed_subject_ids(self.cursor)
+        self.assertEqual(series_ids, [200, 100])
+        self.assertEqual(book_ids, [101])
+
+    def test_warm_up(self):
+        """测试缓存预热 - 后台批量预取元数据及系列关联条目"""
+        bgm = MagicMock()
+        thread = start_cache_warm_up(bgm, self.cursor)
+        thread.join()
+        # 从旧到新写入，最近刷新的条目最后写入
+        bgm.get_subjects_metadata.assert_called_once_with([101, 100, 200])
+        self.assertEqual(
+            [call.args[0] for call in bgm.get_related_subjects.call_args_list],
+            [100, 200],
+        )
+
+    def test_warm_up_max_entries(self):
+        """测试缓存预热 - 仅预取不超过缓存容量的最近刷新条目"""
+        bgm = MagicMock()
+        thread = start_cache_warm_up(bgm, self.cursor, max_entries=3)
+        thread.join()
+        bgm.get_subjects_metadata.assert_called_once_with([200])
+        bgm.get_related_subjects.assert_called_once_with(200)
+
+    def test_warm_up_memory_backend(self):
+        """测试缓存预热 - 预取条目超出 LRU 容量时最近刷新的条目仍在缓存中"""
+        backend = MemoryCacheBackend(max_entries=3)
+        bgm = MagicMock()
+        bgm.get_subjects_metadata.side_effect = lambda ids: [
+            backend.set(("get_subject_metadata", id), id, 60) for id in ids
+        ]
+        bgm.get_related_subjects.side_effect = lambda id: backend.set(
+            ("get_related_subjects", id), [], 60
+        )
+        start_cache_warm_up(bgm, self.cursor).join()
+        self.assertTrue(backend.get(("get_subject_metadata", 200))[0])
+        self.assertTrue(backend.get(("get_related_subjects", 200))[0])
+
+    def test_no_records(self):
+        """测试缓存预热 - 无刷新记录时不启动预热"""
+        self.cursor.execute("DELETE FROM refreshed_series")
+        self.cursor.execute("DELETE FROM refreshed_books")
+        self.assertIsNone(start_cache_warm_up(MagicMock(), self.cursor))
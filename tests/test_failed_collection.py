@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from core.failed_collection import update_failed_collection
+from tools.db import (
+    init_sqlite3,
+    list_failed_collection_series,
+    update_failed_collection_series,
+    upsert_series_record,
+)
+
+
+class TestFailedCollection(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.cursor, self.conn = init_sqlite3()
+        self.komga = MagicMock()
+        self.komga.list_collections.return_value = []
+        self.komga.add_collection.return_value = True
+        self.komga.update_collection.return_value = True
+        self.komga.delete_collection.return_value = True
+
+    def tearDown(self):
+        self.conn.close()
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def record(self, **statuses):
+        for series_id, status in statuses.items():
+            upsert_series_record(self.conn, series_id, None, status, series_id, "")
+
+    def set_collection(self, series_ids):
+        self.komga.list_collections.return_value = [
+            {"id": "c0", "name": "FAILED_COLLECTION_OLD", "seriesIds": []},
+            {"id": "c1", "name": "FAILED_COLLECTION", "seriesIds": series_ids},
+        ]
+
+    def test_create(self):
+        """测试失败收藏 - 收藏不存在时按刷新顺序创建"""
+        self.record(s3=0, s1=1, s2=0)
+        update_failed_collection(self.komga, self.conn, ["s3", "s1", "s2"])
+        self.komga.add_collection.assert_called_once_with(
+            "FAILED_COLLECTION", False, ["s3", "s2"]
+        )
+        self.assertEqual(list_failed_collection_series(self.conn), ["s3", "s2"])
+
+    def test_no_change(self):
+        """测试失败收藏 - 系列状态无变化时不更新收藏"""
+        self.record(s1=0, s2=1)
+        update_failed_collection_series(self.conn, ["s1"], [])
+        self.set_collection(["s1"])
+        update_failed_collection(self.komga, self.conn, ["s1", "s2"])
+        self.komga.update_collection.assert_not_called()
+        self.komga.add_collection.assert_not_called()
+        self.komga.delete_collection.assert_not_called()
+
+    def test_add_and_remove(self):
+        """测试失败收藏 - 新失败的系列追加到末尾, 刷新成功的系列被移除"""
+        self.record(s1=1, s2=0, s3=0)
+        update_failed_collection_series(self.conn, ["s1", "s2"], [])
+        # 收藏中有不在数据库记录中的系列 s4, 本次刷新成功后一并移除
+        self.record(s4=1)
+        self.set_collection(["s4", "s1", "s2", "s9"])
+        update_failed_collection(self.komga, self.conn, ["s1", "s2", "s3", "s4"])
+        self.komga.update_collection.assert_called_once_with("c1", ["s2", "s9", "s3"])
+        self.assertEqual(list_failed_collection_series(self.conn), ["s2", "s3"])
+
+    def test_delete_when_empty(self):
+        """测试失败收藏 - 全部系列刷新成功时删除收藏"""
+        self.record(s1=1)
+        update_failed_collection_series(self.conn, ["s1"], [])
+        self.set_collection(["s1"])
+        update_failed_collection(self.komga, self.conn, ["s1"])
+        self.komga.delete_collection.assert_called_once_with("c1")
+        self.assertEqual(list_failed_collection_series(self.conn), [])
+
+    def test_rebuild(self):
+        """测试失败收藏 - 收藏被删除时按数据库记录的加入顺序重建"""
+        self.record(s5=0, s1=0, s3=0, s2=1)
+        update_failed_collection_series(self.conn, ["s5", "s1", "s3"], [])
+        update_failed_collection(self.komga, self.conn, ["s2", "s3"])
+        self.komga.add_collection.assert_called_once_with(
+            "FAILED_COLLECTION", False, ["s5", "s1", "s3"]
+        )
+
+    def test_list_failure(self):
+        """测试失败收藏 - 获取收藏失败时不更新收藏及记录"""
+        self.record(s1=0)
+        self.komga.list_collections.return_value = None
+        update_failed_collection(self.komga, self.conn, ["s1"])
+        self.komga.add_collection.assert_not_called()
+        self.assertEqual(list_failed_collection_series(self.conn), [])
+
+    def test_update_failure(self):
+        """测试失败收藏 - 更新收藏失败时不记录, 下次刷新重试"""
+        self.record(s1=0)
+        self.komga.add_collection.return_value = False
+        update_failed_collection(self.komga, self.conn, ["s1"])
+        self.assertEqual(list_failed_collection_series(self.conn), [])
@@ -0,0 +1,116 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from api.bangumi_api import FallbackDataSource
+from tools.cache_backend import MemoryCacheBackend
+
+
+class TestHedgedFallbackDataSource(unittest.TestCase):
+    def setUp(self):
+        self.primary = MagicMock()
+        self.secondary = MagicMock()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def slow(self, result):
+        self.release.wait(2)
+        return result
+
+    def test_sequential_without_hedge(self):
+        """测试备用数据源 - 未启用对冲时依次请求"""
+        self.primary.get_subject_metadata.return_value = []
+        self.secondary.get_subject_metadata.return_value = {"id": 1}
+        bgm = FallbackDataSource(self.primary, self.secondary)
+        self.assertEqual(bgm.get_subject_metadata(1), {"id": 1})
+        self.assertEqual(bgm._answered_by, {})
+
+    def test_hedge_after_delay(self):
+        """测试备用数据源 - 主数据源超时后采用备用数据源先返回的结果"""
+        self.primary.get_subject_metadata.side_effect = lambda subject_id: self.slow(
+            {"id": subject_id, "source": "primary"}
+        )
+        self.secondary.get_subject_metadata.return_value = {"id": 1, "source": "secondary"}
+        bgm = FallbackDataSource(self.primary, self.secondary, hedge_delay=0.05)
+
+        start = time.monotonic()
+        self.assertEqual(bgm.get_subject_metadata(1)["source"], "secondary")
+        self.assertLess(time.monotonic() - start, 1)
+
+        # 之后直接请求返回过该条目的数据源
+        self.release.set()
+        self.primary.get_subject_metadata.reset_mock()
+        bgm.get_subject_metadata(1)
+        self.primary.get_subject_metadata.assert_not_called()
+
+    def test_fast_primary_not_hedged(self):
+        """测试备用数据源 - 主数据源及时返回时不请求备用数据源"""
+        self.primary.get_related_subjects.return_value = [{"id": 2}]
+        bgm = FallbackDataSource(self.primary, self.secondary, hedge_delay=1)
+        self.assertEqual(bgm.get_related_subjects(1), [{"id": 2}])
+        self.secondary.get_related_subjects.assert_not_called()
+
+    def test_primary_miss_uses_secondary(self):
+        """测试备用数据源 - 主数据源无结果时请求备用数据源, 批量获取时直接请求备用数据源"""
+        self.primary.get_subject_metadata.return_value = []
+        self.secondary.get_subject_metadata.return_value = {"id": 1}
+        self.primary.get_subjects_metadata.return_value = {2: {"id": 2}}
+        self.secondary.get_subjects_metadata.return_value = {1: {"id": 1}}
+        bgm = FallbackDataSource(self.primary, self.secondary, hedge_delay=1)
+        self.assertEqual(bgm.get_subject_metadata(1), {"id": 1})
+        results = bgm.get_subjects_metadata([1, 2])
+        self.assertEqual(sorted(results), [1, 2])
+        self.primary.get_subjects_metadata.assert_called_once_with([2])
+        self.secondary.get_subjects_metadata.assert_called_once_with([1])
+
+
+class TestFallbackMissCache(unittest.TestCase):
+    def setUp(self):
+        self.primary = MagicMock()
+        self.primary.data_version.return_value = (1.0, 1.0)
+        self.primary.get_subject_metadata.return_value = []
+        self.primary.get_subjects_metadata.return_value = {}
+        self.secondary = MagicMock()
+        self.secondary.get_subject_metadata.return_value = {"id": 1}
+        self.secondary.get_subjects_metadata.side_effect = lambda subject_ids: {
+            subject_id: {"id": subject_id} for subject_id in subject_ids
+        }
+        self.bgm = FallbackDataSource(
+            self.primary, self.secondary, miss_cache=MemoryCacheBackend(), miss_ttl=60
+        )
+
+    def test_known_miss_skips_primary(self):
+        """测试备用数据源 - 主数据源已知未命中的条目直接请求备用数据源"""
+        self.bgm.get_subject_metadata(1)
+        self.bgm.get_subject_metadata(1)
+        self.assertEqual(self.primary.get_subject_metadata.call_count, 1)
+        self.assertEqual(self.secondary.get_subject_metadata.call_count, 2)
+        # 单个查询记录的未命中同样用于批量获取
+        self.assertEqual(sorted(self.bgm.get_subjects_metadata([1, 2])), [1, 2])
+        self.primary.get_subjects_metadata.assert_called_once_with([2])
+        self.bgm.get_subjects_metadata([2])
+        self.primary.get_subjects_metadata.assert_called_once_with([2])
+
+    def test_reset_on_data_version_change(self):
+        """测试备用数据源 - 主数据源数据更新后重新查询"""
+        self.bgm.get_subject_metadata(1)
+        self.primary.data_version.return_value = (2.0, 2.0)
+        self.bgm.get_subject_metadata(1)
+        self.assertEqual(self.primary.get_subject_metadata.call_count, 2)
+
+    def test_search_misses(self):
+        """测试备用数据源 - 批量搜索中主数据源未命中的 query 不再重复搜索"""
+        self.primary.search_subjects_many.side_effect = lambda queries, **kwargs: {
+            query: [] if query == "new" else [{"id": 1}] for query in queries
+        }
+        self.secondary.search_subjects_many.side_effect = lambda queries, **kwargs: {
+            query: [{"id": 2}] for query in queries
+        }
+        results = self.bgm.search_subjects_many(["old", "new"])
+        self.assertEqual(results, {"old": [{"id": 1}], "new": [{"id": 2}]})
+        results = self.bgm.search_subjects_many(["old", "new"])
+        self.assertEqual(results, {"old": [{"id": 1}], "new": [{"id": 2}]})
+        self.assertEqual(
+            self.primary.search_subjects_many.call_args.args[0], ["old"])
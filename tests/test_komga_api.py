@@ -0,0 +1,268 @@
+import requests
+import unittest
+from unittest.mock import MagicMock, patch
+from api.komga_api import (
+    BookRecord,
+    KomgaApi,
+    SeriesRecord,
+    diff_metadata,
+)
+
+
+def make_komga():
+    # 跳过登录
+    komga = KomgaApi.__new__(KomgaApi)
+    komga.base_url = "http://komga/api/v1"
+    komga.r = MagicMock()
+    return komga
+
+
+def make_response(data):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = data
+    return response
+
+
+class TestKomgaSeriesPaging(unittest.TestCase):
+    def setUp(self):
+        self.komga = make_komga()
+        self.pages = [
+            {
+                "content": [
+                    {"id": "1", "name": "A", "metadata": {}, "booksMetadata": {}},
+                    {"id": "2", "name": "B", "metadata": {}, "booksMetadata": {}},
+                ],
+                "totalPages": 2,
+            },
+            {
+                "content": [{"id": "3", "name": "C", "metadata": {}}],
+                "totalPages": 2,
+            },
+        ]
+        self.komga.r.post.side_effect = lambda url, params, json: make_response(
+            self.pages[params["page"]]
+        )
+
+    def test_iter_series_pages(self):
+        """测试 Komga 系列分页 - 逐页返回精简记录"""
+        pages = list(
+            self.komga.iter_series_pages(
+                self.komga.library_condition(["lib"]), page_size=2)
+        )
+        self.assertEqual([[s.id for s in page] for page in pages], [["1", "2"], ["3"]])
+        self.assertFalse(hasattr(pages[0][0], "__dict__"))
+        params = self.komga.r.post.call_args_list[0].kwargs["params"]
+        self.assertEqual(params["size"], 2)
+        self.assertEqual(params["sort"], ["createdDate,asc", "id,asc"])
+        payload = self.komga.r.post.call_args_list[0].kwargs["json"]
+        self.assertEqual(
+            payload["condition"]["allOf"][1],
+            {"libraryId": {"operator": "is", "value": "lib"}},
+        )
+
+    def test_iter_series(self):
+        """测试 Komga 系列分页 - 逐个返回系列"""
+        self.assertEqual([s.id for s in self.komga.iter_series()], ["1", "2", "3"])
+        self.assertEqual(self.komga.r.post.call_count, 2)
+
+    def test_request_failed(self):
+        """测试 Komga 系列分页 - 任一页请求失败时抛出异常"""
+        responses = [
+            make_response(self.pages[0]),
+            requests.exceptions.ConnectionError("error"),
+        ]
+        self.komga.r.post.side_effect = responses
+        series_pages = self.komga.iter_series_pages(page_size=2)
+        self.assertEqual([s.id for s in next(series_pages)], ["1", "2"])
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            next(series_pages)
+
+
+class TestKomgaBooksForSeries(unittest.TestCase):
+    def setUp(self):
+        self.komga = make_komga()
+        self.pages = [
+            {
+                "content": [
+                    {"id": "b1", "name": "1", "seriesId": "s1"},
+                    {"id": "b2", "name": "2", "seriesId": "s2"},
+                ],
+                "totalPages": 2,
+            },
+            {"content": [{"id": "b3", "name": "3", "seriesId": "s1"}], "totalPages": 2},
+        ]
+        self.komga.r.post.side_effect = lambda url, params, json: make_response(
+            self.pages[params["page"]]
+        )
+
+    def test_get_books_for_series(self):
+        """测试 Komga 批量获取书籍 - 一次查询多个系列并按系列分组"""
+        books = self.komga.get_books_for_series(["s1", "s2", "s3"])
+        self.assertEqual([book.id for book in books["s1"]], ["b1", "b3"])
+        self.assertEqual([book.id for book in books["s2"]], ["b2"])
+        self.assertEqual(books["s3"], [])
+        self.assertEqual(self.komga.r.post.call_count, 2)
+        url = self.komga.r.post.call_args_list[0].args[0]
+        self.assertTrue(url.endswith("/books/list"))
+        params = self.komga.r.post.call_args_list[0].kwargs["params"]
+        self.assertEqual(params["sort"], ["createdDate,asc", "id,asc"])
+        payload = self.komga.r.post.call_args_list[0].kwargs["json"]
+        self.assertIn(
+            {"seriesId": {"operator": "is", "value": "s3"}},
+            payload["condition"]["allOf"][1]["anyOf"],
+        )
+
+    def test_request_failed(self):
+        """测试 Komga 批量获取书籍 - 请求失败的系列不包含在结果中"""
+        self.komga.r.post.side_effect = requests.exceptions.ConnectionError("error")
+        self.assertEqual(self.komga.get_books_for_series(["s1"]), {})
+
+
+class TestKomgaMetadataDiff(unittest.TestCase):
+    def setUp(self):
+        self.current = {
+            "title": "A",
+            "genres": ["comedy", "romance"],
+            "tags": ["school"],
+            "links": [{"label": "Bangumi", "url": "u1"}, {"label": "CBL", "url": "u2"}],
+            "authors": [{"name": "X", "role": "writer"}],
+            "number": "1",
+            "numberSort": 1.0,
+            "titleLock": False,
+        }
+
+    def test_diff_metadata(self):
+        """测试 Komga 元数据比较 - 仅返回有变化的字段, 流派标签忽略大小写及顺序"""
+        metadata = {
+            "title": "B",
+            "genres": ["Romance", "Comedy"],
+            "tags": ["School"],
+            "links": [{"label": "CBL", "url": "u2"}, {"label": "Bangumi", "url": "u1"}],
+            "authors": [{"name": "X", "role": "Writer"}],
+            "number": 1,
+            "numberSort": 1,
+        }
+        self.assertEqual(diff_metadata(self.current, metadata), {"title": "B"})
+        self.assertEqual(diff_metadata(None, {"title": "B"}), {"title": "B"})
+
+    def test_update_skips_unchanged(self):
+        """测试 Komga 元数据比较 - 无变化时不发送请求, 有变化时仅发送变化字段"""
+        komga = make_komga()
+        komga.r.patch.return_value.status_code = 204
+        self.assertTrue(
+            komga.update_series_metadata("s1", {"title": "A"}, self.current))
+        komga.r.patch.assert_not_called()
+        self.assertTrue(
+            komga.update_book_metadata(
+                "b1", {"title": "A", "tags": ["new"]}, self.current)
+        )
+        self.assertEqual(komga.r.patch.call_args.kwargs["json"], {"tags": ["new"]})
+
+
+class TestKomgaModifiedSeries(unittest.TestCase):
+    def setUp(self):
+        self.komga = make_komga()
+        self.pages = [
+            {
+                "content": [
+                    {"id": "3", "name": "", "lastModified": "2025-01-03T00:00:00Z"},
+                    {"id": "2", "name": "", "lastModified": "2025-01-02T00:00:00Z"},
+                ],
+                "totalPages": 2,
+            },
+            {
+                "content": [
+                    {"id": "1", "name": "", "lastModified": "2025-01-01T00:00:00Z"}
+                ],
+                "totalPages": 2,
+            },
+        ]
+        self.komga.r.post.side_effect = lambda url, params, json: make_response(
+            self.pages[params["page"]]
+        )
+
+    def test_modified_since(self):
+        """测试 Komga 修改系列查询 - 按修改时间倒序, 遇到旧系列即停止分页"""
+        series = self.komga.get_series_modified_since(
+            since="2025-01-02T00:00:00Z", page_size=2)
+        self.assertEqual([s.id for s in series], ["3"])
+        self.assertEqual(self.komga.r.post.call_count, 1)
+        params = self.komga.r.post.call_args.kwargs["params"]
+        self.assertEqual(params["sort"], ["lastModified,desc", "id,asc"])
+
+    def test_without_watermark(self):
+        """测试 Komga 修改系列查询 - 无记录时返回全部系列"""
+        series = self.komga.get_series_modified_since(page_size=2)
+        self.assertEqual([s.id for s in series], ["3", "2", "1"])
+
+    def test_request_failed(self):
+        """测试 Komga 修改系列查询 - 请求失败时返回 None"""
+        self.komga.r.post.side_effect = requests.exceptions.ConnectionError("error")
+        self.assertIsNone(self.komga.get_series_modified_since())
+
+
+class TestKomgaRecords(unittest.TestCase):
+    def test_series_record(self):
+        """测试精简记录 - 系列记录仅保留刷新使用的字段"""
+        series = SeriesRecord.from_json(
+            {
+                "id": "s1",
+                "name": "A",
+                "libraryId": "lib",
+                "lastModified": "2025-01-01T00:00:00Z",
+                "booksMetadata": {"summary": "long"},
+                "metadata": {
+                    "title": "A",
+                    "links": [{"label": "cbl", "url": "1"}],
+                    "titleLock": False,
+                },
+            }
+        )
+        self.assertEqual(series.library_id, "lib")
+        self.assertEqual(series.links, [{"label": "cbl", "url": "1"}])
+        self.assertNotIn("titleLock", series.metadata)
+        self.assertFalse(series.is_novel)
+        with self.assertRaises(AttributeError):
+            series.booksMetadata = {}
+
+    def test_book_record(self):
+        """测试精简记录 - 书籍记录缺少元数据时链接为空"""
+        book = BookRecord.from_json({"id": "b1", "name": "1", "seriesId": "s1"})
+        self.assertEqual((book.series_id, book.links), ("s1", []))
+
+
+class TestKomgaCollections(unittest.TestCase):
+    def test_list_collections_paging(self):
+        """测试 Komga 收藏 - 分页获取全部收藏, 按名称查找时优先完全一致的收藏"""
+        komga = make_komga()
+        pages = [
+            {"content": [{"id": "c1", "name": "FAILED"}], "totalPages": 2},
+            {"content": [{"id": "c2", "name": "FAILED_COLLECTION"}], "totalPages": 2},
+        ]
+        komga.r.get.side_effect = lambda url, params: make_response(
+            pages[params["page"]]
+        )
+        self.assertEqual([c["id"] for c in komga.list_collections()], ["c1", "c2"])
+        self.assertEqual(komga.get_collection_id_by_search_name("FAILED_COLLECTION"), "c2")
+        self.assertEqual(komga.r.get.call_args.kwargs["params"]["search"], "FAILED_COLLECTION")
+
+    def test_update_collection(self):
+        """测试 Komga 收藏 - 以 PATCH 更新已有收藏的系列"""
+        komga = make_komga()
+        komga.r.patch.return_value.status_code = 204
+        self.assertTrue(komga.update_collection("c1", ["s1", "s2"]))
+        komga.r.patch.assert_called_once_with(
+            "http://komga/api/v1/collections/c1", json={"seriesIds": ["s1", "s2"]}
+        )
+
+    def test_list_collections_failure(self):
+        """测试 Komga 收藏 - 任一页获取失败时返回 None"""
+        komga = make_komga()
+        failure = MagicMock()
+        failure.raise_for_status.side_effect = requests.exceptions.HTTPError("503")
+        komga.r.get.side_effect = [
+            make_response({"content": [{"id": "c1", "name": "A"}], "totalPages": 2}),
+            failure,
+        ]
+        self.assertIsNone(komga.list_collections())
@@ -245,6 +245,21 @@ class TestKomgaSseApi(unittest.TestCase):
             api.on_event("SeriesAdded", {"libraryId": "lib1"})
             self.assertEqual(len(callback_data), 0)
 
+    def test_catalog_callback(self):
+        """测试SSE API - 收藏事件仅通知目录回调"""
+        catalog_events = []
+        series_events = []
+
+        def series_callback(data):
+            series_events.append(data)
+
+        self.api.register_catalog_callback(
+            lambda event_type, data: catalog_events.append(event_type))
+        self.api.register_series_update_callback(series_callback)
+        self.api.on_event("CollectionChanged", {"collectionId": "c1", "seriesIds": []})
+        self.assertEqual(catalog_events, ["CollectionChanged"])
+        self.assertEqual(series_events, [])
+
 
 # @unittest.skip("临时跳过测试")
 class TestErrorHandling(unittest.TestCase):
@@ -220,6 +220,37 @@ class TestIndexedDataReader(unittest.TestCase):
         finally:
             os.unlink(temp_file_path)
 
+    def test_get_offsets_by_queries(self):
+        """批量全文搜索：结果与逐个全文搜索一致"""
+        reader = IndexedDataReader(self.test_subject_file)
+        queries = ["常态", "Chobits", "米奇", "不存在的词"]
+        offsets = reader.get_offsets_by_queries(queries)
+        for query in queries:
+            items = reader.get_data_by_offsets(offsets[query])
+            expected = reader.get_data_by_query(query)
+            self.assertEqual(
+                sorted(item["id"] for item in items.values()),
+                sorted(item["id"] for item in expected),
+            )
+
+    def test_get_name_key_index_lowercase(self):
+        """名称键索引：小写键可精确命中别名"""
+        reader = IndexedDataReader(self.test_subject_file)
+        name_keys = reader.get_name_key_index()
+        self.assertIn("chobits", name_keys)
+        items = reader.get_data_by_offsets(name_keys["chobits"])
+        self.assertEqual([item["id"] for item in items.values()], [497])
+
+    def test_name_key_index_cached(self):
+        """名称键索引：多次调用复用同一结果，索引重建后失效"""
+        IndexedDataReader._instance.clear()
+        reader = IndexedDataReader(self.test_subject_file)
+        name_keys = reader.get_name_key_index()
+        self.assertIs(reader.get_name_key_index(), name_keys)
+        reader._build_index()
+        self.assertIsNot(reader.get_name_key_index(), name_keys)
+        self.assertIn("chobits", reader.get_name_key_index())
+
     def test_get_data_by_query_fulltext_search_type_error(self):
         """全文搜索传入非字符串应报错"""
         reader = IndexedDataReader(self.test_subject_file)
@@ -1,10 +1,13 @@
 import unittest
 from unittest.mock import patch, MagicMock, mock_open
 import json
+import os
 from bangumi_archive.local_archive_searcher import (  # 替换为实际模块名
     search_line,
+    search_lines,
     search_list,
     search_all_data,
+    search_all_data_many,
     parse_infobox,
     _process_value
 )
@@ -91,6 +94,56 @@ class TestSearchFunctions(unittest.TestCase):
         self.assertEqual(len(result), 2)
         mock_index.assert_called_once()
 
+    def test_search_lines_batch(self):
+        """测试Archive搜索器 - 批量单行搜索"""
+        import tempfile
+        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".jsonl", encoding="utf-8") as f:
+            for item in self.test_data:
+                f.write(json.dumps(item) + "\n")
+            temp_path = f.name
+        try:
+            result = search_lines(temp_path, [2, 1, 2, 3], "id")
+            self.assertEqual(sorted(result), [1, 2])
+            self.assertEqual(result[2]["name"], "Test2")
+        finally:
+            os.unlink(temp_path)
+            if os.path.exists(f"{temp_path}.index"):
+                os.unlink(f"{temp_path}.index")
+
+    @patch('bangumi_archive.local_archive_searcher._search_all_data_many_with_index')
+    def test_search_all_data_many_fallback(self, mock_index):
+        """测试Archive搜索器 - 批量搜索索引异常时单次遍历文件"""
+        import tempfile
+        mock_index.side_effect = FileNotFoundError("index")
+        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".jsonl", encoding="utf-8") as f:
+            for item in self.test_data + [{"id": 3, "name": "Test3", "type": 2}]:
+                f.write(json.dumps(item) + "\n")
+            temp_path = f.name
+        try:
+            result = search_all_data_many(temp_path, ["Test1", "Test", "Test1", ""])
+            self.assertEqual(list(result), ["Test1", "Test"])
+            self.assertEqual([item["id"] for item in result["Test1"]], [1])
+            # type != 1 的条目被过滤
+            self.assertEqual([item["id"] for item in result["Test"]], [1, 2])
+        finally:
+            os.unlink(temp_path)
+
+    @patch('bangumi_archive.local_archive_searcher._search_all_data_many_with_index')
+    def test_search_all_data_many_fallback_missed(self, mock_index):
+        """测试Archive搜索器 - 批量搜索索引未命中的 query 回退遍历文件"""
+        import tempfile
+        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".jsonl", encoding="utf-8") as f:
+            for item in self.test_data:
+                f.write(json.dumps(item) + "\n")
+            temp_path = f.name
+        mock_index.return_value = {"Test1": [self.test_data[0]], "Test2": []}
+        try:
+            result = search_all_data_many(temp_path, ["Test1", "Test2"])
+            self.assertEqual([item["id"] for item in result["Test1"]], [1])
+            self.assertEqual([item["id"] for item in result["Test2"]], [2])
+        finally:
+            os.unlink(temp_path)
+
     def test_parse_infobox_basic(self):
         """测试Archive搜索器 - infobox基础解析"""
         test_str = "|key1=value1\n|key2=value2"
@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import MagicMock
+from core.series_catalog import SeriesCatalog
+
+
+class TestSeriesCatalog(unittest.TestCase):
+    def setUp(self):
+        self.komga = MagicMock()
+        self.komga.list_collections.return_value = [
+            {"id": "c1", "seriesIds": ["s1", "s2"]},
+            {"id": "c2", "seriesIds": ["s2"]},
+        ]
+        self.catalog = SeriesCatalog(self.komga)
+
+    def test_load_once(self):
+        """测试系列目录 - 首次查询时加载一次全部收藏"""
+        self.assertEqual(self.catalog.collections_of("s2"), {"c1", "c2"})
+        self.assertEqual(self.catalog.series_in("c1"), {"s1", "s2"})
+        self.assertEqual(self.catalog.collections_of("s3"), set())
+        self.komga.list_collections.assert_called_once()
+
+    def test_load_retry(self):
+        """测试系列目录 - 获取收藏失败时保持未加载, 下次查询时重试"""
+        collections = self.komga.list_collections.return_value
+        self.komga.list_collections.return_value = None
+        self.assertFalse(self.catalog.load())
+        self.komga.list_collections.return_value = collections
+        self.assertEqual(self.catalog.collections_of("s1"), {"c1"})
+        self.assertEqual(self.komga.list_collections.call_count, 2)
+
+    def test_collection_events(self):
+        """测试系列目录 - 收藏变化及删除事件更新对应关系"""
+        self.catalog.load()
+        self.catalog.handle_event(
+            "CollectionChanged", {"collectionId": "c1", "seriesIds": ["s3"]}
+        )
+        self.assertEqual(self.catalog.collections_of("s1"), set())
+        self.assertEqual(self.catalog.collections_of("s3"), {"c1"})
+        self.komga.get_collection.return_value = {"id": "c3", "seriesIds": ["s1"]}
+        self.catalog.handle_event("CollectionAdded", {"collectionId": "c3"})
+        self.assertEqual(self.catalog.collections_of("s1"), {"c3"})
+        self.catalog.handle_event("CollectionDeleted", {"collectionId": "c2"})
+        self.assertEqual(self.catalog.collections_of("s2"), set())
+
+    def test_series_events(self):
+        """测试系列目录 - 系列添加及删除事件更新所在库及所属收藏"""
+        self.catalog.load()
+        self.catalog.handle_event("SeriesAdded", {"seriesId": "s2", "libraryId": "lib"})
+        self.assertEqual(self.catalog.library_of("s2"), "lib")
+        self.catalog.handle_event("SeriesDeleted", {"seriesId": "s2", "libraryId": "lib"})
+        self.assertIsNone(self.catalog.library_of("s2"))
+        self.assertEqual(self.catalog.series_in("c1"), {"s1"})
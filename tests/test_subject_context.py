@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import MagicMock
+from core.subject_context import SubjectContext
+
+
+class TestSubjectContext(unittest.TestCase):
+    def setUp(self):
+        self.bgm = MagicMock()
+        self.bgm.get_subject_metadata.side_effect = lambda subject_id: {
+            "id": subject_id}
+        self.bgm.get_related_subjects.return_value = [
+            {"id": 11, "name": "Test 1", "name_cn": "", "relation": "单行本"},
+            {"id": 12, "name": "Test 2", "name_cn": "", "relation": "单行本"},
+            {"id": 13, "name": "Test 2", "name_cn": "", "relation": "单行本"},
+            {"id": 20, "name": "Anime", "name_cn": "", "relation": "动画"},
+        ]
+
+    def test_fetch_once(self):
+        """测试系列条目上下文 - 同一系列只获取一次"""
+        context = SubjectContext(self.bgm, 1)
+        for _ in range(3):
+            context.metadata
+            context.related_subjects
+            context.volumes_by_number
+            context.get_volume_metadata(11)
+        self.assertEqual(self.bgm.get_related_subjects.call_count, 1)
+        # 系列元数据 + 单行本元数据
+        self.assertEqual(self.bgm.get_subject_metadata.call_count, 2)
+
+    def test_known_metadata_not_fetched(self):
+        """测试系列条目上下文 - 已知元数据不再获取"""
+        context = SubjectContext(self.bgm, 1, {"id": 1, "name": "known"})
+        self.assertEqual(context.metadata["name"], "known")
+        self.bgm.get_subject_metadata.assert_not_called()
+
+    def test_volumes_by_number(self):
+        """测试系列条目上下文 - 单行本按序号映射, 重复序号保留第一个"""
+        context = SubjectContext(self.bgm, 1)
+        volumes = context.volumes_by_number
+        self.assertEqual(sorted(volumes), [1.0, 2.0])
+        self.assertEqual(volumes[2.0]["id"], 12)
+
+    def test_prefetch_volume_metadata(self):
+        """测试系列条目上下文 - 批量预取单行本元数据"""
+        self.bgm.get_subjects_metadata.return_value = {11: {"id": 11}}
+        context = SubjectContext(self.bgm, 1)
+        context.prefetch_volume_metadata([11, 12, 11])
+        self.bgm.get_subjects_metadata.assert_called_once_with([11, 12])
+        self.assertEqual(context.get_volume_metadata(11), {"id": 11})
+        # 预取失败的条目不再单独请求
+        self.assertEqual(context.get_volume_metadata(12), {})
+        self.bgm.get_subject_metadata.assert_not_called()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from api.bangumi_api import CachingDataSource
+from tools.cache_backend import MemoryCacheBackend, SqliteCacheBackend
+
+
+class TestCacheBackend(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def check_backend(self, backend):
+        self.assertEqual(backend.get("a"), (False, None))
+        backend.set("a", {"id": 1}, 60)
+        self.assertEqual(backend.get("a"), (True, {"id": 1}))
+        backend.delete("a")
+        self.assertEqual(backend.get("a"), (False, None))
+        with patch("time.time", return_value=1000.0):
+            backend.set("b", [1], 10)
+        with patch("time.time", return_value=1011.0):
+            self.assertEqual(backend.get("b"), (False, None))
+
+    def test_memory_backend(self):
+        """测试缓存后端 - 内存缓存读写及过期"""
+        self.check_backend(MemoryCacheBackend())
+
+    def test_memory_backend_lru(self):
+        """测试缓存后端 - 内存缓存超出上限时淘汰最久未使用的条目"""
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", 1, 60)
+        backend.set("b", 2, 60)
+        backend.get("a")
+        backend.set("c", 3, 60)
+        self.assertEqual(backend.get("a"), (True, 1))
+        self.assertEqual(backend.get("b"), (False, None))
+
+    def test_sqlite_backend(self):
+        """测试缓存后端 - SQLite 缓存读写、过期及持久化"""
+        db_path = os.path.join(self.temp_dir.name, "cache.db")
+        self.check_backend(SqliteCacheBackend(db_path))
+        SqliteCacheBackend(db_path).set("c", ("name", b"bytes"), 60)
+        self.assertEqual(
+            SqliteCacheBackend(db_path).get("c"), (True, ("name", b"bytes"))
+        )
+
+
+class TestCachingDataSource(unittest.TestCase):
+    def setUp(self):
+        self.source = MagicMock()
+        self.source.get_subject_metadata.side_effect = lambda subject_id: (
+            {"id": subject_id} if subject_id > 0 else []
+        )
+        self.source.get_subjects_metadata.side_effect = lambda subject_ids: {
+            subject_id: {"id": subject_id} for subject_id in subject_ids
+        }
+        self.bgm = CachingDataSource(
+            self.source,
+            MemoryCacheBackend(),
+            {"get_subject_metadata": 60, "search_subjects": 0},
+        )
+
+    def test_cache_hit(self):
+        """测试缓存数据源 - 命中缓存时不调用数据源, 并统计命中"""
+        self.assertEqual(self.bgm.get_subject_metadata(1), {"id": 1})
+        self.assertEqual(self.bgm.get_subject_metadata(1), {"id": 1})
+        self.assertEqual(self.source.get_subject_metadata.call_count, 1)
+        self.assertEqual(
+            self.bgm.stats()["get_subject_metadata"], {"hits": 1, "misses": 1}
+        )
+
+    def test_empty_result_not_cached(self):
+        """测试缓存数据源 - 空结果及未配置有效期的方法不缓存"""
+        self.bgm.get_subject_metadata(-1)
+        self.bgm.get_subject_metadata(-1)
+        self.assertEqual(self.source.get_subject_metadata.call_count, 2)
+        self.bgm.search_subjects("title")
+        self.bgm.search_subjects("title")
+        self.assertEqual(self.source.search_subjects.call_count, 2)
+
+    def test_batch_shares_cache(self):
+        """测试缓存数据源 - 批量获取仅请求未缓存的条目"""
+        self.bgm.get_subject_metadata(1)
+        results = self.bgm.get_subjects_metadata([1, 2, 3])
+        self.assertEqual(sorted(results), [1, 2, 3])
+        self.source.get_subjects_metadata.assert_called_once_with([2, 3])
+        self.bgm.get_subject_metadata(3)
+        self.assertEqual(self.source.get_subject_metadata.call_count, 1)
+
+    def test_thumbnail_not_cached(self):
+        """测试缓存数据源 - 封面不在数据源缓存中保存"""
+        bgm = CachingDataSource(
+            self.source, MemoryCacheBackend(), {"get_subject_thumbnail": 60}
+        )
+        self.source.get_subject_thumbnail.return_value = {"file": b"image"}
+        subject = {"id": 1}
+        bgm.get_subject_thumbnail(subject, "large")
+        bgm.get_subject_thumbnail(subject, "large")
+        self.assertEqual(self.source.get_subject_thumbnail.call_count, 2)
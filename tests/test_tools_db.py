@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from tools.db import (
+    init_sqlite3,
+    get_uploaded_thumbnail,
+    record_uploaded_thumbnail,
+    get_series_watermark,
+    save_series_watermark,
+    get_failed_series_ids,
+    get_failed_collection_series,
+    list_failed_collection_series,
+    update_failed_collection_series,
+    upsert_series_record,
+    upsert_book_record,
+    get_series_records,
+    get_book_records,
+)
+
+
+class TestDb(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.cursor, self.conn = init_sqlite3()
+
+    def tearDown(self):
+        self.conn.close()
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def test_record_uploaded_thumbnail(self):
+        """测试封面记录 - 记录上传的条目及封面哈希"""
+        self.assertIsNone(get_uploaded_thumbnail(self.conn, "s1"))
+        record_uploaded_thumbnail(self.conn, "s1", "series", "100", "hash")
+        self.assertEqual(get_uploaded_thumbnail(self.conn, "s1"), ("100", "hash"))
+        record_uploaded_thumbnail(self.conn, "s1", "series", None, None)
+        self.assertEqual(get_uploaded_thumbnail(self.conn, "s1"), (None, None))
+
+    def test_series_watermark(self):
+        """测试系列修改时间记录 - 各库/收藏分别记录"""
+        self.assertIsNone(get_series_watermark(self.conn, "library:a"))
+        save_series_watermark(self.conn, "library:a", "2025-01-01T00:00:00Z")
+        save_series_watermark(self.conn, "collection:b", "2025-01-02T00:00:00Z")
+        self.assertEqual(
+            get_series_watermark(self.conn, "library:a"), "2025-01-01T00:00:00Z"
+        )
+        self.assertEqual(
+            get_series_watermark(self.conn, "collection:b"), "2025-01-02T00:00:00Z"
+        )
+
+    def test_failed_series_in_chunks(self):
+        """测试失败收藏记录 - 分批查询失败系列, 增量更新收藏记录"""
+        series_ids = [f"s{i}" for i in range(10)]
+        for i, series_id in enumerate(series_ids):
+            upsert_series_record(self.conn, series_id, None, i % 2, series_id, "")
+        with patch("tools.db.SQLITE_IN_CHUNK_SIZE", 3):
+            failed_ids = get_failed_series_ids(self.conn, series_ids)
+            self.assertEqual(failed_ids, {"s0", "s2", "s4", "s6", "s8"})
+            update_failed_collection_series(self.conn, ["s8", "s2", "s0"], [])
+            update_failed_collection_series(self.conn, ["s4", "s6", "s2"], ["s0"])
+            self.assertEqual(
+                get_failed_collection_series(self.conn, ["s0", "s2", "s3"]), {"s2"}
+            )
+        # 按加入顺序排列，已加入的系列保持原位置
+        self.assertEqual(
+            list_failed_collection_series(self.conn), ["s8", "s2", "s4", "s6"]
+        )
+
+    def test_failed_collection_series_migration(self):
+        """测试失败收藏记录 - 旧表缺少加入顺序列时自动添加"""
+        self.conn.close()
+        os.remove("recordsRefreshed.db")
+        conn = sqlite3.connect("recordsRefreshed.db")
+        conn.execute("CREATE TABLE failed_collection_series (series_id text primary key )")
+        conn.execute("INSERT INTO failed_collection_series VALUES ('s1')")
+        conn.commit()
+        conn.close()
+        self.cursor, self.conn = init_sqlite3()
+        update_failed_collection_series(self.conn, ["s2"], [])
+        self.assertEqual(list_failed_collection_series(self.conn), ["s1", "s2"])
+
+    def test_records_in_chunks(self):
+        """测试刷新记录 - 分批查询系列及书籍记录"""
+        for i in range(5):
+            upsert_series_record(self.conn, f"s{i}", str(i), 1, f"s{i}", "")
+        upsert_book_record(self.conn, "b1", "10", 0, "b1")
+        with patch("tools.db.SQLITE_IN_CHUNK_SIZE", 2):
+            records = get_series_records(self.conn, ["s0", "s3", "s4", "s9"])
+        self.assertEqual(sorted(record[0] for record in records), ["s0", "s3", "s4"])
+        self.assertEqual(records[0][1], "0")
+        book_records = get_book_records(self.conn, ["b1", "b2"])
+        self.assertEqual(list(book_records), ["b1"])
+        self.assertEqual(book_records["b1"][2], 0)
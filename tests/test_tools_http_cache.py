@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from api.bangumi_api import BangumiApiDataSource
+from tools.http_cache import HttpCache
+
+
+def make_response(status_code, text="", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    response.json.return_value = {"id": 1} if text else None
+    return response
+
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "cache", "http_cache.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_and_get(self):
+        """测试响应缓存 - 写入后可读取, 新鲜期判断"""
+        cache = HttpCache(self.db_path, 3600)
+        self.assertIsNone(cache.get("url"))
+        cache.put("url", '"etag"', None, '{"id": 1}')
+        entry = cache.get("url")
+        self.assertEqual(entry["etag"], '"etag"')
+        self.assertEqual(entry["body"], '{"id": 1}')
+        self.assertTrue(cache.is_fresh(entry))
+        self.assertFalse(HttpCache(self.db_path, 0).is_fresh(entry))
+
+
+class TestApiHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "http_cache.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_source(self, freshness):
+        bgm = BangumiApiDataSource(http_cache=HttpCache(self.db_path, freshness))
+        bgm.r = MagicMock()
+        return bgm
+
+    def test_fresh_cache_no_request(self):
+        """测试在线数据源响应缓存 - 新鲜期内不发起请求"""
+        bgm = self.make_source(3600)
+        bgm.r.request.return_value = make_response(200, '{"id": 1}', {"ETag": '"v1"'})
+        self.assertEqual(bgm.get_subject_metadata(1), {"id": 1})
+        self.assertEqual(bgm.get_subject_metadata(1), {"id": 1})
+        self.assertEqual(bgm.r.request.call_count, 1)
+
+    def test_revalidate_not_modified(self):
+        """测试在线数据源响应缓存 - 过期后发起条件请求, 304 时使用缓存"""
+        bgm = self.make_source(0)
+        bgm.r.request.return_value = make_response(
+            200, '{"id": 1}', {"ETag": '"v1"', "Last-Modified": "Mon"}
+        )
+        bgm.get_related_subjects(1)
+        bgm.r.request.return_value = make_response(304)
+        self.assertEqual(bgm.get_related_subjects(1), {"id": 1})
+        headers = bgm.r.request.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon")
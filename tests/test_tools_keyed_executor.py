@@ -0,0 +1,52 @@
+import threading
+import time
+import unittest
+from tools.keyed_executor import KeyedExecutor
+
+
+class TestKeyedExecutor(unittest.TestCase):
+    def test_order_within_key(self):
+        """测试保序线程池 - 相同 key 的任务按提交顺序执行"""
+        executor = KeyedExecutor(4)
+        results = []
+
+        def task(value):
+            time.sleep(0.01 if value % 2 == 0 else 0)
+            results.append(value)
+
+        for value in range(10):
+            executor.submit("series", task, value)
+        executor.wait()
+        executor.shutdown()
+        self.assertEqual(results, list(range(10)))
+
+    def test_parallel_across_keys(self):
+        """测试保序线程池 - 不同 key 的任务并行执行"""
+        executor = KeyedExecutor(2)
+        barrier = threading.Barrier(2, timeout=2)
+        futures = [executor.submit(key, barrier.wait) for key in ("a", "b")]
+        executor.wait()
+        executor.shutdown()
+        for future in futures:
+            self.assertIsNone(future.exception())
+
+    def test_exception(self):
+        """测试保序线程池 - 任务异常不影响后续任务"""
+        executor = KeyedExecutor(2)
+
+        def fail():
+            raise ValueError("error")
+
+        failed = executor.submit("a", fail)
+        succeeded = executor.submit("a", lambda: 1)
+        executor.wait()
+        executor.shutdown()
+        self.assertIsInstance(failed.exception(), ValueError)
+        self.assertEqual(succeeded.result(), 1)
+
+    def test_serial(self):
+        """测试保序线程池 - 并发数为 1 时在提交线程中执行"""
+        executor = KeyedExecutor(1)
+        future = executor.submit("a", threading.current_thread)
+        self.assertTrue(future.done())
+        self.assertIs(future.result(), threading.current_thread())
@@ -73,6 +73,12 @@ class TestNumberParsingFunctions(unittest.TestCase):
         self.assertEqual(get_number("chapter 12.5"), (12.5, NumberType.NORMAL))
         self.assertEqual(get_number("10-5"), (10.5, NumberType.NORMAL))
 
+    def test_get_numbers(self):
+        # 测试批量解析：结果顺序与输入一致
+        names = ["vol.3 chap.5", "part IX", "chapter 12.5", "10-5", "abc"]
+        self.assertEqual(get_numbers(names), [get_number(n) for n in names])
+        self.assertEqual(get_numbers([]), [])
+
 
 class TestTextProcessingFunctions(unittest.TestCase):
     def test_split_words(self):
@@ -0,0 +1,48 @@
+import unittest
+from zhconv import convert as zhconv_convert
+from tools.normalize import convert, to_simplified, _get_tables
+
+
+class TestNormalize(unittest.TestCase):
+    def setUp(self):
+        convert.cache_clear()
+
+    def test_same_result_as_zhconv(self):
+        """测试简繁转换 - 与 zhconv.convert 结果一致"""
+        samples = [
+            "魔女與使魔",
+            "涼宮春日的憂鬱",
+            "台灣角川",
+            "我幹什麼不干你事。",
+            "君は淫らな僕の女王",
+            "Chobits",
+            "",
+        ]
+        for text in samples:
+            self.assertEqual(convert(text, "zh-cn"),
+                             zhconv_convert(text, "zh-cn"), text)
+
+    def test_character_table_path(self):
+        """测试简繁转换 - 不含词组首字时逐字查表"""
+        _, phrase_starts = _get_tables("zh-cn")
+        text = "魔導書的貓"
+        self.assertTrue(phrase_starts.isdisjoint(text))
+        self.assertEqual(to_simplified(text), "魔导书的猫")
+        self.assertEqual(to_simplified(text), zhconv_convert(text, "zh-cn"))
+
+    def test_memoized(self):
+        """测试简繁转换 - 重复转换命中缓存"""
+        to_simplified("涼宮春日的憂鬱")
+        to_simplified("涼宮春日的憂鬱")
+        self.assertEqual(convert.cache_info().hits, 1)
+
+    def test_uncached(self):
+        """测试简繁转换 - 不使用缓存的转换不占用缓存条目"""
+        self.assertEqual(to_simplified("涼宮春日的憂鬱", cached=False),
+                         zhconv_convert("涼宮春日的憂鬱", "zh-cn"))
+        self.assertEqual(convert.cache_info().currsize, 0)
+
+    def test_unknown_locale(self):
+        """测试简繁转换 - 未知地区不做转换"""
+        self.assertEqual(convert("與", "zh"), "與")
+
@@ -1,9 +1,12 @@
+import logging
+import os
 import unittest
+from logging.handlers import RotatingFileHandler
 from unittest.mock import MagicMock, patch
 from tempfile import TemporaryDirectory
 from unittest.mock import patch
 from tools.log import logger
-from tools.resort_search_results_list import resort_search_list, compute_name_score_by_fuzzy
+from tools.resort_search_results_list import resort_search_list, resort_search_lists, compute_name_score_by_fuzzy, _get_process_pool, _init_worker, PROCESS_POOL_MAX_WORKERS
 
 
 class TestSearchResort(unittest.TestCase):
@@ -85,6 +88,39 @@ class TestSearchResort(unittest.TestCase):
         scores = [item["fuzzScore"] for item in sorted_results]
         self.assertEqual(scores, sorted(scores, reverse=True), "得分应按降序排列")
 
+    def test_resort_search_lists(self):
+        """测试搜索结果排序器 - 批量排序与单个排序结果一致"""
+        results = [dict(self.mock_metadata, id=i, name=f"Test Series {i}") for i in range(3)]
+        tasks = {"test series 1": results, "unknown": results}
+        sorted_results = resort_search_lists(tasks, 80, False)
+        self.assertEqual(list(sorted_results), ["test series 1", "unknown"])
+        self.assertEqual(sorted_results["test series 1"][0]["id"], 1)
+        self.assertEqual(sorted_results["unknown"], [])
+
+
+    def test_resort_search_lists_process_pool(self):
+        """测试搜索结果排序器 - 共享进程池计算结果与单进程一致"""
+        results = [dict(self.mock_metadata, id=i, name=f"Test Series {i}") for i in range(3)]
+        tasks = {"test series 1": results, "unknown": results}
+        with patch("tools.resort_search_results_list.PROCESS_POOL_MIN_TASKS", 1):
+            sorted_results = resort_search_lists(tasks, 80, False)
+        self.assertIs(_get_process_pool(), _get_process_pool())
+        self.assertEqual(sorted_results, resort_search_lists(tasks, 80, False))
+        self.assertEqual(sorted_results["test series 1"][0]["id"], 1)
+        self.assertLessEqual(_get_process_pool()._max_workers, PROCESS_POOL_MAX_WORKERS)
+
+    def test_init_worker_logging(self):
+        """测试搜索结果排序器 - 子进程仅保留控制台日志, 不写入日志文件"""
+        with TemporaryDirectory() as temp_dir:
+            worker_logger = logging.Logger("worker")
+            file_handler = RotatingFileHandler(os.path.join(temp_dir, "worker.log"))
+            stream_handler = logging.StreamHandler()
+            worker_logger.addHandler(file_handler)
+            worker_logger.addHandler(stream_handler)
+            with patch("tools.resort_search_results_list.logger", worker_logger):
+                _init_worker()
+            self.assertEqual(worker_logger.handlers, [stream_handler])
+            self.assertIsNone(file_handler.stream)
 
 class TestFuzzyNameScoring(unittest.TestCase):
     def test_exact_match(self):
@@ -102,3 +138,4 @@ class TestFuzzyNameScoring(unittest.TestCase):
         infobox = [{"key": "别名", "value": [{"v": "Alias1"}, {"v": "Alias2"}]}]
         score = compute_name_score_by_fuzzy("Base", "", infobox, "Alias2")
         self.assertGreater(score, 80)  # 根据实际fuzz结果调整
+
@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from api.bangumi_api import SingleFlightDataSource
+from tools.single_flight import SingleFlight
+
+
+def run_coalesced(call, started, release, count=5):
+    """
+    首个调用阻塞期间发起其余调用，返回所有调用结果
+    """
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(call())) for _ in range(count)
+    ]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    # 等待其余调用进入合并等待
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def blocking(self, result):
+        self.started.set()
+        self.release.wait()
+        return result
+
+    def test_concurrent_calls_coalesced(self):
+        """测试请求合并 - 并发的相同调用只执行一次并共享结果"""
+        single_flight = SingleFlight()
+        func = MagicMock(side_effect=lambda: self.blocking({"id": 1}))
+        results = run_coalesced(
+            lambda: single_flight.do("key", func), self.started, self.release
+        )
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(results, [{"id": 1}] * 5)
+        self.assertEqual(single_flight._calls, {})
+
+    def test_exception_shared(self):
+        """测试请求合并 - 调用失败后移除, 之后的调用重新执行"""
+        single_flight = SingleFlight()
+        func = MagicMock(side_effect=[ValueError("error"), "ok"])
+        with self.assertRaises(ValueError):
+            single_flight.do("key", func)
+        self.assertEqual(single_flight.do("key", func), "ok")
+        self.assertEqual(func.call_count, 2)
+
+    def test_data_source(self):
+        """测试请求合并数据源 - 并发获取同一条目只请求一次"""
+        inner = MagicMock()
+        inner.get_subject_metadata.side_effect = lambda subject_id: self.blocking(
+            {"id": subject_id}
+        )
+        bgm = SingleFlightDataSource(inner)
+        results = run_coalesced(
+            lambda: bgm.get_subject_metadata(1), self.started, self.release
+        )
+        self.assertEqual(inner.get_subject_metadata.call_count, 1)
+        self.assertEqual(results, [{"id": 1}] * 5)
+
+    def test_do_many(self):
+        """测试请求合并 - 批量调用只执行未在进行中的 key"""
+        single_flight = SingleFlight()
+        func = MagicMock(side_effect=lambda: self.blocking({"id": 1}))
+        batch = MagicMock(
+            side_effect=lambda args: {arg: {"id": arg} for arg in args})
+        thread = threading.Thread(target=lambda: single_flight.do(1, func))
+        thread.start()
+        self.started.wait()
+        threading.Timer(0.1, self.release.set).start()
+        results = single_flight.do_many({1: 1, 2: 2, 3: 3}, batch)
+        thread.join()
+        batch.assert_called_once_with([2, 3])
+        self.assertEqual(results, {1: {"id": 1}, 2: {"id": 2}, 3: {"id": 3}})
+        self.assertEqual(single_flight._calls, {})
+
+    def test_data_source_many(self):
+        """测试请求合并数据源 - 并发批量搜索只请求一次"""
+        inner = MagicMock()
+        inner.search_subjects_many.side_effect = (
+            lambda queries, threshold, is_novel: self.blocking(
+                {query: [{"name": query}] for query in queries})
+        )
+        inner.get_subjects_metadata.return_value = {1: {"id": 1}}
+        bgm = SingleFlightDataSource(inner)
+        results = run_coalesced(
+            lambda: bgm.search_subjects_many(["a", "b"]), self.started, self.release
+        )
+        self.assertEqual(inner.search_subjects_many.call_count, 1)
+        self.assertEqual(results, [{"a": [{"name": "a"}], "b": [{"name": "b"}]}] * 5)
+        # 获取失败的条目不包含在结果中
+        self.assertEqual(bgm.get_subjects_metadata([1, 2]), {1: {"id": 1}})
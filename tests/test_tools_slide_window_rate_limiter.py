@@ -1,6 +1,12 @@
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
-from tools.slide_window_rate_limiter import SlideWindowCounter, slide_window_rate_limiter
+from tools.slide_window_rate_limiter import (
+    AdaptiveSlideWindowCounter,
+    SlideWindowCounter,
+    parse_retry_after,
+    slide_window_rate_limiter,
+)
 
 
 # @unittest.skip("临时跳过测试")
@@ -78,3 +84,107 @@ class TestRateLimiterDecorator(unittest.TestCase):
 
         # 验证 sleep 被调用次数
         self.assertEqual(mock_sleep.call_count, 2)  # 两次重试
+
+    @patch('time.time')
+    @patch('time.sleep')
+    def test_wait_until_oldest_expired(self, mock_sleep, mock_time):
+        """测试滑动窗口限流器 - 等待时间由最早的请求计算"""
+        mock_time.return_value = 1000.0
+
+        @slide_window_rate_limiter(max_requests=1, window_seconds=60, max_retries=1)
+        def dummy_func():
+            return "success"
+
+        self.assertEqual(dummy_func(), "success")
+        mock_time.return_value = 1015.0
+        mock_sleep.side_effect = lambda seconds: setattr(
+            mock_time, "return_value", mock_time.return_value + seconds)
+        self.assertEqual(dummy_func(), "success")
+        mock_sleep.assert_called_once_with(45.0)
+
+    def test_shared_scope(self):
+        """测试滑动窗口限流器 - 同一作用域的方法共用限流器"""
+        @slide_window_rate_limiter(max_requests=2, window_seconds=60, max_retries=0, scope="test.shared")
+        def func_a():
+            return "a"
+
+        @slide_window_rate_limiter(max_requests=2, window_seconds=60, max_retries=0, scope="test.shared")
+        def func_b():
+            return "b"
+
+        self.assertIs(func_a.limiter, func_b.limiter)
+        self.assertEqual(func_a(), "a")
+        self.assertEqual(func_b(), "b")
+        self.assertIsNone(func_a())
+        self.assertIsNone(func_b())
+
+    def test_thread_safety(self):
+        """测试滑动窗口限流器 - 多线程并发时不超过最大请求数"""
+        limiter = SlideWindowCounter(max_requests=50, window_seconds=60)
+        results = []
+
+        def worker():
+            for _ in range(20):
+                results.append(limiter.is_allowed())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 50)
+        self.assertEqual(len(limiter.requests), 50)
+
+
+class TestAdaptiveSlideWindowCounter(unittest.TestCase):
+    @patch('time.time')
+    def test_throttle_and_recover(self, mock_time):
+        """测试自适应限流器 - 限流时降速并暂停, 正常响应后逐步恢复"""
+        mock_time.return_value = 1000.0
+        limiter = AdaptiveSlideWindowCounter(max_requests=8, window_seconds=60)
+
+        self.assertTrue(limiter.record_response(429, "10"))
+        self.assertEqual(limiter.max_requests, 4)
+        self.assertEqual(limiter.current_rate(), 4)
+        self.assertFalse(limiter.is_allowed())
+        self.assertEqual(limiter.wait_time(), 10)
+
+        mock_time.return_value = 1010.0
+        self.assertTrue(limiter.is_allowed())
+
+        # 延迟过高时不恢复
+        for _ in range(4):
+            self.assertFalse(limiter.record_response(200, latency=10))
+        self.assertEqual(limiter.max_requests, 4)
+        # 每完成一个窗口容量的正常请求, 容量加一
+        for _ in range(4):
+            limiter.record_response(200, latency=0.1)
+        self.assertEqual(limiter.max_requests, 5)
+        self.assertEqual(limiter.metrics()["throttled_count"], 1)
+
+    def test_parse_retry_after(self):
+        """测试自适应限流器 - 解析 Retry-After"""
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertEqual(parse_retry_after(None), 0)
+        self.assertEqual(parse_retry_after("invalid"), 0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+
+    @patch('time.time')
+    @patch('time.sleep')
+    def test_decorator_resend_throttled(self, mock_sleep, mock_time):
+        """测试自适应限流器 - 被限流的请求排队后重发, 不会被丢弃"""
+        mock_time.return_value = 1000.0
+        mock_sleep.side_effect = lambda seconds: setattr(
+            mock_time, "return_value", mock_time.return_value + seconds)
+        responses = [
+            MagicMock(status_code=429, headers={"Retry-After": "5"}),
+            MagicMock(status_code=200, headers={}),
+        ]
+
+        @slide_window_rate_limiter(max_retries=None, scope="test.adaptive")
+        def request():
+            return responses.pop(0)
+
+        self.assertEqual(request().status_code, 200)
+        self.assertEqual(request.limiter.throttled_count, 1)
+        mock_sleep.assert_called_once_with(5.0)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+from api.bangumi_api import BangumiApiDataSource
+from tools.thumbnail_cache import ThumbnailCache
+
+
+class TestThumbnailCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "thumbnails")
+        self.cache = ThumbnailCache(self.cache_dir, 10)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_and_get(self):
+        """测试封面缓存 - 写入后可读取, 重新加载后仍然有效"""
+        self.assertIsNone(self.cache.get(1, "large"))
+        self.cache.put(1, "large", b"abc")
+        self.assertEqual(self.cache.get(1, "large"), b"abc")
+        self.assertIsNone(self.cache.get(1, "common"))
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, "1_large")))
+        self.assertEqual(ThumbnailCache(self.cache_dir, 10).get(1, "large"), b"abc")
+
+    def test_integrity_check(self):
+        """测试封面缓存 - 文件损坏时视为未命中并移除"""
+        self.cache.put(1, "large", b"abc")
+        with open(os.path.join(self.cache_dir, "1_large"), "wb") as f:
+            f.write(b"abd")
+        self.assertIsNone(self.cache.get(1, "large"))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "1_large")))
+
+    def test_lru_eviction(self):
+        """测试封面缓存 - 超出容量时淘汰最久未访问的封面"""
+        self.cache.put(1, "large", b"aaaa")
+        self.cache.put(2, "large", b"bbbb")
+        # 1 写入更早, 但随后被访问, 应淘汰 2
+        past = time.time() - 100
+        os.utime(os.path.join(self.cache_dir, "1_large"), (past, past))
+        os.utime(os.path.join(self.cache_dir, "2_large"), (past + 1, past + 1))
+        self.cache.get(1, "large")
+        self.cache.put(3, "large", b"cccc")
+        self.assertEqual(self.cache.get(1, "large"), b"aaaa")
+        self.assertIsNone(self.cache.get(2, "large"))
+        self.assertEqual(self.cache.get(3, "large"), b"cccc")
+
+    def test_oversized_content_skipped(self):
+        """测试封面缓存 - 超过容量上限的封面不缓存"""
+        self.cache.put(1, "large", b"x" * 11)
+        self.assertIsNone(self.cache.get(1, "large"))
+
+
+class TestApiThumbnailCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ThumbnailCache(self.temp_dir.name, 1024)
+        self.bgm = BangumiApiDataSource(thumbnail_cache=self.cache)
+        self.bgm._download_thumbnail = MagicMock(return_value=b"image")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_download_once(self):
+        """测试在线数据源获取封面 - 命中缓存时不再下载"""
+        subject = {"id": 1, "name": "Test", "images": {"large": "url"}}
+        for _ in range(3):
+            files = self.bgm.get_subject_thumbnail(subject, "large")
+            self.assertEqual(files["file"], ("Test", b"image"))
+        self.bgm._download_thumbnail.assert_called_once_with("url")
+
+    def test_download_failed_not_cached(self):
+        """测试在线数据源获取封面 - 下载失败时不写入缓存"""
+        subject = {"id": 1, "name": "Test", "images": {"large": "url"}}
+        self.bgm._download_thumbnail.side_effect = Exception("network")
+        self.assertEqual(self.bgm.get_subject_thumbnail(subject, "large"), [])
+        self.assertIsNone(self.cache.get(1, "large"))
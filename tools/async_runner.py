@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*- #
+# ------------------------------------------------------------------
+# Description: 在后台事件循环中以有限并发执行阻塞调用
+# ------------------------------------------------------------------
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncRunner:
+    """
+    后台事件循环及共享信号量
+
+    首次提交时在后台线程启动事件循环，所有调用方提交的协程都在该事件循环中执行，
+    经 call 执行的阻塞调用总数不超过 max_concurrency
+    """
+
+    def __init__(self, max_concurrency, thread_name_prefix="AsyncRunner"):
+        self.max_concurrency = max(1, max_concurrency)
+        self.thread_name_prefix = thread_name_prefix
+        self._loop = None
+        self._lock = threading.Lock()
+        # 在事件循环线程中首次使用时创建
+        self._semaphore = None
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                # 阻塞调用在与并发数相同大小的线程池中执行
+                loop.set_default_executor(
+                    ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix=self.thread_name_prefix,
+                    )
+                )
+                threading.Thread(
+                    target=loop.run_forever,
+                    name=f"{self.thread_name_prefix}Loop",
+                    daemon=True,
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro):
+        """
+        将协程提交到后台事件循环，返回 concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    def run(self, coro):
+        """
+        在后台事件循环中执行协程并等待结果，可在任意线程(包括运行中的其他事件循环)中调用
+        """
+        return self.submit(coro).result()
+
+    async def run_async(self, coro):
+        """
+        在后台事件循环中执行协程，供其他事件循环中的协程等待
+        """
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def call(self, func, *args, **kwargs):
+        """
+        以共享信号量限制并发执行阻塞调用，仅在后台事件循环中使用
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
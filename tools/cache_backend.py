@@ -0,0 +1,128 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from tools.log import logger
+
+# 内存缓存条目上限
+MEMORY_CACHE_MAX_ENTRIES = 4096
+
+
+class CacheBackend(ABC):
+    """
+    缓存后端基类
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """
+        读取缓存，返回 (是否命中, 值)
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """
+        写入缓存，ttl 为有效期（秒）
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    进程内 LRU 缓存后端，缓存值与调用方共享，调用方不应修改
+    """
+
+    def __init__(self, max_entries=MEMORY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteCacheBackend(CacheBackend):
+    """
+    SQLite 文件缓存后端，重启后缓存仍然有效
+    """
+
+    def __init__(self, db_path):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (key text primary key,value blob,expires_at real)"""
+        )
+        # 清理已过期的缓存
+        self.conn.execute("DELETE FROM cache WHERE expires_at<=?", (time.time(),))
+        self.conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value,expires_at FROM cache WHERE key=?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return False, None
+        try:
+            return True, pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"缓存读取失败: {key}, {e}")
+            self.delete(key)
+            return False, None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key,value,expires_at) VALUES (?,?,?)",
+                (key, pickle.dumps(value), time.time() + ttl),
+            )
+            self.conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self.conn.execute("DELETE FROM cache WHERE key=?", (key,))
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM cache")
+            self.conn.commit()
@@ -1,7 +1,13 @@
 import sqlite3
+import threading
 from time import strftime, localtime
 from tools.log import logger
 
+# 刷新线程与写入线程共用同一连接，串行化读写
+DB_WRITE_LOCK = threading.Lock()
+# 单条 IN 查询的最大参数数量，低于 SQLite 默认的变量数上限
+SQLITE_IN_CHUNK_SIZE = 500
+
 
 def upsert_series_record(
     conn, series_id, subject_id, update_success, series_name, bangumi_name
@@ -17,36 +23,38 @@ def upsert_series_record(
     :param refresh_time: 刷新时间
     :param bangumi_name: bangumi名称
     """
-    c = conn.cursor()
-    # 0 (false) and 1 (true)
-    c.execute(
-        "INSERT OR REPLACE INTO refreshed_series (series_id,subject_id,update_success,series_name,bangumi_name,refresh_time) VALUES (?,?,?,?,?,?)",
-        (
-            series_id,
-            subject_id,
-            update_success,
-            series_name,
-            bangumi_name,
-            strftime("%Y-%m-%d %H:%M:%S", localtime()),
-        ),
-    )
-    conn.commit()
+    with DB_WRITE_LOCK:
+        c = conn.cursor()
+        # 0 (false) and 1 (true)
+        c.execute(
+            "INSERT OR REPLACE INTO refreshed_series (series_id,subject_id,update_success,series_name,bangumi_name,refresh_time) VALUES (?,?,?,?,?,?)",
+            (
+                series_id,
+                subject_id,
+                update_success,
+                series_name,
+                bangumi_name,
+                strftime("%Y-%m-%d %H:%M:%S", localtime()),
+            ),
+        )
+        conn.commit()
 
 
 def upsert_book_record(conn, book_id, subject_id, update_success, book_name):
-    c = conn.cursor()
-    # 0 (false) and 1 (true)
-    c.execute(
-        "INSERT OR REPLACE INTO refreshed_books (book_id,subject_id,update_success,book_name,refresh_time) VALUES (?,?,?,?,?)",
-        (
-            book_id,
-            subject_id,
-            update_success,
-            book_name,
-            strftime("%Y-%m-%d %H:%M:%S", localtime()),
-        ),
-    )
-    conn.commit()
+    with DB_WRITE_LOCK:
+        c = conn.cursor()
+        # 0 (false) and 1 (true)
+        c.execute(
+            "INSERT OR REPLACE INTO refreshed_books (book_id,subject_id,update_success,book_name,refresh_time) VALUES (?,?,?,?,?)",
+            (
+                book_id,
+                subject_id,
+                update_success,
+                book_name,
+                strftime("%Y-%m-%d %H:%M:%S", localtime()),
+            ),
+        )
+        conn.commit()
 
 
 def init_sqlite3():
@@ -66,6 +74,25 @@ def init_sqlite3():
         "CREATE INDEX IF NOT EXISTS idx_subject_id ON refreshed_series(subject_id)"
     )
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_book_id ON refreshed_books(book_id)")
+    # 已上传 Bangumi 封面的系列及书籍，避免每次上传前查询 Komga
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS uploaded_thumbnails (item_id text primary key,item_type text,subject_id text,image_hash text,upload_time text )"""
+    )
+    # 各库/收藏已处理到的系列 lastModified
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS series_watermarks (scope text primary key,last_modified text )"""
+    )
+    # 已加入 FAILED_COLLECTION 的系列，added_seq 为加入收藏的顺序
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS failed_collection_series (series_id text primary key,added_seq integer )"""
+    )
+    columns = {
+        row[1] for row in cursor.execute("PRAGMA table_info(failed_collection_series)")
+    }
+    if "added_seq" not in columns:
+        cursor.execute(
+            "ALTER TABLE failed_collection_series ADD COLUMN added_seq integer"
+        )
     return cursor, conn
 
 
@@ -105,3 +132,165 @@ def get_series_update_status(conn, series_id):
         return result[0]
     else:
         return None
+
+
+def get_uploaded_thumbnail(conn, item_id):
+    """
+    查询系列或书籍的封面记录，返回 (subject_id, image_hash)，无记录时返回 None
+    """
+    with DB_WRITE_LOCK:
+        return (
+            conn.cursor()
+            .execute(
+                "SELECT subject_id, image_hash FROM uploaded_thumbnails WHERE item_id = ?",
+                (item_id,),
+            )
+            .fetchone()
+        )
+
+
+def record_uploaded_thumbnail(conn, item_id, item_type, subject_id, image_hash):
+    """
+    记录系列或书籍的封面状态
+
+    :param item_type: series 或 book
+    :param subject_id: 上传封面对应的 bangumi id，Komga 中已有其他海报时为 None
+    :param image_hash: 上传封面的 sha256，Komga 中已有其他海报时为 None
+    """
+    with DB_WRITE_LOCK:
+        conn.cursor().execute(
+            "INSERT OR REPLACE INTO uploaded_thumbnails (item_id,item_type,subject_id,image_hash,upload_time) VALUES (?,?,?,?,?)",
+            (
+                item_id,
+                item_type,
+                subject_id,
+                image_hash,
+                strftime("%Y-%m-%d %H:%M:%S", localtime()),
+            ),
+        )
+        conn.commit()
+
+
+def get_series_watermark(conn, scope):
+    """
+    查询库/收藏已处理到的系列 lastModified，无记录时返回 None
+    """
+    with DB_WRITE_LOCK:
+        row = (
+            conn.cursor()
+            .execute(
+                "SELECT last_modified FROM series_watermarks WHERE scope = ?", (scope,)
+            )
+            .fetchone()
+        )
+    return row[0] if row else None
+
+
+def save_series_watermark(conn, scope, last_modified):
+    with DB_WRITE_LOCK:
+        conn.cursor().execute(
+            "INSERT OR REPLACE INTO series_watermarks (scope,last_modified) VALUES (?,?)",
+            (scope, last_modified),
+        )
+        conn.commit()
+
+
+def _fetch_in_chunks(conn, sql, ids):
+    """
+    分批执行 IN 查询，sql 中以 {} 表示参数占位，返回全部结果行
+    """
+    ids = list(ids)
+    rows = []
+    with DB_WRITE_LOCK:
+        c = conn.cursor()
+        for start in range(0, len(ids), SQLITE_IN_CHUNK_SIZE):
+            chunk = ids[start: start + SQLITE_IN_CHUNK_SIZE]
+            rows.extend(
+                c.execute(sql.format(",".join("?" for _ in chunk)), chunk).fetchall()
+            )
+    return rows
+
+
+def _select_in_chunks(conn, sql, ids):
+    """
+    分批执行 IN 查询，返回第一列的集合
+    """
+    return {row[0] for row in _fetch_in_chunks(conn, sql, ids)}
+
+
+def get_series_records(conn, series_ids):
+    """
+    返回 series_ids 对应的 refreshed_series 记录列表
+    """
+    return _fetch_in_chunks(
+        conn, "SELECT * FROM refreshed_series WHERE series_id IN ({})", series_ids
+    )
+
+
+def get_book_records(conn, book_ids):
+    """
+    返回 book_ids 对应的 refreshed_books 记录，{book_id: 记录}
+    """
+    return {
+        record[0]: record
+        for record in _fetch_in_chunks(
+            conn, "SELECT * FROM refreshed_books WHERE book_id IN ({})", book_ids
+        )
+    }
+
+
+def get_failed_series_ids(conn, series_ids):
+    """
+    返回 series_ids 中刷新失败的系列
+    """
+    return _select_in_chunks(
+        conn,
+        "SELECT series_id FROM refreshed_series WHERE update_success = 0 and series_id IN ({})",
+        series_ids,
+    )
+
+
+def get_failed_collection_series(conn, series_ids):
+    """
+    返回 series_ids 中已加入 FAILED_COLLECTION 的系列
+    """
+    return _select_in_chunks(
+        conn,
+        "SELECT series_id FROM failed_collection_series WHERE series_id IN ({})",
+        series_ids,
+    )
+
+
+def list_failed_collection_series(conn):
+    """
+    返回已加入 FAILED_COLLECTION 的全部系列，按加入顺序排列
+    """
+    with DB_WRITE_LOCK:
+        return [
+            row[0]
+            for row in conn.cursor()
+            .execute(
+                "SELECT series_id FROM failed_collection_series ORDER BY added_seq, rowid"
+            )
+            .fetchall()
+        ]
+
+
+def update_failed_collection_series(conn, added, removed):
+    """
+    记录加入及移出 FAILED_COLLECTION 的系列，added 按加入顺序排列
+    """
+    with DB_WRITE_LOCK:
+        c = conn.cursor()
+        last_seq = c.execute(
+            "SELECT COALESCE(MAX(added_seq), 0) FROM failed_collection_series"
+        ).fetchone()[0]
+        c.executemany(
+            "INSERT OR IGNORE INTO failed_collection_series (series_id,added_seq) VALUES (?,?)",
+            [(series_id, last_seq + i) for i, series_id in enumerate(added, 1)],
+        )
+        c.executemany(
+            "DELETE FROM failed_collection_series WHERE series_id = ?",
+            [(series_id,) for series_id in removed],
+        )
+        conn.commit()
@@ -14,14 +14,28 @@ class InitEnv:
         # 读取配置
         BANGUMI_DATA_SOURCE_CONFIG = {
             "access_token": BANGUMI_ACCESS_TOKEN,
+            "api_concurrency": BANGUMI_API_CONCURRENCY,
             "use_local_archive": USE_BANGUMI_ARCHIVE,
             "local_archive_folder": ARCHIVE_FILES_DIR,
+            "hedge_delay": ARCHIVE_HEDGE_DELAY,
+            "miss_cache_ttl": ARCHIVE_MISS_CACHE_TTL,
+            "cache_folder": CACHE_FILES_DIR,
+            "thumbnail_cache_max_size": THUMBNAIL_CACHE_MAX_SIZE,
+            "api_cache_freshness": BANGUMI_API_CACHE_FRESHNESS,
+            "cache_backend": DATA_SOURCE_CACHE_BACKEND,
+            "cache_max_entries": DATA_SOURCE_CACHE_MAX_ENTRIES,
+            "cache_ttl": DATA_SOURCE_CACHE_TTL,
+            "search_cache_ttl": SEARCH_CACHE_TTL,
         }
         # 初始化 bangumi API
         self.bgm = BangumiDataSourceFactory.create(BANGUMI_DATA_SOURCE_CONFIG)
         # 初始化 komga API
+        # 连接池需同时容纳并发写入线程、分页预取及主线程的连接
         self.komga = komga_api.KomgaApi(
-            KOMGA_BASE_URL, KOMGA_EMAIL, KOMGA_EMAIL_PASSWORD
+            KOMGA_BASE_URL,
+            KOMGA_EMAIL,
+            KOMGA_EMAIL_PASSWORD,
+            max_connections=KOMGA_WRITE_CONCURRENCY + 2,
         )
 
     def prepare_procedure(self):
@@ -8,9 +8,17 @@ class NumberType:
     NONE = "none"
 
 
+# 预编译匹配规则，避免每次解析都重新编译
+RE_NUMBER_WITH_PREFIX = re.compile(r"vol\.(\d+)|chap\.(\d+)", re.IGNORECASE)
+# 罗马数字紧邻前后无英文字母
+RE_ROMAN_NUMBER = re.compile(r"(?<![A-Z])[IVXLCDM]+(?![A-Z])", re.IGNORECASE)
+RE_DECIMAL_NUMBER = re.compile(r"\d+\.\d+")
+RE_INT_NUMBER = re.compile(r"\d+")
+FORMAT_TABLE = str.maketrans({"-": ".", "_": "."})
+
+
 def get_number_with_prefix(s):
-    pattern = r"vol\.(\d+)|chap\.(\d+)"
-    match = re.search(pattern, s, re.IGNORECASE)
+    match = RE_NUMBER_WITH_PREFIX.search(s)
 
     if match:
         if match.group(1):
@@ -44,9 +52,7 @@ def roman_to_integer(s):
 
 
 def get_roman_number(s):
-    # 罗马数字紧邻前后无英文字母
-    roman_pattern = r"(?<![A-Z])[IVXLCDM]+(?![A-Z])"
-    match = re.search(roman_pattern, s, re.IGNORECASE)
+    match = RE_ROMAN_NUMBER.search(s)
 
     if match:
         roman_numeral = match.group(0)
@@ -56,14 +62,11 @@ def get_roman_number(s):
 
 
 def normal(s):
-    # Define the pattern to match decimal numbers in the format of "xx.xx"
-    decimal_pattern = r"\d+\.\d+"
-    # Use the `re.findall` function to search for all occurrences of the pattern in the input string
-    match = re.findall(decimal_pattern, s)
-    # If no decimal numbers are found, change the pattern to match integer numbers
+    # Search for all decimal numbers in the format of "xx.xx"
+    match = RE_DECIMAL_NUMBER.findall(s)
+    # If no decimal numbers are found, match integer numbers instead
     if not match:
-        int_pattern = r"\d+"
-        match = re.findall(int_pattern, s)
+        match = RE_INT_NUMBER.findall(s)
 
     if match:
         return float(match[-1]), NumberType.NORMAL
@@ -72,18 +75,26 @@ def normal(s):
 
 def format_string(s):
     # e.g. 16-5
-    return s.replace("-", ".").replace("_", ".")
+    return s.translate(FORMAT_TABLE)
+
+
+PARSERS = (get_number_with_prefix, get_roman_number, normal)
 
 
 def get_number(s):
 
     s = format_string(s)
 
-    parsers = [get_number_with_prefix, get_roman_number, normal]
-
-    for parser in parsers:
+    for parser in PARSERS:
         number, type = parser(s)
         if number:
             return number, type
 
     return None, NumberType.NONE
+
+
+def get_numbers(names):
+    """
+    一次解析多个名称，返回与 names 顺序一致的 [(number, type), ...]
+    """
+    return [get_number(name) for name in names]
@@ -1,5 +1,5 @@
 import re
-from zhconv import convert
+from tools.normalize import to_simplified
 
 from corpus.vocabulary import ALL_VOCABULARY
 
@@ -69,7 +69,7 @@ def check_word(word, corpus, vocabulary):
     if word in vocabulary:
         return "常用词汇"
     # Check if the word is in the corpus or if its simplified Chinese equivalent is in the corpus
-    elif word in corpus or convert(word, "zh-cn") in corpus:
+    elif word in corpus or to_simplified(word) in corpus:
         return "人名"
     elif check_string_with_x(word):
         return "多人名"
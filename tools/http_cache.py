@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import threading
+import time
+from tools.log import logger
+
+
+class HttpCache:
+    """
+    持久化 HTTP 响应缓存
+
+    按 URL 保存响应体及 ETag/Last-Modified。新鲜期内直接使用缓存，
+    过期后由调用方发起条件请求，收到 304 时刷新缓存时间并继续使用缓存的响应体
+    """
+
+    def __init__(self, db_path: str, freshness: float):
+        """
+        :param db_path: 缓存数据库路径
+        :param freshness: 缓存新鲜期（秒）
+        """
+        self.freshness = freshness
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS http_cache (url text primary key,etag text,last_modified text,body text,fetched_at real)"""
+        )
+        self.conn.commit()
+
+    def get(self, url: str):
+        """
+        读取缓存条目，不存在时返回 None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag,last_modified,body,fetched_at FROM http_cache WHERE url=?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "body": row[2],
+            "fetched_at": row[3],
+        }
+
+    def is_fresh(self, entry) -> bool:
+        """
+        缓存条目是否仍在新鲜期内
+        """
+        return time.time() - entry["fetched_at"] < self.freshness
+
+    def put(self, url: str, etag, last_modified, body: str):
+        """
+        写入或覆盖缓存条目
+        """
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url,etag,last_modified,body,fetched_at) VALUES (?,?,?,?,?)",
+                (url, etag, last_modified, body, time.time()),
+            )
+            self.conn.commit()
+
+    def touch(self, url: str):
+        """
+        条件请求返回 304 后重置缓存时间
+        """
+        with self._lock:
+            self.conn.execute(
+                "UPDATE http_cache SET fetched_at=? WHERE url=?", (time.time(), url)
+            )
+            self.conn.commit()
+        logger.debug(f"缓存验证有效: {url}")
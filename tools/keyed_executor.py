@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*- #
+# ------------------------------------------------------------------
+# Description: 按 key 保序执行任务的线程池
+# ------------------------------------------------------------------
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from tools.log import logger
+
+
+class KeyedExecutor:
+    """
+    相同 key 的任务按提交顺序依次执行，不同 key 的任务并行执行
+
+    max_workers 不大于 1 时在提交线程中直接执行
+    """
+
+    def __init__(self, max_workers, thread_name_prefix="KeyedExecutor"):
+        self.max_workers = max(1, max_workers)
+        self._executor = None
+        if self.max_workers > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=thread_name_prefix
+            )
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        # key -> 待执行任务队列，存在即表示该 key 已有线程在执行
+        self._queues = {}
+        self._pending = 0
+
+    def submit(self, key, func, *args, **kwargs):
+        """
+        提交任务，返回 Future
+        """
+        future = Future()
+        task = (future, func, args, kwargs)
+        if self._executor is None:
+            self._run(task)
+            return future
+        with self._lock:
+            self._pending += 1
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.append(task)
+                return future
+            self._queues[key] = deque([task])
+        self._executor.submit(self._drain, key)
+        return future
+
+    def _drain(self, key):
+        while True:
+            with self._lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                task = queue.popleft()
+            self._run(task)
+            with self._lock:
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.notify_all()
+
+    @staticmethod
+    def _run(task):
+        future, func, args, kwargs = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            logger.error(f"执行写入任务出错: {e}")
+            future.set_exception(e)
+
+    def wait(self):
+        """
+        等待所有已提交的任务完成
+        """
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+
+    def shutdown(self):
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
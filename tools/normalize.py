@@ -0,0 +1,66 @@
+import threading
+from functools import lru_cache
+from zhconv import zhconv
+
+# 转换结果缓存条目上限
+ZHCONV_CACHE_SIZE = 65536
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def _get_tables(locale):
+    """
+    获取指定地区的单字转换表及词组首字集合
+
+    字符串中不含任何词组首字时，zhconv 的最长匹配退化为逐字替换，可直接用 str.translate 完成
+    """
+    tables = _tables.get(locale)
+    if tables is None:
+        with _tables_lock:
+            tables = _tables.get(locale)
+            if tables is None:
+                zhdict = zhconv.getdict(locale)
+                char_table = {}
+                phrase_starts = set()
+                for key, value in zhdict.items():
+                    if len(key) == 1:
+                        char_table[ord(key)] = value
+                    elif key:
+                        phrase_starts.add(key[0])
+                tables = (char_table, frozenset(phrase_starts))
+                _tables[locale] = tables
+    return tables
+
+
+def convert_uncached(text, locale="zh-cn"):
+    """
+    不带缓存的 zhconv.convert
+
+    无需词组转换的字符串走逐字查表，其余字符串仍使用 zhconv 的最长匹配转换
+    """
+    if not text or locale not in zhconv.Locales:
+        return text
+    char_table, phrase_starts = _get_tables(locale)
+    if phrase_starts.isdisjoint(text):
+        return text.translate(char_table)
+    return zhconv.convert(text, locale)
+
+
+@lru_cache(maxsize=ZHCONV_CACHE_SIZE)
+def convert(text, locale="zh-cn"):
+    """
+    带缓存的 convert_uncached
+    """
+    return convert_uncached(text, locale)
+
+
+def to_simplified(text, cached=True):
+    """
+    转换为简体中文
+
+    一次性的大批量转换(如构建索引)应传入 cached=False，避免挤出标题与查询的缓存
+    """
+    if cached:
+        return convert(text, "zh-cn")
+    return convert_uncached(text, "zh-cn")
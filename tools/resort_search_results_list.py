@@ -1,22 +1,46 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from thefuzz import fuzz
 from api.bangumi_model import SubjectPlatform
+from tools.log import logger
+from tools.normalize import to_simplified
+
+# 任务数少于该值时直接在当前进程计算，避免进程池启动与序列化开销
+PROCESS_POOL_MIN_TASKS = 64
+# 进程池的最大进程数，子进程常驻，不随 CPU 核数无限增加
+PROCESS_POOL_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# 全局共享的进程池，首次使用时创建
+_process_pool = None
+_process_pool_lock = threading.Lock()
 
 
 def compute_name_score_by_fuzzy(name: str, name_cn: str, infobox, target: str) -> int:
     """
     Use fuzzy to computes the Levenshtein distance between name, name_cn, and infobox "别名" (if exists) and the target string.
+    Traditional Chinese targets are also compared in their simplified form and the higher score is kept.
     """
     target = target.lower()
-    score = fuzz.ratio(name.lower(), target)
+    targets = {target, to_simplified(target)}
+
+    def _ratio(candidate):
+        candidate = candidate.lower()
+        return max(fuzz.ratio(candidate, t) for t in targets)
+
+    score = _ratio(name)
     if name_cn:
-        score = max(score, fuzz.ratio(name_cn.lower(), target))
+        score = max(score, _ratio(name_cn))
     for item in infobox:
         if item["key"] == "别名":
             if isinstance(item["value"], (list,)):  # 判断传入值是否为列表
                 for alias in item["value"]:
-                    score = max(score, fuzz.ratio(alias["v"].lower(), target))
+                    score = max(score, _ratio(alias["v"]))
             else:
-                score = max(score, fuzz.ratio(item["value"].lower(), target))
+                score = max(score, _ratio(item["value"]))
     return score
 
 
@@ -53,3 +77,53 @@ def resort_search_list(query, results, threshold, is_novel=False):
     sort_results.sort(key=lambda x: x["fuzzScore"], reverse=True)
 
     return sort_results
+
+
+def _resort_search_task(args):
+    return resort_search_list(*args)
+
+
+def _init_worker():
+    """
+    子进程初始化: 移除导入 tools.log 时添加的日志文件，仅输出到控制台，避免多个进程同时写入及轮转同一日志文件
+    """
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.FileHandler):
+            logger.removeHandler(handler)
+            handler.close()
+
+
+def _get_process_pool():
+    """
+    获取共享进程池
+
+    使用 spawn 方式启动子进程: 当前进程已有 SSE、写入等线程, fork 会继承其他线程持有的锁(如日志、限流器)导致死锁
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PROCESS_POOL_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            atexit.register(_process_pool.shutdown, wait=False)
+        return _process_pool
+
+
+def resort_search_lists(tasks, threshold, is_novel=False):
+    """
+    批量排序搜索结果
+
+    tasks 为 {query: results}, 返回 {query: 排序后的条目}; 任务较多时使用共享进程池并行计算得分
+    """
+    queries = list(tasks)
+    args = [(query, tasks[query], threshold, is_novel) for query in queries]
+    if len(args) >= PROCESS_POOL_MIN_TASKS:
+        try:
+            sorted_results = list(
+                _get_process_pool().map(_resort_search_task, args, chunksize=16))
+            return dict(zip(queries, sorted_results))
+        except Exception as e:
+            logger.warning(f"进程池计算得分失败, 改为单进程计算: {e}")
+    return {query: _resort_search_task(arg) for query, arg in zip(queries, args)}
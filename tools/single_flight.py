@@ -0,0 +1,95 @@
+import threading
+from tools.log import logger
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    请求合并
+
+    同一 key 的并发调用只执行一次，其余调用等待并共享其结果（或异常）；
+    调用完成后即移除，之后的调用会重新执行
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            logger.debug("合并进行中的请求: %s", key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def do_many(self, keys, func):
+        """
+        批量请求合并
+
+        keys 为 {key: 参数}; 已有进行中调用的 key 等待并共享其结果，
+        其余 key 的参数以列表一次传入 func 执行，func 返回 {参数: 结果}，缺失的参数结果为 None。
+        返回 {key: 结果}
+        """
+        calls = {}
+        leading = {}
+        with self._lock:
+            for key, arg in keys.items():
+                call = self._calls.get(key)
+                if call is None:
+                    call = _Call()
+                    self._calls[key] = call
+                    leading[key] = arg
+                calls[key] = call
+
+        if leading:
+            try:
+                fetched = func(list(leading.values()))
+                for key, arg in leading.items():
+                    calls[key].result = fetched.get(arg)
+            except BaseException as e:
+                for key in leading:
+                    calls[key].error = e
+                raise
+            finally:
+                with self._lock:
+                    for key in leading:
+                        del self._calls[key]
+                for key in leading:
+                    calls[key].done.set()
+
+        if len(calls) > len(leading):
+            logger.debug("合并进行中的请求: %s 个", len(calls) - len(leading))
+        results = {}
+        for key, call in calls.items():
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[key] = call.result
+        return results
@@ -1,5 +1,7 @@
+import threading
 import time
 from collections import deque
+from email.utils import parsedate_to_datetime
 from functools import wraps
 from tools.log import logger
 
@@ -16,33 +18,179 @@ class SlideWindowCounter:
         self.max_requests = max_requests
         self.window_seconds = window_seconds
         self.requests = deque()
+        self._lock = threading.RLock()
 
-    def is_allowed(self) -> bool:
-        """检查是否允许请求"""
-        current_time = time.time()
+    def _expire(self, current_time):
         # 清理过期请求
-        while self.requests and current_time - self.requests[0] > self.window_seconds:
-            expired_time = self.requests.popleft()
+        while self.requests and current_time - self.requests[0] >= self.window_seconds:
+            self.requests.popleft()
             logger.debug("时间: %s | 移除过期请求", current_time)
-        if len(self.requests) < self.max_requests:
-            self.requests.append(current_time)
-            logger.debug(
-                "时间: %s | 允许请求 | 剩余: %s)",
-                current_time,
-                self.remaining_requests(),
-            )
-            return True
-        else:
-            logger.debug(
-                "时间: %s | 拒绝请求 | 达到最大请求数: %s)",
-                current_time,
-                self.max_requests,
-            )
-            return False
+
+    def is_allowed(self) -> bool:
+        """检查是否允许请求"""
+        with self._lock:
+            current_time = time.time()
+            self._expire(current_time)
+            if len(self.requests) < self.max_requests:
+                self.requests.append(current_time)
+                logger.debug(
+                    "时间: %s | 允许请求 | 剩余: %s)",
+                    current_time,
+                    self.max_requests - len(self.requests),
+                )
+                return True
+            else:
+                logger.debug(
+                    "时间: %s | 拒绝请求 | 达到最大请求数: %s)",
+                    current_time,
+                    self.max_requests,
+                )
+                return False
+
+    def wait_time(self) -> float:
+        """距离最早的请求移出窗口还需等待的秒数"""
+        with self._lock:
+            if len(self.requests) < self.max_requests:
+                return 0
+            return max(0, self.requests[0] + self.window_seconds - time.time())
 
     def remaining_requests(self) -> int:
         """获取剩余可用请求数"""
-        return self.max_requests - len(self.requests)
+        with self._lock:
+            return self.max_requests - len(self.requests)
+
+
+def parse_retry_after(value) -> float:
+    """解析 Retry-After 响应头（秒数或 HTTP 日期），无法解析时返回 0"""
+    if not value:
+        return 0
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0
+
+
+class AdaptiveSlideWindowCounter(SlideWindowCounter):
+    """
+    自适应滑动窗口限流器
+
+    收到 429/5xx 时窗口容量减半，并按 Retry-After 暂停请求；
+    响应正常时每完成一个窗口容量的请求，容量加一，直至初始上限。响应延迟超过阈值时暂停增长
+    """
+
+    THROTTLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_requests: int,
+        window_seconds: float,
+        min_requests: int = 1,
+        latency_threshold: float = 5,
+    ):
+        super().__init__(max_requests, window_seconds)
+        self.limit = max_requests
+        self.min_requests = max(1, min(min_requests, max_requests))
+        self.latency_threshold = latency_threshold
+        self.blocked_until = 0
+        self.throttled_count = 0
+        self._healthy_count = 0
+
+    def is_allowed(self) -> bool:
+        with self._lock:
+            current_time = time.time()
+            if current_time < self.blocked_until:
+                logger.debug(
+                    "时间: %s | 拒绝请求 | 暂停至: %s)", current_time, self.blocked_until
+                )
+                return False
+            return super().is_allowed()
+
+    def wait_time(self) -> float:
+        with self._lock:
+            return max(super().wait_time(), self.blocked_until - time.time())
+
+    def record_response(self, status_code: int, retry_after=None, latency=None) -> bool:
+        """
+        根据响应调整速率，返回请求是否被限流
+        """
+        with self._lock:
+            if status_code in self.THROTTLE_STATUS_CODES:
+                self.throttled_count += 1
+                self._healthy_count = 0
+                self.max_requests = max(self.min_requests, self.max_requests // 2)
+                # 未提供 Retry-After 时至少暂停一个请求间隔
+                pause = parse_retry_after(retry_after) or (
+                    self.window_seconds / self.max_requests
+                )
+                self.blocked_until = max(self.blocked_until, time.time() + pause)
+                logger.warning(
+                    "请求被限流(%s), 暂停 %.1f 秒, 速率降至 %s 次/%s 秒",
+                    status_code,
+                    pause,
+                    self.max_requests,
+                    self.window_seconds,
+                )
+                return True
+            if latency is not None and latency > self.latency_threshold:
+                self._healthy_count = 0
+                return False
+            if self.max_requests < self.limit:
+                self._healthy_count += 1
+                if self._healthy_count >= self.max_requests:
+                    self._healthy_count = 0
+                    self.max_requests += 1
+                    logger.debug(
+                        "速率恢复至 %s 次/%s 秒", self.max_requests, self.window_seconds
+                    )
+            return False
+
+    def current_rate(self) -> float:
+        """当前允许的每分钟请求数"""
+        with self._lock:
+            return self.max_requests * 60 / self.window_seconds
+
+    def metrics(self) -> dict:
+        """限流器状态指标"""
+        with self._lock:
+            return {
+                "rate_per_minute": self.current_rate(),
+                "max_requests": self.max_requests,
+                "limit": self.limit,
+                "in_window": len(self.requests),
+                "throttled_count": self.throttled_count,
+                "blocked_seconds": max(0, self.blocked_until - time.time()),
+            }
+
+
+_shared_limiters = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def get_shared_limiter(
+    scope: str, max_requests: int = 90, window_seconds: float = 60
+) -> AdaptiveSlideWindowCounter:
+    """
+    获取指定作用域（如上游主机名）的共享自适应限流器，同一作用域只创建一次，后续调用的参数被忽略
+    """
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(scope)
+        if limiter is None:
+            limiter = AdaptiveSlideWindowCounter(max_requests, window_seconds)
+            _shared_limiters[scope] = limiter
+        return limiter
+
+
+def get_shared_limiter_metrics() -> dict:
+    """
+    所有共享限流器的状态指标，返回 {scope: metrics}
+    """
+    with _shared_limiters_lock:
+        limiters = dict(_shared_limiters)
+    return {scope: limiter.metrics() for scope, limiter in limiters.items()}
 
 
 # 参数设置参考：https://docs.anilist.co/guide/rate-limiting
@@ -50,24 +198,54 @@ def slide_window_rate_limiter(
     max_requests: int = 90,
     window_seconds: float = 60,
     max_retries: int = 3,
-    delay: float = 1,
+    scope: str = None,
+    throttle_retries: int = 3,
 ):
+    """
+    限流装饰器
+
+    指定 scope 时，同一作用域的所有方法及线程共用一个自适应限流器；否则每个被装饰的函数单独计数。
+    被拒绝时等待至窗口中最早的请求过期后重试，max_retries 为 None 时排队等待直至获得额度。
+    共享限流器下被装饰函数返回带 status_code 的响应（如 requests.Response）时，
+    据此调整速率，被限流的请求最多重发 throttle_retries 次
+    """
+
     def decorator(func):
-        limiter = SlideWindowCounter(max_requests, window_seconds)
+        if scope:
+            limiter = get_shared_limiter(scope, max_requests, window_seconds)
+        else:
+            limiter = SlideWindowCounter(max_requests, window_seconds)
 
-        @wraps(func)
-        def wrapper(*args, **kwargs):
+        def acquire():
             retries = 0
-            while retries <= max_retries:
-                if limiter.is_allowed():
-                    return func(*args, **kwargs)
+            while not limiter.is_allowed():
                 # 达到最大重试次数
-                if retries >= max_retries:
+                if max_retries is not None and retries >= max_retries:
                     logger.debug(f"达到最大重试次数({max_retries})")
-                    return None
+                    return False
                 # 仅在未达重试上限时等待并递增
-                time.sleep(delay)
+                time.sleep(limiter.wait_time())
                 retries += 1
+            return True
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            attempts = 0
+            while acquire():
+                start_time = time.monotonic()
+                result = func(*args, **kwargs)
+                if not scope or not hasattr(result, "status_code"):
+                    return result
+                throttled = limiter.record_response(
+                    result.status_code,
+                    result.headers.get("Retry-After"),
+                    time.monotonic() - start_time,
+                )
+                if not throttled or attempts >= throttle_retries:
+                    return result
+                attempts += 1
+            return None
 
+        wrapper.limiter = limiter
         return wrapper
     return decorator
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+from tools.log import logger
+
+
+class ThumbnailCache:
+    """
+    Bangumi 封面本地缓存
+
+    封面保存为 {cache_dir}/{subject_id}_{image_size}，清单文件记录每个封面的 sha256 与大小；
+    读取时校验完整性，总大小超出上限时按最近访问时间(文件 mtime)淘汰
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, cache_dir: str, max_size: int):
+        """
+        :param cache_dir: 缓存目录
+        :param max_size: 缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.manifest_path = os.path.join(cache_dir, self.MANIFEST_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if isinstance(manifest, dict):
+                return manifest
+            logger.warning(f"封面缓存清单格式错误: {self.manifest_path}")
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"封面缓存清单读取失败: {self.manifest_path}, {e}")
+        return {}
+
+    def _save_manifest(self):
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f)
+        os.replace(temp_path, self.manifest_path)
+
+    @staticmethod
+    def _key(subject_id, image_size) -> str:
+        return f"{subject_id}_{image_size}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _remove(self, key: str):
+        self._manifest.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def get(self, subject_id, image_size):
+        """
+        读取缓存的封面，未命中或校验失败时返回 None
+        """
+        key = self._key(subject_id, image_size)
+        with self._lock:
+            entry = self._manifest.get(key)
+            if not entry:
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    content = f.read()
+            except OSError:
+                content = None
+            if content is None or hashlib.sha256(content).hexdigest() != entry.get("sha256"):
+                logger.warning(f"封面缓存校验失败, 已移除: {key}")
+                self._remove(key)
+                self._save_manifest()
+                return None
+            # 更新访问时间，用于 LRU 淘汰
+            os.utime(self._path(key))
+        logger.debug(f"命中封面缓存: {key}")
+        return content
+
+    def put(self, subject_id, image_size, content: bytes):
+        """
+        写入封面缓存，并在超出容量时淘汰最久未访问的封面
+        """
+        if not content or len(content) > self.max_size:
+            return
+        key = self._key(subject_id, image_size)
+        with self._lock:
+            temp_path = self._path(key) + ".tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(content)
+                os.replace(temp_path, self._path(key))
+            except OSError as e:
+                logger.warning(f"写入封面缓存失败: {key}, {e}")
+                return
+            self._manifest[key] = {
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "size": len(content),
+            }
+            self._evict()
+            self._save_manifest()
+
+    def _evict(self):
+        total_size = sum(entry["size"] for entry in self._manifest.values())
+        if total_size <= self.max_size:
+            return
+
+        def _last_access(key):
+            try:
+                return os.path.getmtime(self._path(key))
+            except OSError:
+                return 0
+
+        for key in sorted(self._manifest, key=_last_access):
+            if total_size <= self.max_size:
+                break
+            total_size -= self._manifest[key]["size"]
+            self._remove(key)
+            logger.debug(f"淘汰封面缓存: {key}")